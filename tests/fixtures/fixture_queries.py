@@ -0,0 +1,11 @@
+import pytest
+from core.testing import SIZES, assert_constant_queries
+
+
+@pytest.fixture
+def constant_queries(db):
+    """Проверка, что число запросов вызовов не растет с данными:
+    constant_queries(grow, {имя: вызов}, sizes=(10, 100, 1000))"""
+    def check(grow, requests, sizes=SIZES, snapshot=None):
+        return assert_constant_queries(grow, requests, sizes, snapshot)
+    return check
@@ -0,0 +1,24 @@
+import pytest
+from posts.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+class TestConstantQueries:
+
+    def test_feeds(self, constant_queries, mixer, user_client, user, group):
+        def grow(size):
+            authors = mixer.cycle(size - Post.objects.count()).blend(
+                'auth.User'
+            )
+            for author in authors:
+                mixer.blend(Post, author=author, group=group, image='')
+
+        def get(url):
+            return lambda: user_client.get(url)
+
+        constant_queries(grow, {
+            'index': get('/'),
+            'group': get(f'/group/{group.slug}/'),
+            'profile': get(f'/profile/{user.username}/'),
+        }, sizes=(5, 20))
@@ -0,0 +1,40 @@
+"""Бэкенды кэша, которые считают попадания и промахи для метрик
+запроса"""
+from django.core.cache.backends import filebased, locmem, memcached
+
+from . import metrics
+
+_MISSING = object()
+
+
+class MetricsMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            metrics.count('cache_misses')
+            return default
+        metrics.count('cache_hits')
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        metrics.count('cache_hits', len(found))
+        metrics.count('cache_misses', len(keys) - len(found))
+        return found
+
+
+class LocMemCache(MetricsMixin, locmem.LocMemCache):
+    pass
+
+
+class FileBasedCache(MetricsMixin, filebased.FileBasedCache):
+    pass
+
+
+class MemcachedCache(MetricsMixin, memcached.MemcachedCache):
+    pass
+
+
+class PyLibMCCache(MetricsMixin, memcached.PyLibMCCache):
+    pass
@@ -0,0 +1,89 @@
+"""Настройка соединений с базой и маршрутизация чтения на реплики"""
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY = 'default'
+# после записи пользователь какое-то время читает с основной базы,
+# чтобы увидеть свой пост или комментарий, пока реплика отстает
+PIN_COOKIE = 'db_primary_until'
+
+_use_replicas = ContextVar('use_replicas', default=False)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created: WAL позволяет читать во время записи,
+    synchronous=NORMAL в режиме WAL не теряет согласованность при сбое,
+    busy_timeout - ждать блокировку вместо ошибки "database is
+    locked"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def reading_from_replica():
+    return _use_replicas.get() and bool(settings.DATABASE_REPLICAS)
+
+
+class PrimaryReplicaRouter:
+    """Запись - всегда в основную базу; чтение - с реплики только
+    внутри представлений лент, помеченных read_from_replica"""
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплики - копии основной базы
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+def _pinned(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_from_replica(view):
+    """Чтение ленты с реплики, если пользователь недавно ничего
+    не записывал"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _use_replicas.set(not _pinned(request))
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _use_replicas.reset(token)
+    return wrapper
+
+
+def write_to_primary(view):
+    """Все запросы представления - к основной базе, и затем чтение
+    закрепляется за ней на REPLICA_PIN_SECONDS"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _use_replicas.set(False)
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            _use_replicas.reset(token)
+        if settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + settings.REPLICA_PIN_SECONDS),
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True
+            )
+        return response
+    return wrapper
@@ -0,0 +1,199 @@
+"""Метрики запросов: время ответа, запросы к базе, обращения к кэшу,
+отрисовка шаблонов и создание копий картинок.
+
+Замеры одного запроса собираются в RequestMetrics текущего контекста;
+middleware пишет их в лог строкой JSON, в заголовок Server-Timing
+(администраторам, в отладке или всем при SERVER_TIMING) и в скользящее
+окно по имени URL, по которому считаются перцентили.
+Окна хранятся в памяти процесса: у каждого рабочего процесса свои."""
+import json
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.utils.functional import empty
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+# метрики со временем в миллисекундах; остальные - счетчики
+TIMINGS = ('total', 'db', 'template', 'thumbnail')
+COUNTS = ('db_queries', 'cache_hits', 'cache_misses')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.values = defaultdict(float)
+
+    def add(self, name, value):
+        self.values[name] += value
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """Обертка execute_wrapper: считает запросы и их время"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add('db', time.perf_counter() - started)
+            self.add('db_queries', 1)
+
+    def report(self):
+        """Замеры запроса: время - в миллисекундах"""
+        result = {}
+        for name in TIMINGS:
+            result[name] = round(self.values[name] * 1000, 2)
+        for name in COUNTS:
+            result[name] = int(self.values[name])
+        return result
+
+
+def current():
+    return _current.get()
+
+
+def count(name, value=1):
+    metrics = current()
+    if metrics is not None:
+        metrics.add(name, value)
+
+
+@contextmanager
+def timer(name):
+    """Время блока добавляется к метрике текущего запроса; вне
+    запроса (фоновые задачи) - в окно 'job:<имя>'"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics = current()
+        if metrics is not None:
+            metrics.add(name, elapsed)
+        else:
+            store.add(f'job:{name}', {'total': round(elapsed * 1000, 2)})
+
+
+def percentile(values, rank):
+    """Перцентиль методом ближайшего ранга"""
+    ordered = sorted(values)
+    index = max(math.ceil(rank / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+class Store:
+    """Последние METRICS_WINDOW замеров каждого имени URL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._counts = defaultdict(int)
+
+    def add(self, route, report):
+        with self._lock:
+            window = self._windows.get(route)
+            if window is None:
+                window = self._windows[route] = deque(
+                    maxlen=settings.METRICS_WINDOW
+                )
+            window.append(report)
+            self._counts[route] += 1
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+            self._counts.clear()
+
+    def summary(self):
+        """{имя URL: {'count': всего запросов, метрика: {p50, p90, p99}}}"""
+        with self._lock:
+            windows = {
+                route: list(window) for route, window in self._windows.items()
+            }
+            counts = dict(self._counts)
+        result = {}
+        for route, reports in sorted(windows.items()):
+            result[route] = {'count': counts[route]}
+            for name in reports[0]:
+                values = [report[name] for report in reports]
+                result[route][name] = {
+                    f'p{rank}': percentile(values, rank)
+                    for rank in PERCENTILES
+                }
+        return result
+
+
+store = Store()
+
+
+def server_timing(report):
+    parts = [f'total;dur={report["total"]}']
+    parts.append(
+        f'db;dur={report["db"]};desc="{report["db_queries"]} queries"'
+    )
+    parts.append(
+        f'cache;desc="{report["cache_hits"]} hits, '
+        f'{report["cache_misses"]} misses"'
+    )
+    for name in ('template', 'thumbnail'):
+        if report[name]:
+            parts.append(f'{name};dur={report[name]}')
+    return ', '.join(parts)
+
+
+def timing_allowed(request):
+    """Заголовок раскрывает устройство сайта, поэтому по умолчанию
+    он только для администраторов и в режиме отладки. Пользователь
+    проверяется, только если его уже загрузило представление: ради
+    заголовка сессия и пользователь из базы не читаются"""
+    if settings.SERVER_TIMING or settings.DEBUG:
+        return True
+    user = getattr(request, 'user', None)
+    if user is None or getattr(user, '_wrapped', None) is empty:
+        return False
+    return user.is_staff
+
+
+class RequestMetricsMiddleware:
+    """Подключается первой в MIDDLEWARE, чтобы время включало всю
+    цепочку; у потоковых ответов учитывается время до первого байта"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.db_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.add('total', time.perf_counter() - started)
+
+        report = metrics.report()
+        match = request.resolver_match
+        route = match.view_name if match else 'unresolved'
+        store.add(route, report)
+        logger.info(json.dumps({
+            'route': route,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **report,
+        }))
+        if timing_allowed(request):
+            response['Server-Timing'] = server_timing(report)
+        return response
@@ -0,0 +1,12 @@
+import logging
+
+from django.test.runner import DiscoverRunner
+
+
+class Runner(DiscoverRunner):
+    """Прогон тестов без строки метрик в журнале на каждый запрос
+    тестового клиента; assertLogs задает уровень сам"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        logging.getLogger('core.metrics').setLevel(logging.WARNING)
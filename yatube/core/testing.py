@@ -0,0 +1,152 @@
+"""Проверка того, что число запросов к базе не растет с данными.
+
+Запросы каждого вызова записываются при нескольких размерах данных
+(по умолчанию 10, 100 и 1000 постов): если число запросов меняется,
+где-то запрос на объект (N+1). Нормализованный SQL самого большого
+прогона сверяется со снимком в файле, чтобы изменения запросов были
+видны на ревью; снимок создается при первом прогоне и переписывается
+при UPDATE_QUERY_SNAPSHOTS=1.
+
+Для TestCase - декоратор constant_queries, для pytest - фикстура
+constant_queries из tests/fixtures, для разового замера - контекстный
+менеджер QueryRecorder."""
+import difflib
+import os
+import re
+from collections import defaultdict
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+SIZES = (10, 100, 1000)
+UPDATE_ENV = 'UPDATE_QUERY_SNAPSHOTS'
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_RE = re.compile(r'IN \(\?(?:, \?)*\)')
+ROWS_RE = re.compile(r'VALUES (\([?, ]*\))(?:, \([?, ]*\))+')
+# имя точки сохранения - id потока и порядковый номер
+SAVEPOINT_RE = re.compile(r'"s\d+_x\d+"')
+
+
+def normalize(sql):
+    """SQL без значений: числа, строки и имена точек сохранения -
+    '?', списки IN и строки VALUES свернуты, чтобы снимок не зависел
+    от данных"""
+    sql = STRING_RE.sub('?', sql)
+    sql = SAVEPOINT_RE.sub('"?"', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_RE.sub('IN (...)', sql)
+    return ROWS_RE.sub(r'VALUES \1, ...', sql)
+
+
+class QueryRecorder(CaptureQueriesContext):
+    """Запросы блока: len() - их число, statements - нормализованный
+    SQL"""
+
+    def __init__(self, using='default'):
+        super().__init__(connections[using])
+        self.queries = []
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        # captured_queries - срез живого журнала соединения, который
+        # следующий запрос клиента очистит; записанное копируется
+        self.queries = list(self.captured_queries)
+
+    def __len__(self):
+        return len(self.queries)
+
+    @property
+    def statements(self):
+        return [normalize(query['sql']) for query in self.queries]
+
+
+def record(request):
+    """Запросы одного вызова; кэш фрагментов очищается, иначе он
+    скрыл бы запросы отрисовки"""
+    cache.clear()
+    with QueryRecorder() as recorder:
+        request()
+    return recorder
+
+
+def measure(grow, requests, sizes=SIZES):
+    """{имя: {размер: QueryRecorder}}; grow(size) доводит данные до
+    размера, requests - {имя: вызов без аргументов}. Первый вызов
+    на каждом размере прогревает ленивые счетчики и не записывается"""
+    results = defaultdict(dict)
+    for size in sizes:
+        grow(size)
+        for name, request in requests.items():
+            request()
+            results[name][size] = record(request)
+    return results
+
+
+def snapshot_diff(path, sections):
+    """Расхождение снимка с текущим SQL; None, если совпадает или
+    снимок записан заново"""
+    text = ''.join(
+        f'-- {name}\n' + ''.join(f'{sql}\n' for sql in statements) + '\n'
+        for name, statements in sorted(sections.items())
+    )
+    if os.environ.get(UPDATE_ENV) or not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return None
+    with open(path, encoding='utf-8') as file:
+        expected = file.read()
+    if expected == text:
+        return None
+    return ''.join(difflib.unified_diff(
+        expected.splitlines(True), text.splitlines(True),
+        'снимок', 'сейчас'
+    ))
+
+
+def assert_constant_queries(grow, requests, sizes=SIZES, snapshot=None):
+    """AssertionError, если число запросов какого-то вызова зависит
+    от размера данных или SQL разошелся со снимком в файле snapshot"""
+    results = measure(grow, requests, sizes)
+    problems = []
+    for name, recorders in results.items():
+        counts = {size: len(recorder) for size, recorder in recorders.items()}
+        if len(set(counts.values())) > 1:
+            largest = recorders[max(sizes)].statements
+            problems.append(
+                f'{name}: число запросов растет с данными {counts}\n'
+                + '\n'.join(largest)
+            )
+    if snapshot is not None and not problems:
+        diff = snapshot_diff(snapshot, {
+            name: recorders[max(sizes)].statements
+            for name, recorders in results.items()
+        })
+        if diff:
+            problems.append(
+                f'SQL разошелся со снимком {snapshot}; если так и '
+                f'задумано, перезапишите его с {UPDATE_ENV}=1\n{diff}'
+            )
+    if problems:
+        raise AssertionError('\n\n'.join(problems))
+    return results
+
+
+def constant_queries(sizes=SIZES, snapshot=None):
+    """Декоратор метода TestCase: метод получает размер данных,
+    доводит данные до него и возвращает {имя: вызов}"""
+    def decorator(test):
+        @wraps(test)
+        def wrapper(self):
+            requests = {}
+
+            def grow(size):
+                requests.clear()
+                requests.update(test(self, size))
+            assert_constant_queries(grow, requests, sizes, snapshot)
+        return wrapper
+    return decorator
@@ -1,12 +1,23 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from . import metrics as request_metrics
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
 
 
 def csrf_failure(request, reason=''):
-    return render(request, 'core/403csrf.html')
+    # клиенты API ждут JSON, а не страницу сайта
+    match = request.resolver_match
+    if match is not None and match.namespace == 'api':
+        return JsonResponse({
+            'detail': 'Проверка CSRF не пройдена: нужен заголовок '
+                      'X-CSRFToken со значением cookie csrftoken',
+        }, status=403)
+    return render(request, 'core/403csrf.html', status=403)
 
 
 def server_error(request):
@@ -15,3 +26,8 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+@staff_member_required
+def metrics(request):
+    return JsonResponse(request_metrics.store.summary())
@@ -0,0 +1,247 @@
+"""Общие части JSON API: поля ресурсов, выборка через values(),
+курсорные страницы, разбор тела запроса и ответы с ETag.
+
+Строки читаются словарями values() только с запрошенными колонками
+(?fields=id,text), без создания моделей и без JOIN для полей, которые
+не нужны. Страницы - тот же keyset-паджинатор, что у лент; ETag - хэш
+тела ответа: при совпадении с If-None-Match тело не отправляется."""
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse
+from django.http.multipartparser import MultiPartParserError
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
+
+from .models import Post
+from .paginator import CursorPaginator
+
+
+def image_url(name):
+    return Post._meta.get_field('image').storage.url(name) if name else None
+
+
+class Resource:
+    """Поля ресурса API: имя в ответе -> путь поля для values();
+    ordering - порядок и ключ курсорных страниц"""
+
+    def __init__(self, fields, ordering, convert=None):
+        self.fields = fields
+        self.ordering = ordering
+        self.keys = [field.lstrip('-') for field in ordering]
+        # преобразования значений колонок перед выводом
+        self.convert = convert or {}
+
+    def parse_fields(self, value):
+        """Имена полей из ?fields=; ValueError для неизвестных"""
+        if not value:
+            return list(self.fields)
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise ValueError(
+                f'Неизвестные поля: {", ".join(unknown)}; доступны: '
+                f'{", ".join(self.fields)}'
+            )
+        return names
+
+    def values(self, queryset, names):
+        """Только колонки выбранных полей и ключа сортировки"""
+        lookups = [self.fields[name] for name in names] + self.keys
+        return queryset.values(*dict.fromkeys(lookups))
+
+    def serialize(self, row, names):
+        result = {}
+        for name in names:
+            value = row[self.fields[name]]
+            if name in self.convert:
+                value = self.convert[name](value)
+            result[name] = value
+        return result
+
+
+POSTS = Resource({
+    'id': 'pk',
+    'text': 'text',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'pub_date': 'pub_date',
+    'updated_at': 'updated_at',
+    'image': 'image',
+    'comments_count': 'comments_count',
+}, ordering=('-pub_date', '-pk'), convert={'image': image_url})
+
+COMMENTS = Resource({
+    'id': 'pk',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}, ordering=('-created', '-pk'))
+
+GROUPS = Resource({
+    'id': 'pk',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+}, ordering=('title', 'pk'))
+
+# подписки одного пользователя - по порядку индекса follow_user_author;
+# автор в них не повторяется, поэтому годится ключом курсора
+FOLLOWS = Resource({
+    'id': 'pk',
+    'user': 'user__username',
+    'author': 'author__username',
+}, ordering=('author',))
+
+
+def page_size(value, default=None):
+    """?limit=; по умолчанию - default или размер страницы ленты"""
+    if not value:
+        return default or settings.POSTS_NUMBER
+    try:
+        size = int(value)
+    except ValueError:
+        raise ValueError('limit должен быть числом')
+    if not 1 <= size <= settings.API_MAX_PAGE_SIZE:
+        raise ValueError(
+            f'limit должен быть от 1 до {settings.API_MAX_PAGE_SIZE}'
+        )
+    return size
+
+
+def page_link(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return request.build_absolute_uri(
+        f'{request.path}?{urlencode(sorted(query.items()))}'
+    )
+
+
+def object_list(request, resource, queryset, per_page=None):
+    """Страница ресурса: {'results': [...], 'next': ..., 'previous': ...};
+    ValueError при некорректных параметрах"""
+    names = resource.parse_fields(request.GET.get('fields'))
+    paginator = CursorPaginator(
+        resource.values(queryset, names),
+        page_size(request.GET.get('limit'), per_page),
+        ordering=resource.ordering,
+        transform=lambda rows: [
+            resource.serialize(row, names) for row in rows
+        ],
+    )
+    page = paginator.cursor_page(request.GET.get('cursor'))
+    return {
+        'results': list(page.object_list),
+        'next': page_link(request, page.next_cursor),
+        'previous': page_link(request, page.previous_cursor),
+    }
+
+
+def detail(request, resource, queryset):
+    """Один объект с полями из ?fields=; Http404, если его нет"""
+    names = resource.parse_fields(request.GET.get('fields'))
+    rows = list(resource.values(queryset, names).order_by()[:1])
+    if not rows:
+        raise Http404
+    return resource.serialize(rows[0], names)
+
+
+def read_data(request):
+    """Поля из тела запроса: JSON-объект или multipart-форма
+    (для загрузки картинки); ValueError, если тело не разобрать"""
+    if request.content_type == 'multipart/form-data':
+        if request.method == 'POST':
+            return request.POST.dict(), request.FILES
+        # request.POST и FILES Django заполняет только для POST
+        try:
+            data, files = request.parse_file_upload(request.META, request)
+        except MultiPartParserError:
+            raise ValueError('Тело запроса - не multipart-форма')
+        return data.dict(), files
+    try:
+        data = json.loads(request.body.decode() or '{}')
+    except (UnicodeDecodeError, ValueError):
+        raise ValueError('Тело запроса - не JSON')
+    if not isinstance(data, dict):
+        raise ValueError('Тело запроса должно быть JSON-объектом')
+    return data, None
+
+
+def check_strings(data, *names, nullable=()):
+    """ValueError, если поле JSON пришло не строкой: форма превратила
+    бы список, объект или число в строку и сохранила ее как есть"""
+    for name in names:
+        if name not in data:
+            continue
+        value = data[name]
+        if value is None and name in nullable:
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f'{name} должен быть строкой')
+
+
+def error(message, status=400):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def form_errors(form):
+    return JsonResponse({'errors': {
+        field: list(messages) for field, messages in form.errors.items()
+    }}, status=400)
+
+
+def respond(request, data, status=200):
+    """JSON с ETag; на GET с совпавшим If-None-Match - 304 без тела"""
+    response = JsonResponse(
+        data, status=status, encoder=DjangoJSONEncoder,
+        json_dumps_params={'ensure_ascii': False}
+    )
+    if request.method != 'GET' or status != 200:
+        return response
+    etag = f'"{hashlib.md5(response.content).hexdigest()}"'
+    response['ETag'] = etag
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def login_required(handler):
+    """Вместо перенаправления на форму входа - 401"""
+    @wraps(handler)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('Нужна авторизация', status=401)
+        return handler(request, *args, **kwargs)
+    return wrapper
+
+
+def endpoint(**handlers):
+    """Вью адреса API: метод запроса -> обработчик. ValueError
+    обработчика - 400, Http404 - 404, PermissionDenied - 403, все
+    в JSON, а не страницами сайта"""
+    allowed = sorted(method.upper() for method in handlers)
+
+    def view(request, *args, **kwargs):
+        handler = handlers.get(request.method.lower())
+        if handler is None:
+            response = error('Метод не поддерживается', status=405)
+            response['Allow'] = ', '.join(allowed)
+            return response
+        try:
+            return handler(request, *args, **kwargs)
+        except ValueError as exception:
+            return error(str(exception))
+        except Http404:
+            return error('Не найдено', status=404)
+        except PermissionDenied:
+            return error('Недостаточно прав', status=403)
+    return view
+
+
+def no_content():
+    return HttpResponse(status=204)
@@ -0,0 +1,17 @@
+from django.urls import path
+
+from . import api_views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', api_views.posts, name='posts'),
+    path('posts/<int:post_id>/', api_views.post, name='post'),
+    path(
+        'posts/<int:post_id>/comments/',
+        api_views.comments, name='comments'
+    ),
+    path('groups/', api_views.groups, name='groups'),
+    path('follow/', api_views.follows, name='follows'),
+    path('follow/<str:username>/', api_views.follow, name='follow'),
+]
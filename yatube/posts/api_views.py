@@ -0,0 +1,221 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from core.db import read_from_replica, write_to_primary
+
+from . import api, thumbnails
+from .follow_graph import graph
+from .forms import CommentForm, PostForm
+from .models import Comment, Follow, Group, Post, User
+
+
+# поля поста, которые приходят строками; картинка - файлом
+POST_FIELDS = ('text', 'group')
+
+
+def post_form(data, files=None, instance=None):
+    """Группа в API задается слагом; при изменении (instance) форма
+    проверяет и сохраняет только переданные поля"""
+    form = PostForm(data, files=files, instance=instance)
+    form.fields['group'].to_field_name = 'slug'
+    if instance is not None:
+        for name in list(form.fields):
+            if name not in data and name not in (files or {}):
+                del form.fields[name]
+    return form
+
+
+def saved_post(request, post, status):
+    response = api.respond(request, api.detail(
+        request, api.POSTS, Post.objects.filter(pk=post.pk)
+    ), status=status)
+    response['Location'] = reverse('api:post', args=[post.pk])
+    return response
+
+
+@read_from_replica
+def post_list(request):
+    queryset = Post.objects.all()
+    if request.GET.get('author'):
+        queryset = queryset.filter(author__username=request.GET['author'])
+    if request.GET.get('group'):
+        queryset = queryset.filter(group__slug=request.GET['group'])
+    return api.respond(
+        request, api.object_list(request, api.POSTS, queryset)
+    )
+
+
+@api.login_required
+@write_to_primary
+def post_create(request):
+    data, files = api.read_data(request)
+    api.check_strings(data, *POST_FIELDS, nullable=('group',))
+    form = post_form(data, files)
+    if not form.is_valid():
+        return api.form_errors(form)
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    thumbnails.enqueue(post)
+    return saved_post(request, post, status=201)
+
+
+def post_detail(request, post_id):
+    return api.respond(request, api.detail(
+        request, api.POSTS, Post.objects.filter(pk=post_id)
+    ))
+
+
+def own_post(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    if post.author_id != request.user.pk:
+        raise PermissionDenied
+    return post
+
+
+@api.login_required
+@write_to_primary
+def post_update(request, post_id):
+    post = own_post(request, post_id)
+    data, files = api.read_data(request)
+    api.check_strings(data, *POST_FIELDS, nullable=('group',))
+    try:
+        form = post_form(data, files, instance=post)
+        if not form.is_valid():
+            return api.form_errors(form)
+        post = form.save()
+    finally:
+        # файлы, разобранные не из POST, Django в конце запроса не
+        # закрывает
+        for upload in (files or {}).values():
+            upload.close()
+    if 'image' in form.changed_data:
+        thumbnails.enqueue(post)
+    return saved_post(request, post, status=200)
+
+
+@api.login_required
+@write_to_primary
+def post_delete(request, post_id):
+    own_post(request, post_id).delete()
+    return api.no_content()
+
+
+@read_from_replica
+def group_list(request):
+    return api.respond(
+        request, api.object_list(request, api.GROUPS, Group.objects.all())
+    )
+
+
+def comment_list(request, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        return api.error('Нет такого поста', status=404)
+    return api.respond(request, api.object_list(
+        request, api.COMMENTS, Comment.objects.filter(post_id=post_id),
+        per_page=settings.COMMENTS_NUMBER
+    ))
+
+
+@api.login_required
+@write_to_primary
+def comment_create(request, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    data, _ = api.read_data(request)
+    api.check_strings(data, 'text')
+    form = CommentForm({'text': data.get('text')})
+    if not form.is_valid():
+        return api.form_errors(form)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post_id = post_id
+    comment.save()
+    return api.respond(request, api.detail(
+        request, api.COMMENTS, Comment.objects.filter(pk=comment.pk)
+    ), status=201)
+
+
+@api.login_required
+def follow_list(request):
+    return api.respond(request, api.object_list(
+        request, api.FOLLOWS, Follow.objects.filter(user=request.user)
+    ))
+
+
+def author_ids(data):
+    """Авторы массовой подписки: {"authors": ["leo", ...]} ->
+    (id найденных по имени, ненайденные имена); пользователи
+    ищутся одним запросом"""
+    names = data.get('authors')
+    if not isinstance(names, list) or not all(
+        isinstance(name, str) for name in names
+    ):
+        raise ValueError('authors должен быть списком имен пользователей')
+    if len(names) > settings.FOLLOW_BULK_LIMIT:
+        raise ValueError(
+            f'Не больше {settings.FOLLOW_BULK_LIMIT} авторов за раз'
+        )
+    found = dict(User.objects.filter(username__in=set(names)).values_list(
+        'username', 'pk'
+    ))
+    missing = sorted(set(names) - set(found))
+    return found, missing
+
+
+def bulk_result(key, found, ids, missing):
+    names = {pk: name for name, pk in found.items()}
+    return {key: sorted(names[pk] for pk in ids), 'missing': missing}
+
+
+@api.login_required
+@write_to_primary
+def follow_create(request):
+    data, _ = api.read_data(request)
+    if 'authors' in data:
+        found, missing = author_ids(data)
+        added = graph.follow_many(request.user.pk, found.values())
+        return api.respond(
+            request, bulk_result('followed', found, added, missing)
+        )
+    api.check_strings(data, 'author')
+    author = get_object_or_404(User, username=data.get('author'))
+    if author == request.user:
+        raise ValueError('Нельзя подписаться на себя')
+    created = graph.follow(request.user, author)
+    return api.respond(request, api.detail(
+        request, api.FOLLOWS,
+        Follow.objects.filter(user=request.user, author=author)
+    ), status=201 if created else 200)
+
+
+@api.login_required
+@write_to_primary
+def follow_delete(request, username):
+    author = get_object_or_404(User, username=username)
+    graph.unfollow(request.user, author)
+    return api.no_content()
+
+
+@api.login_required
+@write_to_primary
+def follow_bulk_delete(request):
+    data, _ = api.read_data(request)
+    found, missing = author_ids(data)
+    removed = graph.unfollow_many(request.user.pk, found.values())
+    return api.respond(
+        request, bulk_result('unfollowed', found, removed, missing)
+    )
+
+
+posts = api.endpoint(get=post_list, post=post_create)
+post = api.endpoint(get=post_detail, patch=post_update, delete=post_delete)
+groups = api.endpoint(get=group_list)
+comments = api.endpoint(get=comment_list, post=comment_create)
+follows = api.endpoint(
+    get=follow_list, post=follow_create, delete=follow_bulk_delete
+)
+follow = api.endpoint(delete=follow_delete)
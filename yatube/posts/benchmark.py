@@ -0,0 +1,351 @@
+"""Нагрузочные замеры представлений на синтетических данных.
+
+seed() заполняет пустую базу: пользователи и группы - через mixer,
+тексты - Faker, подписки и авторство постов распределены по степенному
+закону (у немногих авторов много постов и подписчиков). run() гоняет
+сценарии через тестовый клиент (по одному запросу подряд) и через
+WSGIHandler в нескольких потоках; результат - словарь для JSON-отчета,
+compare() сравнивает два отчета. Запускается командой benchmark."""
+import io
+import random
+import time
+from concurrent import futures
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections, transaction
+from django.test import Client, RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from faker import Faker
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from core.metrics import percentile
+
+from . import counters, feed_cache, images, search, timeline
+from .bulk import keep_dates
+from .follow_graph import graph
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+# сколько разных картинок на все посты с картинками: копии одной
+# картинки общие, как и при настоящих повторных загрузках
+DISTINCT_IMAGES = 5
+IMAGE_SIZE = (1600, 1200)
+DAYS = 365
+
+READ_SCENARIOS = (
+    'index', 'group_posts', 'profile', 'post_detail', 'follow_index',
+)
+WRITE_SCENARIOS = ('post_create', 'add_comment')
+SCENARIOS = READ_SCENARIOS + WRITE_SCENARIOS
+
+
+class Dataset:
+    """Созданные при заполнении данные, из которых сценарии берут адреса"""
+
+    def __init__(self, params, user_ids, usernames, weights, group_slugs,
+                 post_ids, reader):
+        self.params = params
+        self.user_ids = user_ids
+        self.usernames = usernames
+        # вес автора: популярные чаще открываются и чаще пишут
+        self.weights = weights
+        self.group_slugs = group_slugs
+        self.post_ids = post_ids
+        self.reader = reader
+
+
+def zipf_weights(count, alpha):
+    return [1 / rank ** alpha for rank in range(1, count + 1)]
+
+
+def make_images(rng):
+    """Несколько JPEG в хранилище картинок постов; имена по содержимому"""
+    storage = Post._meta.get_field('image').storage
+    names = []
+    for number in range(DISTINCT_IMAGES):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        image = Image.new('RGB', IMAGE_SIZE, color)
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=85)
+        names.append(storage.save(
+            f'posts/bench{number}.jpg', ContentFile(buffer.getvalue())
+        ))
+    return names
+
+
+def seed(users=200, groups=10, posts=2000, comments=5000, image_ratio=0.1,
+         alpha=1.2, seed_value=0):
+    """Заполняет базу в обход сигналов, затем один раз пересчитывает
+    счетчики, ленты подписок, поисковый индекс и копии картинок"""
+    rng = random.Random(seed_value)
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed_value)
+    mixer = Mixer(commit=False)
+    now = timezone.now()
+
+    def moment():
+        return now - timedelta(seconds=rng.uniform(0, DAYS * 24 * 3600))
+
+    with transaction.atomic(), keep_dates([Post, Comment]):
+        User.objects.bulk_create(mixer.cycle(users).blend(
+            User, username=mixer.sequence('user{0}'), password='!',
+            is_staff=False, is_superuser=False, is_active=True,
+        ), batch_size=BATCH_SIZE)
+        Group.objects.bulk_create(mixer.cycle(groups).blend(
+            Group, slug=mixer.sequence('group-{0}')
+        ), batch_size=BATCH_SIZE)
+        user_ids = list(User.objects.order_by('pk').values_list(
+            'pk', flat=True
+        ))
+        group_ids = list(Group.objects.values_list('pk', flat=True))
+        weights = zipf_weights(len(user_ids), alpha)
+        image_names = make_images(rng) if image_ratio else []
+
+        batch = []
+        for author_id in rng.choices(user_ids, weights, k=posts):
+            pub_date = moment()
+            image = ''
+            if image_names and rng.random() < image_ratio:
+                image = rng.choice(image_names)
+            batch.append(Post(
+                author_id=author_id,
+                group_id=rng.choice(group_ids + [None]),
+                text=fake.paragraph(nb_sentences=rng.randint(1, 6)),
+                pub_date=pub_date, updated_at=pub_date, image=image,
+            ))
+        Post.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+
+        Comment.objects.bulk_create([
+            Comment(
+                post_id=rng.choice(post_ids),
+                author_id=rng.choice(user_ids),
+                text=fake.sentence(), created=moment(),
+            ) for _ in range(comments)
+        ], batch_size=BATCH_SIZE)
+
+        # число подписок пользователя - распределение Парето, на кого
+        # подписываться - по весу автора
+        follows = set()
+        for user_id in user_ids:
+            count = min(int(rng.paretovariate(alpha)), len(user_ids) - 1)
+            for author_id in rng.choices(user_ids, weights, k=count):
+                if author_id != user_id:
+                    follows.add((user_id, author_id))
+        Follow.objects.bulk_create([
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in sorted(follows)
+        ], batch_size=BATCH_SIZE)
+
+        counters.rebuild()
+        timeline.rebuild()
+    search.rebuild()
+    for post in Post.objects.exclude(image='').only('image'):
+        images.build(post)
+    feed_cache.bump(feed_cache.SHARED)
+    graph.reset()
+
+    # читатель ленты подписок - тот, у кого больше всего подписок
+    following = {}
+    for user_id, _ in follows:
+        following[user_id] = following.get(user_id, 0) + 1
+    reader = User.objects.get(pk=max(
+        user_ids, key=lambda pk: (following.get(pk, 0), -pk)
+    ))
+    usernames = dict(User.objects.values_list('pk', 'username'))
+    return Dataset(
+        params={
+            'users': users, 'groups': groups, 'posts': posts,
+            'comments': comments, 'follows': len(follows),
+            'image_ratio': image_ratio, 'alpha': alpha,
+            'seed': seed_value,
+        },
+        user_ids=user_ids,
+        usernames=[usernames[pk] for pk in user_ids],
+        weights=weights,
+        group_slugs=list(Group.objects.values_list('slug', flat=True)),
+        post_ids=post_ids,
+        reader=reader,
+    )
+
+
+def request_for(name, dataset, rng):
+    """(метод, адрес, данные формы) одного запроса сценария"""
+    if name == 'index':
+        return 'get', reverse('posts:index'), None
+    if name == 'group_posts':
+        slug = rng.choice(dataset.group_slugs)
+        return 'get', reverse('posts:group_posts', args=[slug]), None
+    if name == 'profile':
+        username = rng.choices(dataset.usernames, dataset.weights)[0]
+        return 'get', reverse('posts:profile', args=[username]), None
+    if name == 'post_detail':
+        post_id = rng.choice(dataset.post_ids)
+        return 'get', reverse('posts:post_detail', args=[post_id]), None
+    if name == 'follow_index':
+        return 'get', reverse('posts:follow_index'), None
+    text = f'Запись нагрузочного теста {rng.random()}'
+    if name == 'post_create':
+        return 'post', reverse('posts:post_create'), {'text': text}
+    post_id = rng.choice(dataset.post_ids)
+    return 'post', reverse('posts:add_comment', args=[post_id]), {
+        'text': text
+    }
+
+
+def summarize(latencies, elapsed, errors):
+    """Задержки - в миллисекундах, пропускная способность - запросов
+    в секунду"""
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': round(len(latencies) / max(elapsed, 1e-9), 1),
+        'mean': round(sum(milliseconds) / len(milliseconds), 2),
+        **{
+            f'p{rank}': round(percentile(milliseconds, rank), 2)
+            for rank in (50, 90, 99)
+        },
+    }
+
+
+def run_client(dataset, scenarios, requests, seed_value=0):
+    """Последовательные запросы тестового клиента от имени читателя"""
+    rng = random.Random(seed_value)
+    client = Client()
+    client.force_login(dataset.reader)
+    results = {}
+    for name in scenarios:
+        # первый запрос прогревает кэши и ленивые счетчики
+        method, url, data = request_for(name, dataset, rng)
+        getattr(client, method)(url, data)
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(requests):
+            method, url, data = request_for(name, dataset, rng)
+            request_started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            latencies.append(time.perf_counter() - request_started)
+            errors += response.status_code >= 400
+        results[name] = summarize(
+            latencies, time.perf_counter() - started, errors
+        )
+    return results
+
+
+class WsgiDriver:
+    """Запросы прямо в WSGIHandler из нескольких потоков: полный путь
+    обработки, как под сервером приложений, но без сети"""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.handler = WSGIHandler()
+        self.factory = RequestFactory()
+        client = Client()
+        client.force_login(dataset.reader)
+        # тот же секрет CSRF в куке и в форме проходит проверку
+        self.csrf_token = get_random_string(32)
+        self.cookies = '; '.join([
+            f'{name}={cookie.value}' for name, cookie in client.cookies.items()
+        ] + [f'csrftoken={self.csrf_token}'])
+
+    def environ(self, method, url, data):
+        if method == 'post':
+            data = {**data, 'csrfmiddlewaretoken': self.csrf_token}
+            request = self.factory.post(url, data)
+        else:
+            request = self.factory.get(url)
+        environ = dict(request.environ)
+        environ['HTTP_COOKIE'] = self.cookies
+        return environ
+
+    def call(self, environ):
+        status = []
+
+        def start_response(value, headers, exc_info=None):
+            status.append(int(value.split()[0]))
+        response = self.handler(environ, start_response)
+        try:
+            for _ in response:
+                pass
+        finally:
+            response.close()
+        return status[0]
+
+    def worker(self, name, requests, seed_value):
+        rng = random.Random(seed_value)
+        latencies = []
+        errors = 0
+        try:
+            for _ in range(requests):
+                environ = self.environ(*request_for(name, self.dataset, rng))
+                started = time.perf_counter()
+                status = self.call(environ)
+                latencies.append(time.perf_counter() - started)
+                errors += status >= 400
+        finally:
+            # у потока свои соединения с базой
+            connections.close_all()
+        return latencies, errors
+
+    def run(self, scenarios, requests, threads, seed_value=0):
+        results = {}
+        with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            for name in scenarios:
+                self.call(self.environ(*request_for(
+                    name, self.dataset, random.Random(seed_value)
+                )))
+                started = time.perf_counter()
+                jobs = [
+                    executor.submit(
+                        self.worker, name, requests, seed_value + number
+                    ) for number in range(threads)
+                ]
+                latencies = []
+                errors = 0
+                for job in jobs:
+                    job_latencies, job_errors = job.result()
+                    latencies.extend(job_latencies)
+                    errors += job_errors
+                results[name] = summarize(
+                    latencies, time.perf_counter() - started, errors
+                )
+        return results
+
+
+def run(dataset, scenarios=SCENARIOS, requests=50, threads=4,
+        seed_value=0):
+    """requests - запросов на сценарий у клиента и на поток у WSGI"""
+    return {
+        'client': run_client(dataset, scenarios, requests, seed_value),
+        'wsgi': WsgiDriver(dataset).run(
+            scenarios, requests, threads, seed_value
+        ),
+    }
+
+
+def compare(baseline, report):
+    """Строки сравнения: p50 и пропускная способность было -> стало"""
+    lines = []
+    for driver in ('client', 'wsgi'):
+        for name, result in report['results'][driver].items():
+            old = baseline.get('results', {}).get(driver, {}).get(name)
+            if old is None:
+                continue
+            change = (result['p50'] - old['p50']) / max(old['p50'], 1e-9)
+            lines.append(
+                f'{driver:6} {name:14} p50 {old["p50"]:8.2f} -> '
+                f'{result["p50"]:8.2f} мс ({change:+.0%}), '
+                f'{old["throughput"]:7.1f} -> {result["throughput"]:7.1f} '
+                f'запросов/с'
+            )
+    return lines
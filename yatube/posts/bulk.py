@@ -0,0 +1,29 @@
+"""Массовая запись через bulk_create с датами из данных: общее для
+команды bulk_import и замеров posts.benchmark."""
+from contextlib import contextmanager
+
+
+def date_fields(model):
+    """Поля, которые ORM заполняет текущим временем сам"""
+    return [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+
+
+@contextmanager
+def keep_dates(models):
+    """bulk_create подставляет текущее время в поля auto_now и
+    auto_now_add; на время загрузки это отключается, чтобы сохранить
+    даты из данных. Меняет поля моделей во всем процессе, поэтому
+    годится только для команд и замеров, а не для обработки запросов"""
+    fields = [field for model in models for field in date_fields(model)]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
@@ -0,0 +1,164 @@
+"""Отложенная запись комментариев (COMMENT_BUFFER = True).
+
+Проверенные формой комментарии копятся в памяти процесса и пишутся
+фоновым потоком одним bulk_create раз в COMMENT_FLUSH_INTERVAL мс или
+как только их наберется COMMENT_FLUSH_SIZE: на всплеске комментариев
+к популярному посту блокировка записи SQLite берется один раз на
+пачку, а не на каждый запрос. bulk_create не шлет сигналов, поэтому
+счетчики комментариев и поисковый индекс обновляются здесь же.
+
+Пока комментарий в очереди, автор видит его на странице поста
+(pending); очередь у каждого процесса своя, так что при нескольких
+рабочих процессах это верно для запросов к тому же процессу. При
+выходе процесса очередь дописывается в базу (atexit)."""
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import search
+from .models import Comment, Post, User
+
+logger = logging.getLogger(__name__)
+
+_items = []
+# пачка, которая пишется сейчас: автор видит ее, пока запись не
+# зафиксирована
+_writing = []
+_lock = threading.Lock()
+_wake = threading.Condition(_lock)
+# запись одной пачки за раз: фоновый поток и сброс при выходе
+_write_lock = threading.Lock()
+_thread = None
+_stopping = False
+
+
+def _write(comments):
+    """Пачка в одной транзакции; комментарии к удаленным постам
+    и от удаленных пользователей отбрасываются"""
+    posts = set(Post.objects.filter(
+        pk__in={comment.post_id for comment in comments}
+    ).values_list('pk', flat=True))
+    authors = set(User.objects.filter(
+        pk__in={comment.author_id for comment in comments}
+    ).values_list('pk', flat=True))
+    comments = [
+        comment for comment in comments
+        if comment.post_id in posts and comment.author_id in authors
+    ]
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+        per_post = Counter(comment.post_id for comment in comments)
+        for post_id, count in per_post.items():
+            Post.objects.filter(pk=post_id).update(
+                comments_count=F('comments_count') + count
+            )
+            search.refresh(post_id)
+    return len(comments)
+
+
+def _write_each(comments):
+    """Пачка не записалась: каждый комментарий - отдельной записью,
+    теряются только те, что не сохраняются и поодиночке"""
+    written = 0
+    for comment in comments:
+        try:
+            written += _write([comment])
+        except Exception:
+            logger.exception(
+                'Не удалось записать комментарий к посту %s',
+                comment.post_id
+            )
+    return written
+
+
+def flush():
+    """Записать все, что накопилось; возвращает число записанных"""
+    with _write_lock:
+        with _lock:
+            _writing[:] = _items
+            del _items[:]
+        if not _writing:
+            return 0
+        try:
+            return _write(list(_writing))
+        except Exception:
+            logger.exception(
+                'Не удалось записать пачку из %d комментариев, пишем '
+                'по одному', len(_writing)
+            )
+            return _write_each(list(_writing))
+        finally:
+            with _lock:
+                del _writing[:]
+
+
+def _full():
+    return _stopping or len(_items) >= settings.COMMENT_FLUSH_SIZE
+
+
+def _run():
+    interval = settings.COMMENT_FLUSH_INTERVAL / 1000
+    while True:
+        with _wake:
+            # условие проверяется и до ожидания: пачка могла набраться,
+            # пока поток запускался
+            _wake.wait_for(_full, interval)
+            if _stopping:
+                # остаток дописывает stop()
+                return
+        # у потока свое соединение: закрыть, если оно устарело
+        close_old_connections()
+        flush()
+
+
+def _start():
+    """Фоновый поток запускается при первом комментарии"""
+    global _thread
+    if _thread is None or not _thread.is_alive():
+        _thread = threading.Thread(
+            target=_run, name='comment-buffer', daemon=True
+        )
+        _thread.start()
+
+
+def add(comment):
+    """Поставить проверенный несохраненный комментарий в очередь;
+    дата - для показа автору, в базе будет время записи"""
+    comment.created = timezone.now()
+    with _wake:
+        _items.append(comment)
+        if _full():
+            _wake.notify()
+        _start()
+
+
+def pending(post_id, author_id):
+    """Комментарии автора к посту, еще не записанные в базу, новые
+    первыми"""
+    with _lock:
+        return [
+            comment for comment in reversed(_writing + _items)
+            if comment.post_id == post_id and comment.author_id == author_id
+        ]
+
+
+@atexit.register
+def stop():
+    """Остановить поток и дописать очередь"""
+    global _stopping, _thread
+    with _wake:
+        _stopping = True
+        _wake.notify()
+        thread = _thread
+    if thread is not None:
+        thread.join()
+    flush()
+    with _lock:
+        _stopping = False
+        _thread = None
@@ -0,0 +1,25 @@
+"""Комментарии поста страницами: на странице поста - первая страница,
+следующие подгружаются фрагментом по курсору. Стоимость страницы
+не зависит от длины обсуждения: диапазон индекса comment_post_thread,
+без COUNT(*) - число комментариев берется из счетчика поста."""
+from django.conf import settings
+
+from .paginator import CursorPaginator
+
+ORDERING = ('-created', '-pk')
+# все, что нужно карточке комментария
+THREAD_FIELDS = (
+    'text', 'created', 'post', 'author', 'author__username',
+    'author__first_name', 'author__last_name',
+)
+
+
+def page(post, cursor=None):
+    """Страница комментариев по курсору; первая - без курсора или
+    с битым курсором"""
+    comments = post.comments.select_related('author').only(*THREAD_FIELDS)
+    paginator = CursorPaginator(
+        comments, settings.COMMENTS_NUMBER, ordering=ORDERING,
+        count=post.comments_count
+    )
+    return paginator.cursor_page(cursor)
@@ -0,0 +1,144 @@
+from django.db.models import Count, F, Func, OuterRef, Subquery
+
+from .models import Comment, Counter, Follow, Post
+
+TOTAL_POSTS = 'posts'
+
+
+def author_key(author_id):
+    return f'posts:author:{author_id}'
+
+
+def group_key(group_id):
+    return f'posts:group:{group_id}'
+
+
+def followers_key(author_id):
+    return f'followers:author:{author_id}'
+
+
+def image_key(name):
+    return f'images:{name}'
+
+
+def get_value(name, queryset):
+    """Значение счетчика; при первом обращении оно один раз
+    считается по базе и сохраняется. Строка сначала создается с нулем,
+    и только потом пересчитывается одним UPDATE: запись, зафиксированная
+    между подсчетом и вставкой, иначе потерялась бы - ее прибавка ушла
+    бы в еще не существующую строку"""
+    values = Counter.objects.filter(name=name).values_list('value', flat=True)
+    value = values.first()
+    if value is None:
+        Counter.objects.bulk_create(
+            [Counter(name=name, value=0)], ignore_conflicts=True
+        )
+        total = queryset.order_by().annotate(
+            total=Func(F('pk'), function='COUNT')
+        ).values('total')
+        Counter.objects.filter(name=name).update(value=Subquery(total))
+        value = values.first()
+    return value
+
+
+def total_posts():
+    return get_value(TOTAL_POSTS, Post.objects.all())
+
+
+def author_posts(author_id):
+    return get_value(
+        author_key(author_id), Post.objects.filter(author_id=author_id)
+    )
+
+
+def group_posts(group_id):
+    return get_value(
+        group_key(group_id), Post.objects.filter(group_id=group_id)
+    )
+
+
+def followers(author_id):
+    return get_value(
+        followers_key(author_id), Follow.objects.filter(author_id=author_id)
+    )
+
+
+def image_refs(name):
+    """Сколько постов ссылается на файл картинки"""
+    return get_value(image_key(name), Post.objects.filter(image=name))
+
+
+def change(name, delta):
+    """Счетчик, которого еще нет, не трогаем - он будет посчитан
+    при первом чтении"""
+    Counter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def recount_followers(author_ids):
+    """Счетчики подписчиков авторов заново по таблице подписок: после
+    массовой записи, где число добавленных строк заранее неизвестно.
+    Недостающие строки создаются без конфликтов с параллельной записью,
+    затем все блокируются (в порядке имен, чтобы не было взаимных
+    блокировок) и только после этого считаются: подсчет видит все
+    зафиксированные до него подписки, а прибавки сигналов ждут
+    блокировки. Вызывать в транзакции"""
+    names = {followers_key(author_id): author_id for author_id in author_ids}
+    Counter.objects.bulk_create(
+        [Counter(name=name, value=0) for name in names],
+        ignore_conflicts=True
+    )
+    rows = list(Counter.objects.select_for_update().filter(
+        name__in=names
+    ).order_by('name'))
+    totals = dict(Follow.objects.filter(
+        author_id__in=names.values()
+    ).order_by().values('author').annotate(
+        total=Count('pk')
+    ).values_list('author', 'total'))
+    for row in rows:
+        row.value = totals.get(names[row.name], 0)
+    Counter.objects.bulk_update(rows, ['value'])
+
+
+def post_keys(post, group_id):
+    keys = [TOTAL_POSTS, author_key(post.author_id)]
+    if group_id is not None:
+        keys.append(group_key(group_id))
+    return keys
+
+
+def rebuild():
+    """Полный пересчет всех счетчиков, например после массовой
+    загрузки данных в обход сигналов"""
+    Counter.objects.all().delete()
+    counters = [Counter(name=TOTAL_POSTS, value=Post.objects.count())]
+    by_author = Post.objects.order_by().values('author').annotate(
+        total=Count('pk')
+    )
+    counters.extend(
+        Counter(name=author_key(row['author']), value=row['total'])
+        for row in by_author
+    )
+    by_group = Post.objects.filter(group__isnull=False).order_by().values(
+        'group'
+    ).annotate(total=Count('pk'))
+    counters.extend(
+        Counter(name=group_key(row['group']), value=row['total'])
+        for row in by_group
+    )
+    by_followed = Follow.objects.order_by().values('author').annotate(
+        total=Count('pk')
+    )
+    counters.extend(
+        Counter(name=followers_key(row['author']), value=row['total'])
+        for row in by_followed
+    )
+    Counter.objects.bulk_create(counters, batch_size=500)
+
+    comments = Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+        'post'
+    ).annotate(total=Count('pk')).values('total')
+    Post.objects.update(comments_count=0)
+    Post.objects.filter(pk__in=Comment.objects.values('post')).update(
+        comments_count=Subquery(comments)
+    )
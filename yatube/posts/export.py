@@ -0,0 +1,144 @@
+"""Потоковая выгрузка постов, комментариев и подписок.
+
+Строки читаются из базы кусками через iterator() и сразу
+превращаются в текст, поэтому память не зависит от размера таблиц.
+NDJSON - записи в формате dumpdata по одной на строку, CSV - колонка
+pk и поля модели; оба формата читает команда bulk_import."""
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Comment, Follow, Post
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Kind:
+    """Что выгружается и по каким полям фильтруется; None - фильтр
+    для этой модели не имеет смысла"""
+
+    def __init__(self, model, fields, author, group, date, owner):
+        self.model = model
+        self.fields = fields
+        self.author = author
+        self.group = group
+        self.date = date
+        # чьи это строки: обычный пользователь выгружает только свои
+        self.owner = owner
+
+    @property
+    def label(self):
+        return self.model._meta.label_lower
+
+
+KINDS = {
+    'posts': Kind(
+        Post, ['text', 'pub_date', 'author', 'group', 'image'],
+        author='author__username', group='group__slug', date='pub_date',
+        owner='author'
+    ),
+    'comments': Kind(
+        Comment, ['text', 'created', 'author', 'post'],
+        author='author__username', group='post__group__slug',
+        date='created', owner='author'
+    ),
+    'follows': Kind(
+        Follow, ['user', 'author'],
+        author='author__username', group=None, date=None, owner='user'
+    ),
+}
+
+
+def parse_day(value):
+    """Дата YYYY-MM-DD; ValueError, если строка не дата"""
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    return day
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def queryset(kind, author=None, group=None, since=None, until=None,
+             owner=None):
+    """Строки для выгрузки по порядку pk; since и until - даты
+    включительно. Границы переводятся в моменты времени, а не
+    сравниваются через __date, чтобы работал индекс по дате"""
+    kind = KINDS[kind]
+    filters = {}
+    for name, lookup, value in (
+        ('author', kind.author, author),
+        ('group', kind.group, group),
+        ('since', kind.date, since),
+        ('until', kind.date, until),
+    ):
+        if value in (None, ''):
+            continue
+        if lookup is None:
+            raise ValueError(
+                f'Фильтр {name} не применим к выгрузке {kind.label}'
+            )
+        if name == 'since':
+            filters[f'{lookup}__gte'] = day_start(value)
+        elif name == 'until':
+            filters[f'{lookup}__lt'] = day_start(value + timedelta(days=1))
+        else:
+            filters[lookup] = value
+    if owner is not None:
+        filters[kind.owner] = owner
+    attnames = [kind.model._meta.get_field(name).attname
+                for name in kind.fields]
+    return kind.model.objects.filter(**filters).order_by('pk').values_list(
+        'pk', *attnames
+    )
+
+
+def rows(kind, chunk_size=None, **filters):
+    """Кортежи (pk, поля...) без загрузки всей выборки в память"""
+    return queryset(kind, **filters).iterator(
+        chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE
+    )
+
+
+def ndjson_lines(kind, rows):
+    label = KINDS[kind].label
+    fields = KINDS[kind].fields
+    for pk, *values in rows:
+        yield json.dumps(
+            {'model': label, 'pk': pk, 'fields': dict(zip(fields, values))},
+            cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+class Line:
+    """Файл для csv.writer, который возвращает записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(kind, rows):
+    writer = csv.writer(Line())
+    yield writer.writerow(['pk', *KINDS[kind].fields])
+    for row in rows:
+        yield writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        ])
+
+
+def lines(kind, export_format, rows):
+    if export_format == 'csv':
+        return csv_lines(kind, rows)
+    return ndjson_lines(kind, rows)
@@ -0,0 +1,74 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.db import reading_from_replica
+
+VERSION_PREFIX = 'feed-version:'
+# версия, общая для всех лент: в них выводятся названия групп и имена
+# авторов
+SHARED = 'shared'
+POSTS = 'posts'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def _initial():
+    # версия, созданная заново после вытеснения из кэша, должна быть
+    # больше любой прежней, иначе ключ совпадет со старым фрагментом
+    return int(time.time() * 1000)
+
+
+def get_version(*scopes):
+    keys = [VERSION_PREFIX + scope for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial(), None)
+            versions[key] = cache.get(key)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump(*scopes):
+    for scope in scopes:
+        key = VERSION_PREFIX + scope
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial(), None)
+
+
+def post_scopes(post, *group_ids):
+    scopes = [POSTS, author_scope(post.author_id)]
+    scopes.extend(
+        group_scope(group_id) for group_id in set(group_ids)
+        if group_id is not None
+    )
+    return scopes
+
+
+def card_context():
+    return {'card_cache_timeout': settings.FEED_CACHE_TIMEOUT}
+
+
+def context(request, scope):
+    """Переменные для ключа {% cache %} ленты: версия, страница
+    и состояние авторизации"""
+    timeout = settings.FEED_CACHE_TIMEOUT
+    if reading_from_replica():
+        # отстающая реплика могла отдать ленту без поста, ради которого
+        # версия уже сменилась: такой фрагмент живет недолго
+        timeout = settings.REPLICA_PIN_SECONDS
+    return {
+        **card_context(),
+        'feed_cache_timeout': timeout,
+        'feed_version': get_version(SHARED, scope),
+        'page_key': request.GET.get('cursor') or request.GET.get('page', ''),
+    }
@@ -0,0 +1,227 @@
+"""Граф подписок в кэше.
+
+Для каждого пользователя кэшируются два отсортированных массива id
+(array('q'), 8 байт на id): на кого он подписан и кто подписан на
+него. Массив читается из основной базы одним запросом по покрывающему индексу
+при первом обращении; дальше проверка подписки - двоичный поиск,
+число подписок и подписчиков - длина массива. Сигналы Follow правят
+закэшированные массивы после фиксации транзакции; после массовой
+записи в обход сигналов (bulk_import, benchmark) граф сбрасывается
+целиком reset().
+
+С кэшем в памяти процесса (locmem) правку видит только процесс,
+сделавший запись, поэтому FOLLOW_GRAPH_TIMEOUT короткий и расхождение
+между процессами ограничено им. С общим кэшем (SHARED_CACHE) массивы
+живут долго, а запись удаляет их вместо правки на месте: чтение,
+вставка и запись из двух процессов сразу потеряли бы одну из правок."""
+import threading
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from core.db import PRIMARY
+
+from . import counters, feed_cache, timeline
+from .models import Follow
+
+# версия ключей графа хранится как версия ленты: reset() - ее сдвиг
+SCOPE = 'follow-graph'
+FOLLOWING = 'following'
+FOLLOWERS = 'followers'
+
+
+def contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def intersection(first, second):
+    """Общие id двух отсортированных массивов слиянием за O(n + m)"""
+    result = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        if first[i] < second[j]:
+            i += 1
+        elif first[i] > second[j]:
+            j += 1
+        else:
+            result.append(first[i])
+            i += 1
+            j += 1
+    return result
+
+
+class FollowGraph:
+    def __init__(self):
+        # правки массивов в кэше процесса не теряют друг друга
+        self._lock = threading.Lock()
+
+    def _key(self, kind, user_id):
+        version = feed_cache.get_version(SCOPE)
+        return f'follow-graph:{version}:{kind}:{user_id}'
+
+    def _load(self, kind, user_id):
+        # всегда с основной базы, даже в лентах с чтением с реплики:
+        # массив, прочитанный с отстающей реплики сразу после правки,
+        # остался бы в кэше на весь FOLLOW_GRAPH_TIMEOUT
+        follows = Follow.objects.using(PRIMARY)
+        if kind == FOLLOWING:
+            ids = follows.filter(user_id=user_id).order_by(
+                'author_id'
+            ).values_list('author_id', flat=True)
+        else:
+            ids = follows.filter(author_id=user_id).order_by(
+                'user_id'
+            ).values_list('user_id', flat=True)
+        return array('q', ids)
+
+    def _ids(self, kind, user_id):
+        if user_id is None:
+            return array('q')
+        key = self._key(kind, user_id)
+        ids = cache.get(key)
+        if ids is None:
+            ids = self._load(kind, user_id)
+            cache.set(key, ids, settings.FOLLOW_GRAPH_TIMEOUT)
+        return ids
+
+    def following(self, user_id):
+        """Отсортированные id авторов, на которых подписан пользователь"""
+        return self._ids(FOLLOWING, user_id)
+
+    def followers(self, user_id):
+        """Отсортированные id подписчиков пользователя"""
+        return self._ids(FOLLOWERS, user_id)
+
+    def is_following(self, user_id, author_id):
+        return contains(self.following(user_id), author_id)
+
+    def following_count(self, user_id):
+        return len(self.following(user_id))
+
+    def followers_count(self, user_id):
+        return len(self.followers(user_id))
+
+    def is_mutual(self, user_id, other_id):
+        return (
+            self.is_following(user_id, other_id)
+            and self.is_following(other_id, user_id)
+        )
+
+    def mutual(self, user_id):
+        """id тех, с кем пользователь подписан друг на друга"""
+        return intersection(self.following(user_id), self.followers(user_id))
+
+    def _change(self, kind, user_id, value, add):
+        """Правка закэшированного массива; если его нет в кэше, он
+        прочитается из базы при следующем обращении"""
+        key = self._key(kind, user_id)
+        if settings.SHARED_CACHE:
+            # блокировка процесса не защищает от других процессов
+            cache.delete(key)
+            return
+        with self._lock:
+            ids = cache.get(key)
+            if ids is None:
+                return
+            index = bisect_left(ids, value)
+            present = index < len(ids) and ids[index] == value
+            if add and not present:
+                ids.insert(index, value)
+            elif not add and present:
+                del ids[index]
+            cache.set(key, ids, settings.FOLLOW_GRAPH_TIMEOUT)
+
+    def changed(self, user_id, author_id, add):
+        """Подписка добавлена или удалена (сигналы модели Follow):
+        массивы в кэше правятся после фиксации транзакции, так что
+        откаченная запись в них не попадет"""
+        self.changed_many(user_id, [author_id], add)
+
+    def changed_many(self, user_id, author_ids, add):
+        def update():
+            for author_id in author_ids:
+                self._change(FOLLOWING, user_id, author_id, add)
+                self._change(FOLLOWERS, author_id, user_id, add)
+        transaction.on_commit(update)
+
+    def follow(self, user, author):
+        """Подписка; True, если ее не было"""
+        follow, created = Follow.objects.get_or_create(
+            user=user, author=author
+        )
+        return created
+
+    def unfollow(self, user, author):
+        """Отписка; True, если подписка была"""
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+        return bool(deleted)
+
+    def follow_many(self, user_id, author_ids):
+        """Подписка на многих авторов за постоянное число запросов:
+        новые подписки - один bulk_create, на уже существующие его
+        бережет ограничение unique_follow. bulk_create не шлет
+        сигналов, поэтому счетчики подписчиков (пересчетом по
+        таблице), ленту и граф обновляет сам. Возвращает id авторов,
+        подписка на которых добавлена"""
+        author_ids = set(author_ids) - {user_id}
+        with transaction.atomic():
+            existing = set(Follow.objects.filter(
+                user_id=user_id, author_id__in=author_ids
+            ).values_list('author_id', flat=True))
+            added = sorted(author_ids - existing)
+            if not added:
+                return []
+            Follow.objects.bulk_create([
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in added
+            ], ignore_conflicts=True)
+            # те же подписки мог успеть добавить параллельный запрос,
+            # и bulk_create молча их пропустил: счетчики не прибавляются
+            # к списку added, а пересчитываются по таблице
+            counters.recount_followers(added)
+            timeline.backfill_authors(user_id, added)
+            self.changed_many(user_id, added, add=True)
+        return added
+
+    def _delete_follows(self, user_id, author_ids):
+        quote = connection.ops.quote_name
+        meta = Follow._meta
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {quote(meta.db_table)} '
+                f'WHERE {quote(meta.get_field("user").column)} = %s '
+                f'AND {quote(meta.get_field("author").column)} IN '
+                f'({", ".join(["%s"] * len(author_ids))})',
+                [user_id, *author_ids]
+            )
+
+    def unfollow_many(self, user_id, author_ids):
+        """Отписка от многих авторов; возвращает id авторов, подписка
+        на которых была"""
+        with transaction.atomic():
+            follows = Follow.objects.filter(
+                user_id=user_id, author_id__in=set(author_ids)
+            )
+            removed = sorted(follows.values_list('author_id', flat=True))
+            if not removed:
+                return []
+            # удаление одним запросом: delete() прислал бы сигналы на
+            # каждую строку, и счетчики с лентой поправились бы дважды;
+            # на подписки ничто не ссылается, каскадов нет
+            self._delete_follows(user_id, removed)
+            counters.recount_followers(removed)
+            timeline.prune_authors(user_id, removed)
+            timeline.followers_dropped(removed)
+            self.changed_many(user_id, removed, add=False)
+        return removed
+
+    def reset(self):
+        """Забыть весь граф: после записи подписок в обход сигналов"""
+        feed_cache.bump(SCOPE)
+
+
+graph = FollowGraph()
@@ -1,5 +1,8 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 
+from . import uploads
 from .models import Post, Comment
 
 
@@ -17,6 +20,28 @@ class PostForm(forms.ModelForm):
             'image': 'Картинка поста'
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # размер файла и картинки проверяются до того, как ImageField
+        # откроет ее в Pillow; отклоненный файл в форму не попадает
+        self.upload_error = None
+        upload = self.files.get('image')
+        if upload:
+            try:
+                uploads.check(upload)
+            except ValidationError as error:
+                self.upload_error = error
+                self.files = self.files.copy()
+                del self.files['image']
+
+    def clean_image(self):
+        if self.upload_error:
+            raise self.upload_error
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            image = uploads.ingest(image)
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
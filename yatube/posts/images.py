@@ -0,0 +1,185 @@
+import io
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from . import counters
+from .models import Counter, ImageDerivative, Post
+
+logger = logging.getLogger(__name__)
+
+# пропорции картинки в карточке и на странице поста
+RATIO = (960, 339)
+# запасной формат, который понимают все браузеры, для <img>
+FALLBACK = 'JPEG'
+EXIF_ORIENTATION = 0x0112
+MIME_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+}
+
+
+def formats():
+    """Форматы из настроек, которые умеет сохранять Pillow; запасной
+    формат сохраняется всегда"""
+    Image.init()
+    result = [
+        fmt for fmt in settings.POST_IMAGE_FORMATS
+        if fmt in Image.SAVE and fmt != FALLBACK
+    ]
+    return result + [FALLBACK]
+
+
+def widths(source_width):
+    """Ширины не больше исходной картинки; самая маленькая остается
+    всегда, чтобы у <img> был хотя бы один вариант"""
+    allowed = sorted(settings.POST_IMAGE_WIDTHS)
+    return [
+        width for width in allowed if width <= source_width
+    ] or allowed[:1]
+
+
+def _encode(image, fmt):
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, quality=settings.POST_IMAGE_QUALITY)
+    return buffer.getvalue()
+
+
+def derivative_dir(source):
+    """Каталог копий картинки: одна и та же картинка, загруженная в
+    разные посты, хранится один раз, поэтому и копии у нее общие"""
+    return os.path.join('derivatives', os.path.splitext(source)[0])
+
+
+def _source_size(image):
+    width, height = image.size
+    # повороты на 90 градусов по EXIF меняют стороны местами
+    if image.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+        return height, width
+    return width, height
+
+
+def _decode(source):
+    image = ImageOps.exif_transpose(Image.open(source))
+    image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info
+                              else 'RGB')
+    return image
+
+
+def build(post):
+    """Создает копии картинки поста во всех ширинах и форматах взамен
+    прежних; уже готовые файлы копий не пересоздаются"""
+    post.derivatives.all().delete()
+    name = post.image.name
+    storage = ImageDerivative._meta.get_field('file').storage
+    directory = derivative_dir(name)
+    created = []
+    with post.image.open('rb') as source:
+        # заголовка хватает, чтобы узнать, какие копии нужны
+        source_width, _ = _source_size(Image.open(source))
+        image = None
+        for width in widths(source_width):
+            height = round(width * RATIO[1] / RATIO[0])
+            resized = None
+            for fmt in formats():
+                path = os.path.join(directory, f'{width}.{fmt.lower()}')
+                if not storage.exists(path):
+                    if resized is None:
+                        if image is None:
+                            source.seek(0)
+                            image = _decode(source)
+                        resized = ImageOps.fit(
+                            image, (width, height), Image.LANCZOS,
+                            centering=(0.5, 0.5)
+                        )
+                    path = storage.save(
+                        path, ContentFile(_encode(resized, fmt))
+                    )
+                created.append(ImageDerivative(
+                    post=post, source=name, file=path, format=fmt.lower(),
+                    width=width, height=height
+                ))
+    return ImageDerivative.objects.bulk_create(created)
+
+
+def acquire(name):
+    counters.change(counters.image_key(name), 1)
+
+
+def release(name):
+    """Пост больше не ссылается на картинку; файл и его копии удаляются
+    после фиксации транзакции, если на него не ссылается никто"""
+    counters.change(counters.image_key(name), -1)
+    transaction.on_commit(lambda: collect(name))
+
+
+def _recently_saved(name):
+    """Файл картинки записан или переиспользован загрузкой недавно:
+    пост с ним, возможно, еще не зафиксирован и не посчитан"""
+    path = Post._meta.get_field('image').storage.path(name)
+    try:
+        modified = os.path.getmtime(path)
+    except FileNotFoundError:
+        return False
+    return time.time() - modified < settings.POST_IMAGE_COLLECT_GRACE
+
+
+def collect(name):
+    """Удаляет файл картинки и ее копии, если на нее не ссылается ни
+    один пост. Число ссылок перепроверяется под блокировкой строки
+    счетчика: после release пост с той же картинкой мог сохраниться"""
+    key = counters.image_key(name)
+    try:
+        # счетчика может не быть: он посчитается по базе
+        counters.image_refs(name)
+        with transaction.atomic():
+            refs = Counter.objects.select_for_update().filter(
+                name=key
+            ).values_list('value', flat=True).first()
+            if refs is None or refs > 0 or _recently_saved(name):
+                return
+            Counter.objects.filter(name=key).delete()
+            ImageDerivative.objects.filter(source=name).delete()
+        storage = ImageDerivative._meta.get_field('file').storage
+        directory = derivative_dir(name)
+        if storage.exists(directory):
+            for file_name in storage.listdir(directory)[1]:
+                storage.delete(os.path.join(directory, file_name))
+            os.rmdir(storage.path(directory))
+        Post._meta.get_field('image').storage.delete(name)
+    except Exception:
+        logger.exception('Не удалось удалить картинку %s', name)
+
+
+def sources(post):
+    """Готовые копии текущей картинки поста, сгруппированные по формату
+    в порядке предпочтения; пустой словарь, если копий еще нет"""
+    ready = [
+        derivative for derivative in post.derivatives.all()
+        if derivative.source == post.image.name
+    ]
+    grouped = {}
+    for fmt in formats():
+        variants = sorted(
+            (d for d in ready if d.format == fmt.lower()),
+            key=lambda d: d.width
+        )
+        if variants:
+            grouped[fmt] = variants
+    if FALLBACK not in grouped:
+        return {}
+    return grouped
+
+
+def srcset(variants):
+    return ', '.join(f'{d.file.url} {d.width}w' for d in variants)
@@ -0,0 +1,309 @@
+"""Обратный индекс на чистом Python для баз без полнотекстового поиска.
+
+Основной сегмент - один файл: 8 байт длины словаря, словарь в JSON
+(терм -> смещение и длина списка), затем списки вхождений - массив
+uint32 вида [id документа, число позиций, позиции...] для каждого
+документа по возрастанию id. Файл читается через mmap, списки берутся
+срезами memoryview без копирования.
+
+Изменения пишутся в журнал (одна JSON-строка на документ) и при
+запросе накладываются на сегмент; когда журнал дорастает до
+merge_at записей, он вливается в новый сегмент."""
+import array
+import fcntl
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import defaultdict
+
+from .stemmer import stem
+
+SEGMENT = 'index.bin'
+JOURNAL = 'journal.jsonl'
+LOCK = 'index.lock'
+HEADER = struct.Struct('<Q')
+ITEM_SIZE = array.array('I').itemsize
+
+TOKEN_RE = re.compile(r'[0-9a-zа-яё]+')
+# разрыв позиций между текстами документа: фраза не склеивает
+# конец поста с началом комментария
+FIELD_GAP = 10
+
+WORD, PHRASE = 'word', 'phrase'
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokens(text):
+    return [stem(token) for token in TOKEN_RE.findall(text.lower())]
+
+
+def positions(texts):
+    """Позиции термов в документе из нескольких текстов"""
+    result = defaultdict(list)
+    offset = 0
+    for text in texts:
+        terms = tokens(text)
+        for position, term in enumerate(terms):
+            result[term].append(offset + position)
+        offset += len(terms) + FIELD_GAP
+    return result
+
+
+def parse(query):
+    """Запрос - слова и фразы в кавычках; все они обязательны (явный
+    AND ничего не меняет), OR между ними разделяет альтернативы:
+    [[(вид, термы), ...], ...]"""
+    clauses = [[]]
+    for phrase, word in QUERY_RE.findall(query):
+        if word == 'OR':
+            clauses.append([])
+            continue
+        if word == 'AND':
+            continue
+        terms = tokens(phrase or word)
+        if not terms:
+            continue
+        kind = PHRASE if phrase and len(terms) > 1 else WORD
+        if kind == WORD:
+            clauses[-1].extend((WORD, [term]) for term in terms)
+        else:
+            clauses[-1].append((PHRASE, terms))
+    return [clause for clause in clauses if clause]
+
+
+class Segment:
+    def __init__(self, path):
+        self.lexicon = {}
+        self.items = memoryview(array.array('I'))
+        self._file = self._map = self._view = None
+        if not os.path.exists(path) or not os.path.getsize(path):
+            return
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (length,) = HEADER.unpack_from(self._map)
+        start = HEADER.size
+        self.lexicon = json.loads(self._map[start:start + length])
+        start += length
+        start += -start % ITEM_SIZE
+        self._view = memoryview(self._map)
+        self.items = self._view[start:].cast('I')
+
+    def postings(self, term):
+        """{id документа: позиции} для терма"""
+        if term not in self.lexicon:
+            return {}
+        offset, length = self.lexicon[term]
+        items = self.items[offset:offset + length]
+        result = {}
+        i = 0
+        while i < length:
+            count = items[i + 1]
+            result[items[i]] = items[i + 2:i + 2 + count].tolist()
+            i += 2 + count
+        return result
+
+    def documents(self):
+        """Все документы сегмента как {id: {терм: позиции}}"""
+        result = defaultdict(dict)
+        for term in self.lexicon:
+            for doc_id, found in self.postings(term).items():
+                result[doc_id][term] = found
+        return result
+
+    def close(self):
+        self.items.release()
+        if self._map is not None:
+            self._view.release()
+            self._map.close()
+            self._file.close()
+
+
+def write_segment(path, documents):
+    """documents: {id: {терм: позиции}}; файл заменяется атомарно"""
+    by_term = defaultdict(list)
+    for doc_id in sorted(documents):
+        for term, found in documents[doc_id].items():
+            by_term[term].append((doc_id, found))
+    items = array.array('I')
+    lexicon = {}
+    for term in sorted(by_term):
+        offset = len(items)
+        for doc_id, found in by_term[term]:
+            items.append(doc_id)
+            items.append(len(found))
+            items.extend(found)
+        lexicon[term] = [offset, len(items) - offset]
+    header = json.dumps(lexicon, ensure_ascii=False).encode()
+    padding = -(HEADER.size + len(header)) % ITEM_SIZE
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(len(header)))
+        file.write(header)
+        file.write(b'\0' * padding)
+        items.tofile(file)
+    os.replace(temporary, path)
+
+
+class InvertedIndex:
+    def __init__(self, directory, merge_at=1000):
+        self.directory = directory
+        self.merge_at = merge_at
+        self._lock = threading.Lock()
+        self._segment = None
+        self._segment_stamp = None
+        self._journal = {}
+        self._journal_stamp = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _file_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        file = open(self.path(LOCK), 'a')
+        fcntl.flock(file, fcntl.LOCK_EX)
+        return file
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _load(self):
+        """Сегмент и журнал перечитываются, только если файлы
+        изменились, в том числе другим процессом"""
+        stamp = self._stamp(self.path(SEGMENT))
+        if self._segment is None or stamp != self._segment_stamp:
+            if self._segment is not None:
+                self._segment.close()
+            self._segment = Segment(self.path(SEGMENT))
+            self._segment_stamp = stamp
+        stamp = self._stamp(self.path(JOURNAL))
+        if stamp != self._journal_stamp:
+            self._journal = self._read_journal()
+            self._journal_stamp = stamp
+        return self._segment, self._journal
+
+    def _read_journal(self):
+        journal = {}
+        try:
+            with open(self.path(JOURNAL), encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # строка, дописываемая прямо сейчас
+                        continue
+                    journal[entry['id']] = entry['terms']
+        except FileNotFoundError:
+            pass
+        return journal
+
+    def update(self, documents):
+        """documents: {id: [тексты]}; пустой список удаляет документ"""
+        lines = ''.join(
+            json.dumps(
+                {'id': doc_id, 'terms': positions(texts)},
+                ensure_ascii=False
+            ) + '\n'
+            for doc_id, texts in documents.items()
+        )
+        lock = self._file_lock()
+        try:
+            with open(self.path(JOURNAL), 'a', encoding='utf-8') as file:
+                file.write(lines)
+            with self._lock:
+                _, journal = self._load()
+                full = len(journal) >= self.merge_at
+            if full:
+                self._merge()
+        finally:
+            lock.close()
+
+    def remove(self, doc_ids):
+        self.update({doc_id: [] for doc_id in doc_ids})
+
+    def _merge(self):
+        """Вливает журнал в новый сегмент; вызывается под файловой
+        блокировкой"""
+        with self._lock:
+            segment, journal = self._load()
+            documents = segment.documents()
+            for doc_id, terms in journal.items():
+                if terms:
+                    documents[doc_id] = terms
+                else:
+                    documents.pop(doc_id, None)
+            write_segment(self.path(SEGMENT), documents)
+            open(self.path(JOURNAL), 'w').close()
+
+    def merge(self):
+        lock = self._file_lock()
+        try:
+            self._merge()
+        finally:
+            lock.close()
+
+    def rebuild(self, documents):
+        """documents: итератор пар (id, [тексты])"""
+        lock = self._file_lock()
+        try:
+            write_segment(self.path(SEGMENT), {
+                doc_id: positions(texts) for doc_id, texts in documents
+            })
+            open(self.path(JOURNAL), 'w').close()
+        finally:
+            lock.close()
+
+    def _postings(self, term):
+        segment, journal = self._load()
+        result = {
+            doc_id: found for doc_id, found in segment.postings(term).items()
+            if doc_id not in journal
+        }
+        for doc_id, terms in journal.items():
+            if term in terms:
+                result[doc_id] = terms[term]
+        return result
+
+    def _phrase(self, terms):
+        """Документы, где термы идут подряд, и число таких мест"""
+        postings = [self._postings(term) for term in terms]
+        common = set(postings[0]).intersection(*postings[1:])
+        result = {}
+        for doc_id in common:
+            starts = set(postings[0][doc_id])
+            for shift, found in enumerate(postings[1:], start=1):
+                starts &= {position - shift for position in found[doc_id]}
+            if starts:
+                result[doc_id] = len(starts)
+        return result
+
+    def search(self, query, limit):
+        """id документов по убыванию числа совпадений"""
+        scores = defaultdict(int)
+        with self._lock:
+            for clause in parse(query):
+                matched = None
+                clause_scores = defaultdict(int)
+                for kind, terms in clause:
+                    if kind == PHRASE:
+                        found = self._phrase(terms)
+                    else:
+                        found = {
+                            doc_id: len(places) for doc_id, places in
+                            self._postings(terms[0]).items()
+                        }
+                    keys = set(found)
+                    matched = keys if matched is None else matched & keys
+                    for doc_id, score in found.items():
+                        clause_scores[doc_id] += score
+                for doc_id in matched or ():
+                    scores[doc_id] = max(scores[doc_id], clause_scores[doc_id])
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], -doc_id))
+        return ranked[:limit]
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from posts import benchmark
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочные замеры лент, поста, публикации и комментариев на '
+        'синтетических данных во временной базе; отчет - JSON для '
+        'сравнения между коммитами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.1,
+            help='Доля постов с картинкой'
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степенного распределения подписок и постов'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--scenario', action='append', choices=benchmark.SCENARIOS,
+            help='Сценарий; можно несколько, по умолчанию все'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Запросов на сценарий у клиента и на поток у WSGI'
+        )
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--output', '-o', help='Файл отчета JSON')
+        parser.add_argument(
+            '--compare', help='Отчет прошлого запуска для сравнения'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['threads'] < 1:
+            raise CommandError('--requests и --threads должны быть '
+                               'положительными')
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                baseline = json.load(file)
+
+        with tempfile.TemporaryDirectory() as directory:
+            report = self.measure(directory, options)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, ensure_ascii=False,
+                                         indent=2))
+        if baseline is not None:
+            for line in benchmark.compare(baseline, report):
+                self.stdout.write(line)
+
+    def measure(self, directory, options):
+        """Заполнение и замеры во временной базе, как у тестов; файлы
+        картинок и поисковый индекс - во временном каталоге. Временная
+        база создается только для 'default', поэтому реплики на время
+        замеров отключены: иначе ленты читали бы настоящие реплики"""
+        if connection.vendor == 'sqlite':
+            # файл, а не общая память: запись из нескольких потоков
+            # ждет блокировку, а не падает
+            connection.settings_dict['TEST'] = {
+                'NAME': os.path.join(directory, 'benchmark.sqlite3')
+            }
+        overrides = override_settings(
+            DEBUG=False,
+            MEDIA_ROOT=os.path.join(directory, 'media'),
+            SEARCH_INDEX_DIR=os.path.join(directory, 'search_index'),
+            THUMBNAIL_WORKERS=0,
+            DATABASE_REPLICAS=[],
+        )
+        if settings.DATABASE_REPLICAS:
+            self.stderr.write('Реплики на время замеров отключены: '
+                              + ', '.join(settings.DATABASE_REPLICAS))
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        # строка лога на каждый запрос замеров не нужна
+        metrics_logger = logging.getLogger('core.metrics')
+        level = metrics_logger.level
+        metrics_logger.setLevel(logging.WARNING)
+        try:
+            with overrides:
+                self.stderr.write('Заполнение базы...')
+                dataset = benchmark.seed(
+                    users=options['users'], groups=options['groups'],
+                    posts=options['posts'], comments=options['comments'],
+                    image_ratio=options['image_ratio'],
+                    alpha=options['alpha'], seed_value=options['seed'],
+                )
+                self.stderr.write('Замеры...')
+                results = benchmark.run(
+                    dataset,
+                    scenarios=options['scenario'] or benchmark.SCENARIOS,
+                    requests=options['requests'],
+                    threads=options['threads'], seed_value=options['seed'],
+                )
+        finally:
+            metrics_logger.setLevel(level)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        return {
+            'meta': {
+                'commit': git_commit(),
+                'date': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                # все чтения - с временной базы, настроенные реплики
+                # в замерах не участвуют
+                'replicas_disabled': settings.DATABASE_REPLICAS,
+                'dataset': dataset.params,
+                'requests': options['requests'],
+                'threads': options['threads'],
+            },
+            'results': results,
+        }
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации авторов для всех пользователей по '
+        'таблице подписок; запускается периодически, например из cron'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Читателей в одной транзакции записи'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        started = time.monotonic()
+        written = recommendations.build(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано рекомендаций: {written} за '
+            f'{time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,255 @@
+import csv
+import json
+import time
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from posts import counters, feed_cache, search, timeline
+from posts.bulk import date_fields, keep_dates
+from posts.follow_graph import graph
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+FORMATS = ('json', 'ndjson', 'csv')
+CHUNK_SIZE = 64 * 1024
+# как часто печатать скорость загрузки, секунды
+PROGRESS_INTERVAL = 5
+
+
+def import_models():
+    """Загружаемые модели по метке в формате dumpdata"""
+    return {
+        model._meta.label_lower: model
+        for model in (User, Group, Post, Comment, Follow)
+    }
+
+
+def _skip_separators(buffer, position):
+    while position < len(buffer) and buffer[position] in ' \t\r\n,':
+        position += 1
+    return position
+
+
+def read_json_array(file):
+    """Потоковый разбор JSON-массива объектов: в памяти только
+    недочитанный хвост буфера, а не весь файл"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    # до '[' массива
+    while not buffer.lstrip():
+        chunk = file.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        buffer += chunk
+    buffer = buffer.lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидался JSON-массив объектов')
+    buffer = buffer[1:]
+    chunk = True
+    while chunk:
+        chunk = file.read(CHUNK_SIZE)
+        buffer += chunk
+        position = _skip_separators(buffer, 0)
+        while position < len(buffer):
+            if buffer[position] == ']':
+                return
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                # объект еще не дочитан
+                break
+            yield record
+            position = _skip_separators(buffer, position)
+        buffer = buffer[position:]
+    raise CommandError('Файл JSON оборван')
+
+
+def read_ndjson(file):
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            raise CommandError(f'Строка {number}: некорректный JSON')
+
+
+def read_csv(file, label):
+    """Строка CSV - поля одного объекта; pk - необязательная колонка"""
+    for row in csv.DictReader(file):
+        pk = row.pop('pk', None) or None
+        yield {'model': label, 'pk': pk, 'fields': row}
+
+
+READERS = {
+    'json': lambda file, label: read_json_array(file),
+    'ndjson': lambda file, label: read_ndjson(file),
+    'csv': read_csv,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Массовая загрузка пользователей, групп, постов, комментариев '
+        'и подписок из JSON (формат dumpdata), NDJSON или CSV через '
+        'bulk_create; счетчики, ленты и поисковый индекс пересобираются '
+        'один раз в конце'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл для загрузки')
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла; по умолчанию - по расширению'
+        )
+        parser.add_argument(
+            '--model', choices=sorted(import_models()),
+            help='Модель строк CSV'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Объектов в одном INSERT'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in FORMATS:
+            raise CommandError(f'Неизвестный формат: {file_format}')
+        if file_format == 'csv' and not options['model']:
+            raise CommandError('Для CSV нужно указать --model')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        self.batch_size = options['batch_size']
+        self.models = import_models()
+        self.buffers = {model: [] for model in self.models.values()}
+        self.loaded = {model: 0 for model in self.models.values()}
+        # запоминаются до keep_dates, который снимает флаги auto_now
+        self.date_fields = {
+            model: [field.attname for field in date_fields(model)]
+            for model in self.models.values()
+        }
+        self.skipped = 0
+        self.started = self.reported = time.monotonic()
+
+        with open(path, encoding='utf-8', newline='') as file:
+            self.load(READERS[file_format](file, options['model']))
+        loaded = sum(self.loaded.values())
+        elapsed = time.monotonic() - self.started
+
+        rebuild_started = time.monotonic()
+        self.rebuild()
+        rebuild_elapsed = time.monotonic() - rebuild_started
+
+        for model, count in self.loaded.items():
+            if count:
+                self.stdout.write(f'{model._meta.label_lower}: {count}')
+        if self.skipped:
+            self.stdout.write(f'Пропущено записей других моделей: '
+                              f'{self.skipped}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {loaded} объектов за {elapsed:.1f} с '
+            f'({loaded / max(elapsed, 1e-6):.0f} в секунду), '
+            f'пересборка счетчиков, лент и индекса - '
+            f'{rebuild_elapsed:.1f} с'
+        ))
+
+    def load(self, records):
+        """Вся загрузка - одна транзакция: при ошибке база остается
+        прежней. Внешние ключи проверяются один раз в конце, поэтому
+        объект в файле может ссылаться на идущий ниже"""
+        with connection.constraint_checks_disabled():
+            with transaction.atomic(), keep_dates(self.models.values()):
+                for record in records:
+                    self.add(record)
+                for model in self.models.values():
+                    self.flush(model)
+                connection.check_constraints(table_names=[
+                    model._meta.db_table for model in self.models.values()
+                ])
+                self.reset_sequences()
+
+    def build(self, model, record):
+        values = {}
+        for name, value in record.get('fields', {}).items():
+            field = model._meta.get_field(name)
+            if field.many_to_many:
+                continue
+            if value == '' and field.null:
+                value = None
+            if field.is_relation:
+                values[field.attname] = (
+                    None if value is None
+                    else field.target_field.to_python(value)
+                )
+            else:
+                value = field.to_python(value)
+                if isinstance(value, datetime) and timezone.is_naive(value):
+                    value = timezone.make_aware(value)
+                values[field.attname] = value
+        for attname in self.date_fields[model]:
+            if values.get(attname) is None:
+                values[attname] = timezone.now()
+        if record.get('pk') is not None:
+            values[model._meta.pk.attname] = model._meta.pk.to_python(
+                record['pk']
+            )
+        return model(**values)
+
+    def add(self, record):
+        model = self.models.get(record.get('model', '').lower())
+        if model is None:
+            self.skipped += 1
+            return
+        try:
+            obj = self.build(model, record)
+        except Exception as error:
+            raise CommandError(
+                f'{record.get("model")} pk={record.get("pk")}: {error}'
+            )
+        self.buffers[model].append(obj)
+        if len(self.buffers[model]) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        batch = self.buffers[model]
+        if not batch:
+            return
+        model.objects.bulk_create(batch, batch_size=self.batch_size)
+        self.loaded[model] += len(batch)
+        self.buffers[model] = []
+        now = time.monotonic()
+        if now - self.reported >= PROGRESS_INTERVAL:
+            self.reported = now
+            loaded = sum(self.loaded.values())
+            self.stdout.write(
+                f'{loaded} объектов, '
+                f'{loaded / (now - self.started):.0f} в секунду'
+            )
+
+    def reset_sequences(self):
+        """После вставки с явными pk счетчики автоинкремента (PostgreSQL,
+        Oracle) нужно подвинуть, как это делает loaddata"""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(self.models.values())
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def rebuild(self):
+        """Денормализованные данные, которые при обычной записи ведут
+        сигналы, пересчитываются один раз"""
+        with transaction.atomic():
+            counters.rebuild()
+            timeline.rebuild()
+        search.rebuild()
+        feed_cache.bump(feed_cache.SHARED)
+        graph.reset()
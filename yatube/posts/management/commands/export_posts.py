@@ -0,0 +1,75 @@
+import argparse
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоковая выгрузка постов, комментариев или подписок в NDJSON '
+        'или CSV; память не зависит от размера таблиц'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', choices=sorted(export.KINDS), default='posts',
+            help='Что выгружать'
+        )
+        parser.add_argument(
+            '--format', choices=export.FORMATS, default='ndjson',
+            help='Формат выгрузки'
+        )
+        parser.add_argument('--author', help='Имя пользователя автора')
+        parser.add_argument('--group', help='Слаг группы')
+        parser.add_argument(
+            '--since', type=self.day, help='С даты YYYY-MM-DD включительно'
+        )
+        parser.add_argument(
+            '--until', type=self.day, help='По дату YYYY-MM-DD включительно'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Строк в одном чтении из базы; по умолчанию '
+                 'EXPORT_CHUNK_SIZE'
+        )
+        parser.add_argument(
+            '--output', '-o', help='Файл выгрузки; по умолчанию stdout'
+        )
+
+    @staticmethod
+    def day(value):
+        try:
+            return export.parse_day(value)
+        except ValueError as error:
+            raise argparse.ArgumentTypeError(str(error))
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным')
+        kind = options['kind']
+        try:
+            rows = export.rows(
+                kind, chunk_size=options['chunk_size'],
+                author=options['author'], group=options['group'],
+                since=options['since'], until=options['until'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.count = 0
+        lines = export.lines(kind, options['format'], self.counted(rows))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as file:
+                file.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+        # сводка в stderr, чтобы не смешиваться с выгрузкой в stdout
+        self.stderr.write(f'Выгружено записей: {self.count}',
+                          style_func=self.style.SUCCESS)
+
+    def counted(self, rows):
+        for row in rows:
+            self.count += 1
+            yield row
@@ -0,0 +1,81 @@
+import csv
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts.follow_graph import graph
+
+User = get_user_model()
+
+COLUMNS = ('user', 'author')
+# имен пользователей в одном запросе: ниже предела параметров SQLite
+LOOKUP_SIZE = 500
+
+
+def read_follows(file):
+    """Подписки из CSV с колонками user,author (имена пользователей),
+    сгруппированные по подписчику"""
+    reader = csv.DictReader(file)
+    missing = set(COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise CommandError(
+            f'В CSV нет колонок: {", ".join(sorted(missing))}'
+        )
+    follows = defaultdict(set)
+    for row in reader:
+        user, author = row['user'].strip(), row['author'].strip()
+        if user and author:
+            follows[user].add(author)
+    return follows
+
+
+def user_ids(names):
+    """Имя -> id для найденных пользователей, запрос на LOOKUP_SIZE имен"""
+    names = sorted(names)
+    found = {}
+    for start in range(0, len(names), LOOKUP_SIZE):
+        found.update(User.objects.filter(
+            username__in=names[start:start + LOOKUP_SIZE]
+        ).values_list('username', 'pk'))
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        'Загрузка подписок из CSV с колонками user,author (имена '
+        'пользователей): подписки каждого пользователя добавляются '
+        'одним bulk_create, существующие пропускаются; счетчики, ленты '
+        'и граф подписок обновляются сразу'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл CSV')
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding='utf-8', newline='') as file:
+            follows = read_follows(file)
+        ids = user_ids(set(follows).union(*follows.values()))
+        unknown = set()
+        added = rows = 0
+        # все или ничего, как у bulk_import
+        with transaction.atomic():
+            for user, authors in follows.items():
+                rows += len(authors)
+                unknown.update(
+                    name for name in authors | {user} if name not in ids
+                )
+                if user not in ids:
+                    continue
+                added += len(graph.follow_many(ids[user], [
+                    ids[name] for name in authors if name in ids
+                ]))
+        if unknown:
+            self.stdout.write(
+                f'Не найдены пользователи ({len(unknown)}): '
+                f'{", ".join(sorted(unknown)[:20])}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено подписок: {added} из {rows}'
+        ))
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:50
+
+from django.db import migrations, models
+import posts.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='counter',
+            name='name',
+            field=models.CharField(max_length=150, unique=True, verbose_name='Счетчик'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=posts.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка'),
+        ),
+    ]
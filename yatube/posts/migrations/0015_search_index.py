@@ -0,0 +1,55 @@
+# Generated by Django 2.2.16 on 2026-10-18 09:12
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    """Таблица поискового индекса под движок базы; если движок не
+    поддерживает индекс, поиск работает перебором"""
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE posts_post_fts USING fts5("
+                "text, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except Exception:
+            # SQLite собран без FTS5
+            return
+        schema_editor.execute(
+            'INSERT INTO posts_post_fts (rowid, text) '
+            'SELECT id, text FROM posts_post'
+        )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE posts_post_search ('
+            'post_id integer PRIMARY KEY REFERENCES posts_post (id) '
+            'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX posts_post_search_document '
+            'ON posts_post_search USING gin (document)'
+        )
+        schema_editor.execute(
+            'INSERT INTO posts_post_search (post_id, document) '
+            'SELECT id, to_tsvector(%s, text) FROM posts_post',
+            params=[settings.SEARCH_CONFIG]
+        )
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute('DROP TABLE IF EXISTS posts_post_fts')
+    schema_editor.execute('DROP TABLE IF EXISTS posts_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
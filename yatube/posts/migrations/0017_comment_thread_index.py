@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_feed_indexes'),
+    ]
+
+    operations = [
+        # новый индекс создается до удаления старого, чтобы запросы
+        # комментариев не оставались без индекса
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created', 'id'], name='comment_post_thread'),
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_post_created',
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -17,6 +19,26 @@ class Group(models.Model):
         verbose_name_plural = 'Группы пользователей'
 
 
+class PostQuerySet(models.QuerySet):
+    # все, что нужно карточке поста и паджинатору лент
+    FEED_FIELDS = (
+        'text', 'pub_date', 'updated_at', 'image', 'comments_count',
+        'author', 'author__username', 'author__first_name',
+        'author__last_name', 'group', 'group__title', 'group__slug',
+    )
+
+    def for_feed(self):
+        return self.select_related('author', 'group').only(
+            *self.FEED_FIELDS
+        ).prefetch_related('derivatives')
+
+    def for_detail(self):
+        # комментарии выбираются страницами, см. posts.comments
+        return self.select_related('author', 'group').prefetch_related(
+            'derivatives'
+        )
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста',
@@ -27,9 +49,11 @@ class Post(models.Model):
         verbose_name='Дата публикации',
         db_index=True
     )
+    # индексы внешних ключей заменены составными из Meta.indexes
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='posts',
         verbose_name='Автор',
         help_text='Автор'
@@ -37,6 +61,7 @@ class Post(models.Model):
     group = models.ForeignKey(
         Group,
         on_delete=models.CASCADE,
+        db_index=False,
         blank=True,
         null=True,
         related_name='posts',
@@ -46,18 +71,82 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число комментариев'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты пользователей'
+        # ленты автора и группы - диапазон индекса в порядке
+        # паджинатора (-pub_date, -pk), без сортировки
+        indexes = [
+            models.Index(
+                name='post_author_date',
+                fields=['author', 'pub_date', 'id'],
+            ),
+            models.Index(
+                name='post_group_date',
+                fields=['group', 'pub_date', 'id'],
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
 
+class ImageDerivative(models.Model):
+    """Уменьшенная копия картинки поста в одной ширине и одном формате"""
+    FORMATS = (
+        ('avif', 'AVIF'),
+        ('webp', 'WebP'),
+        ('jpeg', 'JPEG'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='derivatives',
+        verbose_name='Пост'
+    )
+    source = models.CharField(
+        max_length=255,
+        verbose_name='Исходная картинка'
+    )
+    file = models.FileField(
+        upload_to='derivatives/',
+        max_length=255,
+        verbose_name='Файл'
+    )
+    format = models.CharField(
+        max_length=4,
+        choices=FORMATS,
+        verbose_name='Формат'
+    )
+    width = models.PositiveIntegerField(verbose_name='Ширина')
+    height = models.PositiveIntegerField(verbose_name='Высота')
+
+    class Meta:
+        ordering = ['width']
+        verbose_name = 'Копия картинки'
+        verbose_name_plural = 'Копии картинок'
+
+    def __str__(self):
+        return f'{self.source} {self.width}w {self.format}'
+
+
 class Comment(models.Model):
     text = models.TextField(
         verbose_name='Текст комментария',
@@ -77,6 +166,7 @@ class Comment(models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
+        db_index=False,
         blank=False,
         null=False,
         related_name='comments',
@@ -88,6 +178,12 @@ class Comment(models.Model):
         ordering = ['-created']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        # страница комментариев поста - диапазон индекса в порядке
+        # паджинатора (-created, -pk)
+        indexes = [models.Index(
+            name='comment_post_thread',
+            fields=['post', 'created', 'id'],
+        )]
 
     def __str__(self):
         return self.text[:15]
@@ -98,6 +194,7 @@ class Follow(models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='follower',
         verbose_name='Подписчик',
         help_text='Подписчик'
@@ -105,6 +202,7 @@ class Follow(models.Model):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name='following',
         verbose_name='Автор подписки',
         help_text='Автор подписки'
@@ -117,3 +215,96 @@ class Follow(models.Model):
             name='unique_follow',
             fields=['author', 'user'],
         )]
+        # подписки пользователя читаются только из индекса
+        indexes = [models.Index(
+            name='follow_user_author',
+            fields=['user', 'author'],
+        )]
+
+
+class Counter(models.Model):
+    name = models.CharField(
+        max_length=150,
+        unique=True,
+        verbose_name='Счетчик'
+    )
+    value = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Значение'
+    )
+
+    class Meta:
+        verbose_name = 'Счетчик'
+        verbose_name_plural = 'Счетчики'
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя; дата публикации продублирована,
+    чтобы страница ленты читалась одним диапазоном индекса"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи лент подписок'
+        constraints = [models.UniqueConstraint(
+            name='unique_timeline_entry',
+            fields=['user', 'post'],
+        )]
+        indexes = [models.Index(
+            name='timeline_user_date',
+            fields=['user', 'pub_date', 'post'],
+        )]
+
+
+class Recommendation(models.Model):
+    """Автор, на которого стоит подписаться; таблицу заполняет команда
+    build_recommendations, страница подписок только читает ее"""
+    # индекс по читателю - начало составных индексов ниже
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='recommendations',
+        verbose_name='Читатель'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommended_to',
+        verbose_name='Рекомендуемый автор'
+    )
+    score = models.FloatField(verbose_name='Оценка')
+    via = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Подписаны авторы читателя',
+        help_text='Сколько авторов, на которых подписан читатель, '
+                  'подписаны на рекомендуемого'
+    )
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        constraints = [models.UniqueConstraint(
+            name='unique_recommendation',
+            fields=['user', 'author'],
+        )]
+        # лучшие рекомендации читателя - начало диапазона индекса
+        indexes = [models.Index(
+            name='recommendation_user_score',
+            fields=['user', '-score'],
+        )]
@@ -0,0 +1,230 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import SimpleLazyObject
+
+NEXT = 'n'
+PREVIOUS = 'p'
+# целые в курсоре - в пределах BIGINT, иначе база не примет параметр
+MAX_KEY = 2 ** 63 - 1
+MIN_KEY = -2 ** 63
+
+
+class CursorPaginator(Paginator):
+    """Keyset-паджинатор: страница выбирается условием по ключу
+    сортировки, а не OFFSET, поэтому ее стоимость не зависит от
+    глубины. Общее число объектов не запрашивается, пока к count
+    не обратятся явно; num_pages - число страниц, известных по
+    последней выбранной (текущая и, если есть, следующая)."""
+
+    def __init__(self, object_list, per_page,
+                 ordering=('-pub_date', '-pk'), count=None, transform=None):
+        self.ordering = ordering
+        # отображение выбранных строк в объекты страницы, например
+        # записей ленты в посты; ключи курсоров берутся из самих строк
+        self.transform = transform
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.descending = ordering[0].startswith('-')
+        self._num_pages = 1
+        super().__init__(object_list.order_by(*ordering), per_page)
+        if count is not None:
+            # известное заранее число объектов (денормализованный
+            # счетчик) заменяет COUNT(*)
+            self.count = count
+
+    @property
+    def num_pages(self):
+        return self._num_pages
+
+    def _page(self, rows, number, has_next, has_previous):
+        """Обычная Page; номер страницы курсора неизвестен, поэтому
+        для него берется 1 или 2 - только чтобы has_previous()
+        и has_next() отвечали верно"""
+        if number is None:
+            number = 2 if has_previous else 1
+        self._num_pages = number + 1 if has_next else number
+        objects = self.transform(rows) if self.transform else rows
+        page = Page(objects, number, self)
+        page.next_cursor = (
+            self.encode_cursor(rows[-1], NEXT) if has_next else None
+        )
+        page.previous_cursor = (
+            self.encode_cursor(rows[0], PREVIOUS) if has_previous else None
+        )
+        return page
+
+    @staticmethod
+    def _value(obj, field):
+        # строки values() - словари
+        if isinstance(obj, dict):
+            return obj[field]
+        return getattr(obj, field)
+
+    def encode_cursor(self, obj, direction):
+        values = []
+        for field in self.fields:
+            value = self._value(obj, field)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        raw = json.dumps([direction] + values).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Возвращает (направление, ключ) или None для битого курсора"""
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(cursor + padding)
+            direction, *values = json.loads(raw.decode())
+        except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+            return None
+        if direction not in (NEXT, PREVIOUS):
+            return None
+        if len(values) != len(self.fields):
+            return None
+        key = self._parse_key(values)
+        if key is None:
+            return None
+        return direction, key
+
+    def _parse_key(self, values):
+        """Значения ключа из JSON - в типы полей модели (даты из строк);
+        None, если какое-то значение не подходит"""
+        opts = self.object_list.model._meta
+        key = []
+        for name, value in zip(self.fields, values):
+            # encode_cursor пишет только строки и целые; списки, словари
+            # и числа вне BIGINT - подделка
+            if isinstance(value, bool) or not isinstance(value, (str, int)):
+                return None
+            if isinstance(value, int) and not MIN_KEY <= value <= MAX_KEY:
+                return None
+            try:
+                field = opts.pk if name == 'pk' else opts.get_field(name)
+                value = field.to_python(value)
+            except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+                return None
+            if value is None:
+                return None
+            key.append(value)
+        return key
+
+    def _seek(self, key, forward):
+        """Условие «строго после ключа» в порядке ленты (forward)
+        или «строго до ключа» (not forward)"""
+        older = forward == self.descending
+        lookup = 'lt' if older else 'gt'
+        condition = Q()
+        for position in reversed(range(len(self.fields))):
+            equal = {
+                field: value for field, value in
+                zip(self.fields[:position], key[:position])
+            }
+            strict = {
+                f'{self.fields[position]}__{lookup}': key[position]
+            }
+            condition |= Q(**equal, **strict)
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        ]
+
+    def _key(self, obj):
+        return [self._value(obj, field) for field in self.fields]
+
+    def _fetch(self, key=None, direction=NEXT):
+        if direction == NEXT:
+            queryset = self.object_list
+            if key is not None:
+                queryset = queryset.filter(self._seek(key, forward=True))
+        else:
+            queryset = self.object_list.filter(
+                self._seek(key, forward=False)
+            ).order_by(*self._reversed_ordering())
+        rows = list(queryset[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+        return rows, more
+
+    def _exists_beyond(self, obj, forward):
+        return self.object_list.filter(
+            self._seek(self._key(obj), forward=forward)
+        ).exists()
+
+    def cursor_page(self, cursor):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return self.first_page()
+        direction, key = decoded
+        rows, more = self._fetch(key, direction)
+        if not rows:
+            return self.first_page()
+        if direction == NEXT:
+            has_next = more
+            has_previous = self._exists_beyond(rows[0], forward=False)
+        else:
+            has_previous = more
+            has_next = self._exists_beyond(rows[-1], forward=True)
+        return self._page(rows, None, has_next, has_previous)
+
+    def first_page(self):
+        rows, more = self._fetch()
+        return self._page(rows, 1, more, False)
+
+    def last_page(self):
+        queryset = self.object_list.order_by(*self._reversed_ordering())
+        rows = list(queryset[:self.per_page])
+        rows.reverse()
+        has_previous = bool(rows) and self._exists_beyond(
+            rows[0], forward=False
+        )
+        return self._page(rows, None, False, has_previous)
+
+    def numbered_page(self, number):
+        """Совместимость со ссылками ?page=N: по номеру читается только
+        граничный ключ, сама страница выбирается тем же поиском по
+        ключу, что и для курсоров"""
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            number = 1
+        if number <= 1:
+            return self.first_page()
+        offset = (number - 1) * self.per_page
+        boundary = list(
+            self.object_list.values_list(*self.fields)[offset - 1:offset]
+        )
+        if not boundary:
+            return self.last_page()
+        rows, more = self._fetch(list(boundary[0]), NEXT)
+        if not rows:
+            return self.last_page()
+        return self._page(rows, number, more, True)
+
+    def get_page(self, number):
+        return self.numbered_page(number)
+
+
+def paginate(request, post_list, **options):
+    """Страница ленты по параметрам запроса ?cursor= или ?page="""
+    paginator = CursorPaginator(post_list, settings.POSTS_NUMBER, **options)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return paginator.cursor_page(cursor)
+    return paginator.numbered_page(request.GET.get('page'))
+
+
+def lazy_paginate(request, post_list, **options):
+    """Та же страница, но выбираемая при первом обращении: если фрагмент
+    ленты взят из кэша, запросов к постам не будет вовсе"""
+    return SimpleLazyObject(lambda: paginate(request, post_list, **options))
@@ -0,0 +1,177 @@
+"""Рекомендации "на кого подписаться".
+
+Команда build_recommendations периодически читает таблицу подписок
+двумя проходами по индексам в списки смежности: для каждого
+пользователя - отсортированный array('q') авторов и подписчиков. Для
+читателя кандидат оценивается по двум признакам:
+
+- друзья друзей (via): сколько авторов читателя подписаны на кандидата;
+- совместные подписки: насколько подписчики авторов читателя подписаны
+  и на кандидата, с косинусной нормировкой по числу подписчиков обоих,
+  чтобы не рекомендовать всем одних и тех же самых популярных авторов.
+
+Похожесть авторов по совместным подпискам считается один раз за
+расчет: для каждого автора - Counter по подпискам равномерной выборки
+не больше RECOMMENDATION_SAMPLE его подписчиков (иначе стоимость
+популярного автора росла бы квадратично), из него - самые частые
+кандидаты, после нормировки остаются RECOMMENDATION_NEIGHBOURS лучших
+соседей. Читателю остается сложить строки соседей своих авторов, а их
+берется не больше RECOMMENDATION_MAX_FOLLOWED. Свободные места (и все
+места читателя без подписок) занимают самые популярные авторы. Лучшие
+RECOMMENDATIONS_NUMBER кандидатов пишутся в Recommendation пачками по
+читателям; страница подписок только читает таблицу."""
+import heapq
+import math
+from array import array
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Follow, Recommendation, User
+
+EMPTY = array('q')
+# кандидатов в соседи до нормировки - во столько раз больше, чем
+# остается: нормировка по подписчикам кандидата меняет порядок
+RAW_NEIGHBOURS = 4
+# поля карточки рекомендации
+CARD_FIELDS = (
+    'via', 'author', 'author__username', 'author__first_name',
+    'author__last_name',
+)
+
+
+def adjacency(key, value):
+    """{id: отсортированный array('q') id} одним проходом по индексу"""
+    rows = Follow.objects.order_by(key, value).values_list(key, value)
+    return {
+        source: array('q', map(itemgetter(1), group))
+        for source, group in groupby(rows.iterator(), key=itemgetter(0))
+    }
+
+
+def sample(ids, size):
+    """Не больше size id, равномерно по массиву"""
+    if len(ids) <= size:
+        return ids
+    return ids[::math.ceil(len(ids) / size)]
+
+
+class Graph:
+    """Граф подписок в памяти на время расчета"""
+
+    def __init__(self, sample_size, neighbours):
+        self.following = adjacency('user_id', 'author_id')
+        self.followers = adjacency('author_id', 'user_id')
+        self.total = len(self.following) or 1
+        # авторы по убыванию числа подписчиков
+        self.popular = sorted(
+            self.followers,
+            key=lambda author: (-self.followers_count(author), author)
+        )
+        self.neighbours = {
+            author_id: self.similar(author_id, sample_size, neighbours)
+            for author_id in self.followers
+        }
+
+    def followers_count(self, author_id):
+        return len(self.followers.get(author_id, EMPTY))
+
+    def similar(self, author_id, sample_size, number):
+        """Лучшие number соседей автора по совместным подпискам
+        [(автор, похожесть)]"""
+        fans = self.followers[author_id]
+        sampled = sample(fans, sample_size)
+        together = Counter()
+        for fan in sampled:
+            together.update(self.following[fan])
+        del together[author_id]
+        # выборка пересчитывается на всех подписчиков автора
+        weight = len(fans) / len(sampled) / math.sqrt(len(fans))
+        return heapq.nlargest(number, (
+            (candidate, count * weight / math.sqrt(
+                self.followers_count(candidate)
+            ))
+            for candidate, count in together.most_common(
+                number * RAW_NEIGHBOURS
+            )
+        ), key=lambda item: (item[1], -item[0]))
+
+    def scores(self, user_id, max_followed):
+        """{кандидат: (оценка, via)}"""
+        followed = sample(self.following.get(user_id, EMPTY), max_followed)
+        via = Counter()
+        cofollow = Counter()
+        for author_id in followed:
+            via.update(self.following.get(author_id, EMPTY))
+            for candidate, similarity in self.neighbours.get(author_id, ()):
+                cofollow[candidate] += similarity
+        return {
+            candidate: (via[candidate] + cofollow[candidate], via[candidate])
+            for candidate in via.keys() | cofollow.keys()
+        }
+
+    def recommend(self, user_id, number, max_followed):
+        """Лучшие number кандидатов [(автор, оценка, via)]"""
+        excluded = set(self.following.get(user_id, EMPTY))
+        excluded.add(user_id)
+        scores = self.scores(user_id, max_followed)
+        best = heapq.nlargest(
+            number,
+            (item for item in scores.items() if item[0] not in excluded),
+            key=lambda item: (item[1][0], -item[0])
+        )
+        result = [(author, score, via) for author, (score, via) in best]
+        excluded.update(author for author, _, _ in result)
+        for author in self.popular:
+            if len(result) >= number:
+                break
+            if author not in excluded:
+                # доля подписанных минус один: не выше любой оценки
+                # по подпискам
+                share = self.followers_count(author) / self.total
+                result.append((author, share - 1, 0))
+        return result
+
+
+def build(batch_size=500, number=None, sample_size=None):
+    """Пересчет всей таблицы рекомендаций; пачка читателей заменяется
+    в одной транзакции, так что страница не видит ее наполовину.
+    Возвращает число записанных рекомендаций"""
+    number = number or settings.RECOMMENDATIONS_NUMBER
+    graph = Graph(
+        sample_size or settings.RECOMMENDATION_SAMPLE,
+        settings.RECOMMENDATION_NEIGHBOURS
+    )
+    max_followed = settings.RECOMMENDATION_MAX_FOLLOWED
+    users = list(User.objects.order_by('pk').values_list('pk', flat=True))
+    written = 0
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        rows = [
+            Recommendation(user_id=user_id, author_id=author_id,
+                           score=score, via=via)
+            for user_id in batch
+            for author_id, score, via in graph.recommend(
+                user_id, number, max_followed
+            )
+        ]
+        with transaction.atomic():
+            Recommendation.objects.filter(user_id__in=batch).delete()
+            Recommendation.objects.bulk_create(rows, batch_size=batch_size)
+        written += len(rows)
+    return written
+
+
+def for_user(user, limit=None):
+    """Рекомендации читателю одним запросом по индексу
+    recommendation_user_score; авторы, на которых он подписался после
+    расчета, отбрасываются"""
+    followed = Follow.objects.filter(user=user).values('author')
+    return list(Recommendation.objects.filter(user=user).exclude(
+        author__in=followed
+    ).select_related('author').only(*CARD_FIELDS).order_by(
+        '-score'
+    )[:limit or settings.RECOMMENDATIONS_SHOWN])
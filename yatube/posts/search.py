@@ -0,0 +1,219 @@
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .inverted_index import InvertedIndex
+from .models import Comment, Post
+
+FTS_TABLE = 'posts_post_fts'
+TSVECTOR_TABLE = 'posts_post_search'
+
+WORD_RE = re.compile(r'\w+')
+REBUILD_BATCH_SIZE = 1000
+
+
+def terms(query):
+    return WORD_RE.findall(query.lower())
+
+
+class Fts5Backend:
+    """Индекс SQLite FTS5; rowid строки индекса - id поста. Слова
+    запроса ищутся по префиксу, чтобы находились и другие формы слова"""
+
+    def index(self, post_id, text):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+                [post_id, text]
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def refresh(self, post_id):
+        # комментарии в индекс FTS5 не входят
+        pass
+
+    def match(self, query):
+        # каждое слово - строка в кавычках, кавычки внутри удваиваются
+        return ' '.join(
+            '"{}"*'.format(term.replace('"', '""')) for term in terms(query)
+        )
+
+    def search(self, query, limit):
+        expression = self.match(query)
+        if not expression:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank, rowid DESC LIMIT %s',
+                [expression, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                f'SELECT id, text FROM posts_post'
+            )
+
+
+class TsvectorBackend:
+    """Индекс PostgreSQL: tsvector текста поста под GIN-индексом"""
+
+    def index(self, post_id, text):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {TSVECTOR_TABLE} (post_id, document) '
+                f'VALUES (%s, to_tsvector(%s, %s)) '
+                f'ON CONFLICT (post_id) DO UPDATE '
+                f'SET document = EXCLUDED.document',
+                [post_id, settings.SEARCH_CONFIG, text]
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {TSVECTOR_TABLE} WHERE post_id = %s', [post_id]
+            )
+
+    def refresh(self, post_id):
+        pass
+
+    def search(self, query, limit):
+        if not terms(query):
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id FROM {TSVECTOR_TABLE}, '
+                f'plainto_tsquery(%s, %s) query '
+                f'WHERE document @@ query '
+                f'ORDER BY ts_rank(document, query) DESC, post_id DESC '
+                f'LIMIT %s',
+                [settings.SEARCH_CONFIG, query, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TSVECTOR_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {TSVECTOR_TABLE} (post_id, document) '
+                f'SELECT id, to_tsvector(%s, text) FROM posts_post',
+                [settings.SEARCH_CONFIG]
+            )
+
+
+class InvertedIndexBackend:
+    """Обратный индекс на диске для баз без полнотекстового поиска;
+    индексирует и текст поста, и его комментарии. Запрос: слова
+    (все обязательны, AND можно не писать), фразы в кавычках и OR
+    между альтернативами"""
+
+    def __init__(self, directory):
+        self.index_files = InvertedIndex(
+            directory, merge_at=settings.SEARCH_INDEX_MERGE_AT
+        )
+
+    def index(self, post_id, text):
+        self.refresh(post_id)
+
+    def remove(self, post_id):
+        transaction.on_commit(lambda: self.index_files.remove([post_id]))
+
+    def refresh(self, post_id):
+        # тексты читаются после фиксации: откаченная правка в индекс
+        # не попадет
+        transaction.on_commit(
+            lambda: self.index_files.update(documents([post_id]))
+        )
+
+    def search(self, query, limit):
+        return self.index_files.search(query, limit)
+
+    def rebuild(self):
+        def all_documents():
+            ids = Post.objects.order_by('pk').values_list('pk', flat=True)
+            batch = []
+            for pk in ids.iterator():
+                batch.append(pk)
+                if len(batch) == REBUILD_BATCH_SIZE:
+                    yield from documents(batch).items()
+                    batch = []
+            yield from documents(batch).items()
+        self.index_files.rebuild(all_documents())
+
+
+def documents(post_ids):
+    """Тексты постов с комментариями: {id: [текст поста, комментарии]};
+    у удаленного поста список пуст"""
+    texts = {pk: [] for pk in post_ids}
+    for pk, text in Post.objects.filter(pk__in=post_ids).values_list(
+        'pk', 'text'
+    ):
+        texts[pk].append(text)
+    comments = Comment.objects.filter(post_id__in=post_ids).order_by(
+        'created', 'pk'
+    ).values_list('post_id', 'text')
+    for post_id, text in comments:
+        if texts[post_id]:
+            texts[post_id].append(text)
+    return texts
+
+
+_backends = {}
+
+
+def backend():
+    """Бэкенд по движку базы; таблица индекса создается миграцией,
+    и если ее нет (SQLite без FTS5, другие движки) или в SEARCH_BACKEND
+    выбран 'inverted', работает обратный индекс в SEARCH_INDEX_DIR"""
+    key = (connection.vendor, settings.SEARCH_BACKEND,
+           settings.SEARCH_INDEX_DIR)
+    if key not in _backends:
+        vendor = connection.vendor
+        tables = (
+            connection.introspection.table_names()
+            if settings.SEARCH_BACKEND == 'auto' else ()
+        )
+        if vendor == 'sqlite' and FTS_TABLE in tables:
+            _backends[key] = Fts5Backend()
+        elif vendor == 'postgresql' and TSVECTOR_TABLE in tables:
+            _backends[key] = TsvectorBackend()
+        else:
+            _backends[key] = InvertedIndexBackend(settings.SEARCH_INDEX_DIR)
+    return _backends[key]
+
+
+def index(post):
+    backend().index(post.pk, post.text)
+
+
+def remove(post_id):
+    backend().remove(post_id)
+
+
+def refresh(post_id):
+    """Комментарии поста изменились"""
+    backend().refresh(post_id)
+
+
+def rebuild():
+    """Полная переиндексация, например после массовой загрузки постов
+    в обход сигналов"""
+    backend().rebuild()
+
+
+def post_ids(query, limit=None):
+    """id постов, подходящих под запрос, от самых релевантных"""
+    return backend().search(query, limit or settings.SEARCH_MAX_RESULTS)
@@ -0,0 +1,206 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import counters, feed_cache, images, search, timeline
+from .follow_graph import graph
+from .models import Comment, Follow, Group, Post, User
+
+# поля, которые выводятся в карточках постов
+GROUP_CARD_FIELDS = ('title', 'slug')
+AUTHOR_CARD_FIELDS = ('username', 'first_name', 'last_name')
+# поля поста, которые сигналы читают после записи или удаления
+POST_SIGNAL_FIELDS = ('author_id', 'group_id')
+# значение поля, отложенного через only() или defer()
+DEFERRED = object()
+
+
+def loaded_value(instance, attname):
+    """Значение поля без обращения к базе: сигналы post_init приходят
+    на каждую строку выборки, и чтение отложенного поля стоило бы
+    отдельного запроса на строку"""
+    return instance.__dict__.get(attname, DEFERRED)
+
+
+def card_values(instance, fields):
+    """Отложенное поле в снимке карточки совпадает только с таким же
+    отложенным: присвоенное после загрузки считается изменением"""
+    return tuple(loaded_value(instance, field) for field in fields)
+
+
+def image_name(instance):
+    """Имя файла картинки без обращения к базе; None, если поле
+    отложено через only() или defer()"""
+    value = instance.__dict__.get('image')
+    return getattr(value, 'name', value)
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._loaded_group_id = loaded_value(instance, 'group_id')
+    instance._loaded_image = image_name(instance)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def load_deferred_fields(sender, instance, **kwargs):
+    """Автор и группа, отложенные при загрузке, нужны счетчикам и
+    лентам; они читаются одним запросом до записи или удаления, пока
+    строка еще есть в базе"""
+    if (instance._loaded_group_id is not DEFERRED
+            and 'author_id' in instance.__dict__):
+        return
+    row = Post.objects.filter(pk=instance.pk).values(
+        *POST_SIGNAL_FIELDS
+    ).first()
+    if row is None:
+        return
+    for attname, value in row.items():
+        # присвоенное после загрузки значение не затираем
+        instance.__dict__.setdefault(attname, value)
+    if instance._loaded_group_id is DEFERRED:
+        instance._loaded_group_id = row['group_id']
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    feed_cache.bump(*feed_cache.post_scopes(
+        instance, instance._loaded_group_id, instance.group_id
+    ))
+    if created:
+        for key in counters.post_keys(instance, instance.group_id):
+            counters.change(key, 1)
+        timeline.fan_out(instance)
+    elif instance._loaded_group_id != instance.group_id:
+        if instance._loaded_group_id is not None:
+            counters.change(
+                counters.group_key(instance._loaded_group_id), -1
+            )
+        if instance.group_id is not None:
+            counters.change(counters.group_key(instance.group_id), 1)
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields, **kwargs):
+    if update_fields is None or 'text' in update_fields:
+        search.index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.remove(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def count_image_refs(sender, instance, created, **kwargs):
+    name = image_name(instance)
+    if created:
+        if name:
+            images.acquire(name)
+    elif name is not None and instance._loaded_image is not None:
+        if name != instance._loaded_image:
+            if name:
+                images.acquire(name)
+            if instance._loaded_image:
+                images.release(instance._loaded_image)
+    instance._loaded_image = name
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    name = image_name(instance)
+    if name:
+        images.release(name)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    feed_cache.bump(
+        *feed_cache.post_scopes(instance, instance._loaded_group_id)
+    )
+    for key in counters.post_keys(instance, instance._loaded_group_id):
+        counters.change(key, -1)
+
+
+@receiver(post_init, sender=Group)
+def remember_group_card(sender, instance, **kwargs):
+    instance._loaded_card = card_values(instance, GROUP_CARD_FIELDS)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_cards(sender, instance, created, **kwargs):
+    card = card_values(instance, GROUP_CARD_FIELDS)
+    if not created and card != instance._loaded_card:
+        Post.objects.filter(group=instance).update(updated_at=timezone.now())
+        feed_cache.bump(feed_cache.SHARED)
+    feed_cache.bump(feed_cache.group_scope(instance.pk))
+    instance._loaded_card = card
+
+
+@receiver(post_delete, sender=Group)
+def invalidate_group_feeds(sender, instance, **kwargs):
+    feed_cache.bump(feed_cache.SHARED, feed_cache.group_scope(instance.pk))
+
+
+@receiver(post_init, sender=User)
+def remember_author_card(sender, instance, **kwargs):
+    instance._loaded_card = card_values(instance, AUTHOR_CARD_FIELDS)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, created, **kwargs):
+    card = card_values(instance, AUTHOR_CARD_FIELDS)
+    if not created and card != instance._loaded_card:
+        Post.objects.filter(author=instance).update(updated_at=timezone.now())
+        feed_cache.bump(feed_cache.SHARED)
+    instance._loaded_card = card
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comments_count=F('comments_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(
+        comments_count=F('comments_count') - 1
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def index_comments(sender, instance, **kwargs):
+    search.refresh(instance.post_id)
+
+
+@receiver(post_save, sender=Follow)
+def add_to_timeline(sender, instance, created, **kwargs):
+    if created:
+        counters.change(counters.followers_key(instance.author_id), 1)
+        timeline.backfill(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_from_timeline(sender, instance, **kwargs):
+    counters.change(counters.followers_key(instance.author_id), -1)
+    timeline.prune(instance)
+    timeline.followers_dropped([instance.author_id])
+
+
+@receiver(post_save, sender=Follow)
+def add_to_graph(sender, instance, created, **kwargs):
+    if created:
+        graph.changed(instance.user_id, instance.author_id, add=True)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_from_graph(sender, instance, **kwargs):
+    graph.changed(instance.user_id, instance.author_id, add=False)
@@ -0,0 +1,82 @@
+"""Стеммер русского языка по алгоритму Snowball (Портер)"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = re.compile(
+    r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$'
+)
+REFLEXIVE = re.compile(r'(ся|сь)$')
+ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|'
+    r'ую|юю|ая|яя|ою|ею)$'
+)
+PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+VERB = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|'
+    r'ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)|'
+    r'((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|'
+    r'ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+DERIVATIONAL = re.compile(r'ость?$')
+SUPERLATIVE = re.compile(r'ейше?$')
+
+
+def _region(word, start=0):
+    """Начало области после первой согласной, идущей за гласной"""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _strip(pattern, text):
+    return pattern.sub('', text, count=1)
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv_start = next(
+        (i + 1 for i, letter in enumerate(word) if letter in VOWELS), None
+    )
+    if rv_start is None:
+        return word
+    prefix, rv = word[:rv_start], word[rv_start:]
+
+    # шаг 1: деепричастие или окончания возвратности, прилагательного,
+    # глагола, существительного
+    stripped = _strip(PERFECTIVE_GERUND, rv)
+    if stripped == rv:
+        rv = _strip(REFLEXIVE, rv)
+        stripped = _strip(ADJECTIVE, rv)
+        if stripped != rv:
+            rv = _strip(PARTICIPLE, stripped)
+        else:
+            stripped = _strip(VERB, rv)
+            rv = stripped if stripped != rv else _strip(NOUN, rv)
+    else:
+        rv = stripped
+
+    # шаг 2
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    # шаг 3: словообразовательный суффикс в области R2
+    r2 = _region(word, _region(word)) - rv_start
+    match = DERIVATIONAL.search(rv)
+    if match and match.start() >= r2:
+        rv = rv[:match.start()]
+
+    # шаг 4
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        stripped = _strip(SUPERLATIVE, rv)
+        if stripped != rv:
+            rv = stripped[:-1] if stripped.endswith('нн') else stripped
+        elif rv.endswith('ь'):
+            rv = rv[:-1]
+    return prefix + rv
@@ -0,0 +1,36 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файл под именем из хэша содержимого: одинаковые загрузки
+    попадают в один файл, который не перезаписывается.
+
+    Имя имеет вид <каталог upload_to>/<2 символа хэша>/<хэш>.<расширение>;
+    сколько постов ссылается на файл, считает images.release."""
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, hexdigest[:2], hexdigest[2:] + ext)
+
+    def _save(self, name, content):
+        name = self.content_name(name, content)
+        try:
+            # файл уже есть: свежее время изменения не дает
+            # images.collect удалить его, пока пост с ним сохраняется
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            # файла нет или images.collect только что его удалил
+            return super()._save(name, content)
@@ -0,0 +1,23 @@
+from django import template
+
+from posts import images, thumbnails
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def post_picture(post, sizes='100vw'):
+    ready = thumbnails.picture(post)
+    fallback = ready.pop(images.FALLBACK, None)
+    return {
+        'post': post,
+        'sizes': sizes,
+        'sources': [
+            {'type': images.MIME_TYPES[fmt], 'srcset': images.srcset(variants)}
+            for fmt, variants in ready.items()
+        ],
+        'fallback': fallback and {
+            'src': fallback[-1].file.url,
+            'srcset': images.srcset(fallback),
+        },
+    }
@@ -0,0 +1,262 @@
+-- about:author
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+
+-- about:tech
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+
+-- api:comments
+SELECT (?) AS "a" FROM "posts_post" WHERE "posts_post"."id" = ?  LIMIT ?
+SELECT "posts_comment"."id", "posts_comment"."post_id", "auth_user"."username", "posts_comment"."text", "posts_comment"."created" FROM "posts_comment" INNER JOIN "auth_user" ON ("posts_comment"."author_id" = "auth_user"."id") WHERE "posts_comment"."post_id" = ? ORDER BY "posts_comment"."created" DESC, "posts_comment"."id" DESC  LIMIT ?
+
+-- api:comments POST
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT (?) AS "a" FROM "posts_post" WHERE "posts_post"."id" = ?  LIMIT ?
+INSERT INTO "posts_comment" ("text", "created", "author_id", "post_id") VALUES (?, ?, ?, ?)
+UPDATE "posts_post" SET "comments_count" = ("posts_post"."comments_count" + ?) WHERE "posts_post"."id" = ?
+SELECT "posts_comment"."id", "posts_comment"."post_id", "auth_user"."username", "posts_comment"."text", "posts_comment"."created" FROM "posts_comment" INNER JOIN "auth_user" ON ("posts_comment"."author_id" = "auth_user"."id") WHERE "posts_comment"."id" = ?  LIMIT ?
+
+-- api:follow DELETE
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."username" = ?
+SELECT "posts_follow"."id", "posts_follow"."user_id", "posts_follow"."author_id" FROM "posts_follow" WHERE ("posts_follow"."author_id" = ? AND "posts_follow"."user_id" = ?)
+
+-- api:follows
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_follow"."id", "auth_user"."username", T3."username", "posts_follow"."author_id" FROM "posts_follow" INNER JOIN "auth_user" ON ("posts_follow"."user_id" = "auth_user"."id") INNER JOIN "auth_user" T3 ON ("posts_follow"."author_id" = T3."id") WHERE "posts_follow"."user_id" = ? ORDER BY "posts_follow"."author_id" ASC  LIMIT ?
+
+-- api:follows POST
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."username" = ?
+SELECT "posts_follow"."id", "posts_follow"."user_id", "posts_follow"."author_id" FROM "posts_follow" WHERE ("posts_follow"."author_id" = ? AND "posts_follow"."user_id" = ?)
+SELECT "posts_follow"."id", T3."username", "auth_user"."username", "posts_follow"."author_id" FROM "posts_follow" INNER JOIN "auth_user" ON ("posts_follow"."author_id" = "auth_user"."id") INNER JOIN "auth_user" T3 ON ("posts_follow"."user_id" = T3."id") WHERE ("posts_follow"."author_id" = ? AND "posts_follow"."user_id" = ?)  LIMIT ?
+
+-- api:follows bulk
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "auth_user"."username", "auth_user"."id" FROM "auth_user" WHERE "auth_user"."username" IN (...)
+SAVEPOINT "?"
+SELECT "posts_follow"."author_id" FROM "posts_follow" WHERE ("posts_follow"."author_id" IN (...) AND "posts_follow"."user_id" = ?)
+DELETE FROM "posts_follow" WHERE "user_id" = ? AND "author_id" IN (...)
+INSERT OR IGNORE INTO "posts_counter" ("name", "value") SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ?
+SELECT "posts_counter"."id", "posts_counter"."name", "posts_counter"."value" FROM "posts_counter" WHERE "posts_counter"."name" IN (...) ORDER BY "posts_counter"."name" ASC
+SELECT "posts_follow"."author_id", COUNT("posts_follow"."id") AS "total" FROM "posts_follow" WHERE "posts_follow"."author_id" IN (...) GROUP BY "posts_follow"."author_id"
+UPDATE "posts_counter" SET "value" = CASE WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? ELSE NULL END WHERE "posts_counter"."id" IN (...)
+DELETE FROM "posts_timelineentry" WHERE "posts_timelineentry"."id" IN (SELECT U0."id" FROM "posts_timelineentry" U0 INNER JOIN "posts_post" U1 ON (U0."post_id" = U1."id") WHERE (U1."author_id" IN (...) AND U0."user_id" = ?))
+SELECT "posts_counter"."name" FROM "posts_counter" WHERE ("posts_counter"."name" IN (...) AND "posts_counter"."value" = ?)
+RELEASE SAVEPOINT "?"
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "auth_user"."username", "auth_user"."id" FROM "auth_user" WHERE "auth_user"."username" IN (...)
+SAVEPOINT "?"
+SELECT "posts_follow"."author_id" FROM "posts_follow" WHERE ("posts_follow"."author_id" IN (...) AND "posts_follow"."user_id" = ?)
+INSERT OR IGNORE INTO "posts_follow" ("user_id", "author_id") SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ?
+INSERT OR IGNORE INTO "posts_counter" ("name", "value") SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ? UNION ALL SELECT ?, ?
+SELECT "posts_counter"."id", "posts_counter"."name", "posts_counter"."value" FROM "posts_counter" WHERE "posts_counter"."name" IN (...) ORDER BY "posts_counter"."name" ASC
+SELECT "posts_follow"."author_id", COUNT("posts_follow"."id") AS "total" FROM "posts_follow" WHERE "posts_follow"."author_id" IN (...) GROUP BY "posts_follow"."author_id"
+UPDATE "posts_counter" SET "value" = CASE WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? WHEN ("posts_counter"."id" = ?) THEN ? ELSE NULL END WHERE "posts_counter"."id" IN (...)
+SELECT "posts_counter"."name" FROM "posts_counter" WHERE ("posts_counter"."name" LIKE ? ESCAPE ? AND "posts_counter"."value" > ?)
+SELECT "posts_post"."id", "posts_post"."pub_date" FROM "posts_post" WHERE "posts_post"."author_id" IN (...)
+INSERT OR IGNORE INTO "posts_timelineentry" ("user_id", "post_id", "pub_date") SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ? UNION ALL SELECT ?, ?, ?
+RELEASE SAVEPOINT "?"
+
+-- api:groups
+SELECT "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_group" ORDER BY "posts_group"."title" ASC, "posts_group"."id" ASC  LIMIT ?
+
+-- api:post
+SELECT "posts_post"."id", "posts_post"."text", "auth_user"."username", "posts_group"."slug", "posts_post"."pub_date", "posts_post"."updated_at", "posts_post"."image", "posts_post"."comments_count" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_post"."id" = ?  LIMIT ?
+
+-- api:post PATCH
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count" FROM "posts_post" WHERE "posts_post"."id" = ?
+UPDATE "posts_post" SET "text" = ?, "pub_date" = ?, "author_id" = ?, "group_id" = ?, "image" = ?, "updated_at" = ?, "comments_count" = ? WHERE "posts_post"."id" = ?
+DELETE FROM posts_post_fts WHERE rowid = ?
+INSERT INTO posts_post_fts (rowid, text) VALUES (?, ?)
+SELECT "posts_post"."id", "posts_post"."text", "auth_user"."username", "posts_group"."slug", "posts_post"."pub_date", "posts_post"."updated_at", "posts_post"."image", "posts_post"."comments_count" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_post"."id" = ?  LIMIT ?
+
+-- api:posts
+SELECT "posts_post"."id", "posts_post"."text", "auth_user"."username", "posts_group"."slug", "posts_post"."pub_date", "posts_post"."updated_at", "posts_post"."image", "posts_post"."comments_count" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") ORDER BY "posts_post"."pub_date" DESC, "posts_post"."id" DESC  LIMIT ?
+
+-- api:posts POST
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_group" WHERE "posts_group"."slug" = ?
+SELECT (?) AS "a" FROM "posts_group" WHERE "posts_group"."id" = ?  LIMIT ?
+INSERT INTO "posts_post" ("text", "pub_date", "author_id", "group_id", "image", "updated_at", "comments_count") VALUES (?, ?, ?, ?, ?, ?, ?)
+UPDATE "posts_counter" SET "value" = ("posts_counter"."value" + ?) WHERE "posts_counter"."name" = ?
+UPDATE "posts_counter" SET "value" = ("posts_counter"."value" + ?) WHERE "posts_counter"."name" = ?
+UPDATE "posts_counter" SET "value" = ("posts_counter"."value" + ?) WHERE "posts_counter"."name" = ?
+SELECT "posts_counter"."value" FROM "posts_counter" WHERE "posts_counter"."name" = ? ORDER BY "posts_counter"."id" ASC  LIMIT ?
+SELECT "posts_follow"."user_id" FROM "posts_follow" WHERE "posts_follow"."author_id" = ?
+DELETE FROM posts_post_fts WHERE rowid = ?
+INSERT INTO posts_post_fts (rowid, text) VALUES (?, ?)
+SELECT "posts_post"."id", "posts_post"."text", "auth_user"."username", "posts_group"."slug", "posts_post"."pub_date", "posts_post"."updated_at", "posts_post"."image", "posts_post"."comments_count" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_post"."id" = ?  LIMIT ?
+
+-- api:posts group
+SELECT "posts_post"."id", "posts_post"."text", "auth_user"."username", "posts_group"."slug", "posts_post"."pub_date", "posts_post"."updated_at", "posts_post"."image", "posts_post"."comments_count" FROM "posts_post" INNER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") WHERE "posts_group"."slug" = ? ORDER BY "posts_post"."pub_date" DESC, "posts_post"."id" DESC  LIMIT ?
+
+-- posts:add_comment
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count" FROM "posts_post" WHERE "posts_post"."id" = ?
+INSERT INTO "posts_comment" ("text", "created", "author_id", "post_id") VALUES (?, ?, ?, ?)
+UPDATE "posts_post" SET "comments_count" = ("posts_post"."comments_count" + ?) WHERE "posts_post"."id" = ?
+
+-- posts:author
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."username" = ?
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."username" = ?
+SELECT "posts_counter"."value" FROM "posts_counter" WHERE "posts_counter"."name" = ? ORDER BY "posts_counter"."id" ASC  LIMIT ?
+SELECT "posts_follow"."author_id" FROM "posts_follow" WHERE "posts_follow"."user_id" = ? ORDER BY "posts_follow"."author_id" ASC
+SELECT "posts_follow"."user_id" FROM "posts_follow" WHERE "posts_follow"."author_id" = ? ORDER BY "posts_follow"."user_id" ASC
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count", "auth_user"."id", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "posts_group"."id", "posts_group"."title", "posts_group"."slug" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_post"."author_id" = ? ORDER BY "posts_post"."pub_date" DESC, "posts_post"."id" DESC  LIMIT ?
+SELECT "posts_imagederivative"."id", "posts_imagederivative"."post_id", "posts_imagederivative"."source", "posts_imagederivative"."file", "posts_imagederivative"."format", "posts_imagederivative"."width", "posts_imagederivative"."height" FROM "posts_imagederivative" WHERE "posts_imagederivative"."post_id" IN (...) ORDER BY "posts_imagederivative"."width" ASC
+
+-- posts:export
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image" FROM "posts_post" WHERE "posts_post"."author_id" = ? ORDER BY "posts_post"."id" ASC
+
+-- posts:follow_index
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_counter"."name" FROM "posts_counter" WHERE ("posts_counter"."name" LIKE ? ESCAPE ? AND "posts_counter"."value" > ?)
+SELECT "posts_timelineentry"."id", "posts_timelineentry"."user_id", "posts_timelineentry"."post_id", "posts_timelineentry"."pub_date", "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count", T4."id", T4."password", T4."last_login", T4."is_superuser", T4."username", T4."first_name", T4."last_name", T4."email", T4."is_staff", T4."is_active", T4."date_joined", "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_timelineentry" INNER JOIN "posts_post" ON ("posts_timelineentry"."post_id" = "posts_post"."id") INNER JOIN "auth_user" T4 ON ("posts_post"."author_id" = T4."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_timelineentry"."user_id" = ? ORDER BY "posts_timelineentry"."pub_date" DESC, "posts_timelineentry"."post_id" DESC  LIMIT ?
+SELECT "posts_imagederivative"."id", "posts_imagederivative"."post_id", "posts_imagederivative"."source", "posts_imagederivative"."file", "posts_imagederivative"."format", "posts_imagederivative"."width", "posts_imagederivative"."height" FROM "posts_imagederivative" WHERE "posts_imagederivative"."post_id" IN (...) ORDER BY "posts_imagederivative"."width" ASC
+SELECT "posts_recommendation"."id", "posts_recommendation"."author_id", "posts_recommendation"."via", T3."id", T3."username", T3."first_name", T3."last_name" FROM "posts_recommendation" INNER JOIN "auth_user" T3 ON ("posts_recommendation"."author_id" = T3."id") WHERE ("posts_recommendation"."user_id" = ? AND NOT ("posts_recommendation"."author_id" IN (SELECT U0."author_id" FROM "posts_follow" U0 WHERE U0."user_id" = ?))) ORDER BY "posts_recommendation"."score" DESC  LIMIT ?
+
+-- posts:group_posts
+SELECT "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_group" WHERE "posts_group"."slug" = ?
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count", "auth_user"."id", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "posts_group"."id", "posts_group"."title", "posts_group"."slug" FROM "posts_post" INNER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") WHERE "posts_post"."group_id" = ? ORDER BY "posts_post"."pub_date" DESC, "posts_post"."id" DESC  LIMIT ?
+SELECT "posts_imagederivative"."id", "posts_imagederivative"."post_id", "posts_imagederivative"."source", "posts_imagederivative"."file", "posts_imagederivative"."format", "posts_imagederivative"."width", "posts_imagederivative"."height" FROM "posts_imagederivative" WHERE "posts_imagederivative"."post_id" IN (...) ORDER BY "posts_imagederivative"."width" ASC
+
+-- posts:index
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count", "auth_user"."id", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "posts_group"."id", "posts_group"."title", "posts_group"."slug" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") ORDER BY "posts_post"."pub_date" DESC, "posts_post"."id" DESC  LIMIT ?
+SELECT "posts_imagederivative"."id", "posts_imagederivative"."post_id", "posts_imagederivative"."source", "posts_imagederivative"."file", "posts_imagederivative"."format", "posts_imagederivative"."width", "posts_imagederivative"."height" FROM "posts_imagederivative" WHERE "posts_imagederivative"."post_id" IN (...) ORDER BY "posts_imagederivative"."width" ASC
+
+-- posts:post_comments
+SELECT "posts_post"."id", "posts_post"."comments_count" FROM "posts_post" WHERE "posts_post"."id" = ?
+SELECT "posts_comment"."id", "posts_comment"."text", "posts_comment"."created", "posts_comment"."author_id", "posts_comment"."post_id", "auth_user"."id", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name" FROM "posts_comment" INNER JOIN "auth_user" ON ("posts_comment"."author_id" = "auth_user"."id") WHERE "posts_comment"."post_id" = ? ORDER BY "posts_comment"."created" DESC, "posts_comment"."id" DESC  LIMIT ?
+
+-- posts:post_comments json
+SELECT "posts_post"."id", "posts_post"."comments_count" FROM "posts_post" WHERE "posts_post"."id" = ?
+SELECT "posts_comment"."id", "posts_comment"."post_id", "auth_user"."username", "posts_comment"."text", "posts_comment"."created" FROM "posts_comment" INNER JOIN "auth_user" ON ("posts_comment"."author_id" = "auth_user"."id") WHERE "posts_comment"."post_id" = ? ORDER BY "posts_comment"."created" DESC, "posts_comment"."id" DESC  LIMIT ?
+
+-- posts:post_create
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_group"
+
+-- posts:post_create POST
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+INSERT INTO "posts_post" ("text", "pub_date", "author_id", "group_id", "image", "updated_at", "comments_count") VALUES (?, ?, ?, NULL, ?, ?, ?)
+UPDATE "posts_counter" SET "value" = ("posts_counter"."value" + ?) WHERE "posts_counter"."name" = ?
+UPDATE "posts_counter" SET "value" = ("posts_counter"."value" + ?) WHERE "posts_counter"."name" = ?
+SELECT "posts_counter"."value" FROM "posts_counter" WHERE "posts_counter"."name" = ? ORDER BY "posts_counter"."id" ASC  LIMIT ?
+SELECT "posts_follow"."user_id" FROM "posts_follow" WHERE "posts_follow"."author_id" = ?
+DELETE FROM posts_post_fts WHERE rowid = ?
+INSERT INTO posts_post_fts (rowid, text) VALUES (?, ?)
+
+-- posts:post_detail
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count", "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined", "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_post"."id" = ?
+SELECT "posts_imagederivative"."id", "posts_imagederivative"."post_id", "posts_imagederivative"."source", "posts_imagederivative"."file", "posts_imagederivative"."format", "posts_imagederivative"."width", "posts_imagederivative"."height" FROM "posts_imagederivative" WHERE "posts_imagederivative"."post_id" IN (...) ORDER BY "posts_imagederivative"."width" ASC
+SELECT "posts_comment"."id", "posts_comment"."text", "posts_comment"."created", "posts_comment"."author_id", "posts_comment"."post_id", "auth_user"."id", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name" FROM "posts_comment" INNER JOIN "auth_user" ON ("posts_comment"."author_id" = "auth_user"."id") WHERE "posts_comment"."post_id" = ? ORDER BY "posts_comment"."created" DESC, "posts_comment"."id" DESC  LIMIT ?
+SELECT "posts_counter"."value" FROM "posts_counter" WHERE "posts_counter"."name" = ? ORDER BY "posts_counter"."id" ASC  LIMIT ?
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+
+-- posts:post_detail comments
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count", "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined", "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_post"."id" = ?
+SELECT "posts_imagederivative"."id", "posts_imagederivative"."post_id", "posts_imagederivative"."source", "posts_imagederivative"."file", "posts_imagederivative"."format", "posts_imagederivative"."width", "posts_imagederivative"."height" FROM "posts_imagederivative" WHERE "posts_imagederivative"."post_id" IN (...) ORDER BY "posts_imagederivative"."width" ASC
+SELECT "posts_comment"."id", "posts_comment"."text", "posts_comment"."created", "posts_comment"."author_id", "posts_comment"."post_id", "auth_user"."id", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name" FROM "posts_comment" INNER JOIN "auth_user" ON ("posts_comment"."author_id" = "auth_user"."id") WHERE "posts_comment"."post_id" = ? ORDER BY "posts_comment"."created" DESC, "posts_comment"."id" DESC  LIMIT ?
+SELECT "posts_counter"."value" FROM "posts_counter" WHERE "posts_counter"."name" = ? ORDER BY "posts_counter"."id" ASC  LIMIT ?
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+
+-- posts:post_edit
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count" FROM "posts_post" WHERE "posts_post"."id" = ?
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_group"
+
+-- posts:post_edit POST
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count" FROM "posts_post" WHERE "posts_post"."id" = ?
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_group"."id", "posts_group"."title", "posts_group"."slug", "posts_group"."description" FROM "posts_group" WHERE "posts_group"."id" = ?
+SELECT (?) AS "a" FROM "posts_group" WHERE "posts_group"."id" = ?  LIMIT ?
+UPDATE "posts_post" SET "text" = ?, "pub_date" = ?, "author_id" = ?, "group_id" = ?, "image" = ?, "updated_at" = ?, "comments_count" = ? WHERE "posts_post"."id" = ?
+DELETE FROM posts_post_fts WHERE rowid = ?
+INSERT INTO posts_post_fts (rowid, text) VALUES (?, ?)
+
+-- posts:profile
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."username" = ?
+SELECT "posts_counter"."value" FROM "posts_counter" WHERE "posts_counter"."name" = ? ORDER BY "posts_counter"."id" ASC  LIMIT ?
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "posts_follow"."author_id" FROM "posts_follow" WHERE "posts_follow"."user_id" = ? ORDER BY "posts_follow"."author_id" ASC
+SELECT "posts_follow"."user_id" FROM "posts_follow" WHERE "posts_follow"."author_id" = ? ORDER BY "posts_follow"."user_id" ASC
+SELECT "posts_follow"."author_id" FROM "posts_follow" WHERE "posts_follow"."user_id" = ? ORDER BY "posts_follow"."author_id" ASC
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count", "auth_user"."id", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "posts_group"."id", "posts_group"."title", "posts_group"."slug" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_post"."author_id" = ? ORDER BY "posts_post"."pub_date" DESC, "posts_post"."id" DESC  LIMIT ?
+SELECT "posts_imagederivative"."id", "posts_imagederivative"."post_id", "posts_imagederivative"."source", "posts_imagederivative"."file", "posts_imagederivative"."format", "posts_imagederivative"."width", "posts_imagederivative"."height" FROM "posts_imagederivative" WHERE "posts_imagederivative"."post_id" IN (...) ORDER BY "posts_imagederivative"."width" ASC
+
+-- posts:profile_follow
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."username" = ?
+SELECT "posts_follow"."id", "posts_follow"."user_id", "posts_follow"."author_id" FROM "posts_follow" WHERE ("posts_follow"."author_id" = ? AND "posts_follow"."user_id" = ?)
+
+-- posts:profile_unfollow
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."username" = ?
+SELECT "posts_follow"."id", "posts_follow"."user_id", "posts_follow"."author_id" FROM "posts_follow" WHERE ("posts_follow"."author_id" = ? AND "posts_follow"."user_id" = ?)
+
+-- posts:search
+SELECT rowid FROM posts_post_fts WHERE posts_post_fts MATCH ? ORDER BY rank, rowid DESC LIMIT ?
+SELECT "posts_post"."id", "posts_post"."text", "posts_post"."pub_date", "posts_post"."author_id", "posts_post"."group_id", "posts_post"."image", "posts_post"."updated_at", "posts_post"."comments_count", "auth_user"."id", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "posts_group"."id", "posts_group"."title", "posts_group"."slug" FROM "posts_post" INNER JOIN "auth_user" ON ("posts_post"."author_id" = "auth_user"."id") LEFT OUTER JOIN "posts_group" ON ("posts_post"."group_id" = "posts_group"."id") WHERE "posts_post"."id" IN (...)
+SELECT "posts_imagederivative"."id", "posts_imagederivative"."post_id", "posts_imagederivative"."source", "posts_imagederivative"."file", "posts_imagederivative"."format", "posts_imagederivative"."width", "posts_imagederivative"."height" FROM "posts_imagederivative" WHERE "posts_imagederivative"."post_id" IN (...) ORDER BY "posts_imagederivative"."width" ASC
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+
+-- users:login
+
+-- users:logout
+
+-- users:password_change
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+
+-- users:password_change_done
+SELECT "django_session"."session_key", "django_session"."session_data", "django_session"."expire_date" FROM "django_session" WHERE ("django_session"."expire_date" > ? AND "django_session"."session_key" = ?)
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+
+-- users:password_reset
+
+-- users:password_reset_complete
+
+-- users:password_reset_confirm
+SELECT "auth_user"."id", "auth_user"."password", "auth_user"."last_login", "auth_user"."is_superuser", "auth_user"."username", "auth_user"."first_name", "auth_user"."last_name", "auth_user"."email", "auth_user"."is_staff", "auth_user"."is_active", "auth_user"."date_joined" FROM "auth_user" WHERE "auth_user"."id" = ?
+SELECT (?) AS "a" FROM "django_session" WHERE "django_session"."session_key" = ?  LIMIT ?
+SAVEPOINT "?"
+INSERT INTO "django_session" ("session_key", "session_data", "expire_date") SELECT ?, ?, ?
+RELEASE SAVEPOINT "?"
+
+-- users:password_reset_done
+
+-- users:signup
+
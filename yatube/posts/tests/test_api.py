@@ -0,0 +1,257 @@
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+
+
+class ApiTests(TestCase):
+    """JSON API /api/v1/: списки курсорными страницами, выбор полей,
+    ETag и запись от имени пользователя сессии"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.leo = User.objects.create_user(username='leo')
+        cls.fedor = User.objects.create_user(username='fedor')
+        cls.group = Group.objects.create(
+            title='Классика', slug='classic', description='Книги'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.leo, group=cls.group, text=f'Пост {i}'
+            ) for i in range(5)
+        ]
+        cls.post = cls.posts[-1]
+        Post.objects.create(author=cls.fedor, text='Пост Федора')
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.fedor, text='Отличный пост'
+        )
+
+    def setUp(self):
+        self.guest = Client()
+        self.client = Client()
+        self.client.force_login(self.leo)
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_post_list_cursor_walk(self):
+        """Курсоры next обходят все посты автора по одному разу"""
+        url = reverse('api:posts') + '?author=leo&limit=2'
+        seen = []
+        while url:
+            data = self.guest.get(url).json()
+            seen.extend(post['id'] for post in data['results'])
+            url = data['next']
+        self.assertEqual(seen, [post.pk for post in reversed(self.posts)])
+        previous = self.guest.get(data['previous']).json()
+        self.assertEqual(len(previous['results']), 2)
+
+    def test_sparse_fields(self):
+        """В ответе и в SQL - только запрошенные поля"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest.get(
+                reverse('api:posts') + '?fields=id,text&group=classic'
+            )
+        post = response.json()['results'][0]
+        self.assertEqual(post, {'id': self.post.pk, 'text': self.post.text})
+        sql = queries[0]['sql']
+        self.assertNotIn('auth_user', sql)
+        self.assertNotIn('"posts_post"."image"', sql)
+        response = self.guest.get(reverse('api:posts') + '?fields=secret')
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_detail_and_etag(self):
+        url = reverse('api:post', args=[self.post.pk])
+        response = self.guest.get(url)
+        self.assertEqual(response.json(), {
+            'id': self.post.pk,
+            'text': self.post.text,
+            'author': 'leo',
+            'group': 'classic',
+            'pub_date': response.json()['pub_date'],
+            'updated_at': response.json()['updated_at'],
+            'image': None,
+            'comments_count': 1,
+        })
+        etag = response['ETag']
+        cached = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+        Post.objects.filter(pk=self.post.pk).update(text='Новый текст')
+        changed = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        missing = self.guest.get(reverse('api:post', args=[0]))
+        self.assertEqual(missing.status_code, 404)
+        self.assertIn('detail', missing.json())
+
+    def test_create_post(self):
+        url = reverse('api:posts')
+        data = {'text': 'Пост из API', 'group': 'classic'}
+        self.assertEqual(self.guest.post(url, data).status_code, 401)
+        response = self.send('post', url, data)
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get(pk=response.json()['id'])
+        self.assertEqual(
+            (post.author, post.group, post.text),
+            (self.leo, self.group, 'Пост из API')
+        )
+        self.assertEqual(
+            response['Location'], reverse('api:post', args=[post.pk])
+        )
+        response = self.send('post', url, {'text': '', 'group': 'classic'})
+        self.assertIn('text', response.json()['errors'])
+        response = self.send('post', url, {'text': 'Пост', 'group': 'none'})
+        self.assertIn('group', response.json()['errors'])
+        response = self.client.post(
+            url, 'не json', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_update_and_delete_post(self):
+        url = reverse('api:post', args=[self.post.pk])
+        response = self.send('patch', url, {'text': 'Исправлено'})
+        self.assertEqual(response.status_code, 200)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (self.post.text, self.post.group), ('Исправлено', self.group)
+        )
+        other = Client()
+        other.force_login(self.fedor)
+        response = other.delete(url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+
+    def test_update_multipart(self):
+        """PATCH multipart-формой: поля и картинка разбираются так же,
+        как у POST"""
+        media_root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, media_root, True)
+        url = reverse('api:post', args=[self.post.pk])
+        with override_settings(MEDIA_ROOT=media_root):
+            response = self.client.patch(url, encode_multipart(BOUNDARY, {
+                'text': 'Из формы',
+                'image': SimpleUploadedFile('small.gif', SMALL_GIF),
+            }), content_type=MULTIPART_CONTENT)
+        self.assertEqual(response.status_code, 200)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (self.post.text, self.post.group), ('Из формы', self.group)
+        )
+        self.assertTrue(self.post.image.name.endswith('.gif'))
+
+    def test_non_string_fields_rejected(self):
+        """Списки, объекты и числа вместо строк - 400, а не их
+        строковое представление в посте или комментарии"""
+        posts = reverse('api:posts')
+        comments = reverse('api:comments', args=[self.post.pk])
+        cases = (
+            ('post', posts, {'text': ['x']}),
+            ('post', posts, {'text': 5}),
+            ('post', posts, {'text': 'Пост', 'group': ['classic']}),
+            ('patch', reverse('api:post', args=[self.post.pk]),
+             {'text': {'a': 1}}),
+            ('post', comments, {'text': {'a': 1}}),
+        )
+        for method, url, data in cases:
+            with self.subTest(method=method, data=data):
+                response = self.send(method, url, data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.json())
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'Пост 4')
+        # группу можно снять, передав null
+        response = self.send(
+            'patch', reverse('api:post', args=[self.post.pk]),
+            {'group': None}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_csrf_failure_is_json(self):
+        """Запись без токена CSRF - 403 в JSON, а не страница сайта"""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.leo)
+        response = client.post(
+            reverse('api:posts'), json.dumps({'text': 'Пост'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('detail', response.json())
+        self.assertEqual(Post.objects.filter(text='Пост').count(), 0)
+        response = client.post(reverse('posts:post_create'), {'text': 'Пост'})
+        self.assertEqual(response.status_code, 403)
+        self.assertTemplateUsed(response, 'core/403csrf.html')
+
+    def test_comments(self):
+        url = reverse('api:comments', args=[self.post.pk])
+        response = self.guest.get(url)
+        self.assertEqual(response.json()['results'], [{
+            'id': self.comment.pk,
+            'post': self.post.pk,
+            'author': 'fedor',
+            'text': 'Отличный пост',
+            'created': response.json()['results'][0]['created'],
+        }])
+        response = self.send('post', url, {'text': 'Спасибо'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], 'leo')
+        self.assertEqual(self.post.comments.count(), 2)
+        missing = reverse('api:comments', args=[0])
+        self.assertEqual(self.guest.get(missing).status_code, 404)
+
+    def test_groups(self):
+        response = self.guest.get(reverse('api:groups') + '?fields=slug')
+        self.assertEqual(response.json()['results'], [{'slug': 'classic'}])
+        self.assertEqual(
+            self.client.post(reverse('api:groups')).status_code, 405
+        )
+
+    def test_follow(self):
+        url = reverse('api:follows')
+        self.assertEqual(self.guest.get(url).status_code, 401)
+        response = self.send('post', url, {'author': 'fedor'})
+        self.assertEqual(response.status_code, 201)
+        response = self.send('post', url, {'author': 'fedor'})
+        self.assertEqual(response.status_code, 200)
+        response = self.send('post', url, {'author': 'leo'})
+        self.assertEqual(response.status_code, 400)
+        results = self.client.get(url + '?fields=author').json()['results']
+        self.assertEqual(results, [{'author': 'fedor'}])
+        response = self.client.delete(reverse('api:follow', args=['fedor']))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Follow.objects.filter(user=self.leo).exists())
+
+    def test_limit(self):
+        url = reverse('api:posts')
+        for limit in ('0', '1000', 'много'):
+            with self.subTest(limit=limit):
+                response = self.guest.get(url, {'limit': limit})
+                self.assertEqual(response.status_code, 400)
+        response = self.guest.get(url, {'limit': 1})
+        self.assertEqual(len(response.json()['results']), 1)
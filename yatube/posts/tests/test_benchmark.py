@@ -0,0 +1,54 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TransactionTestCase, override_settings
+
+from posts import benchmark
+from posts.models import Follow, Post, TimelineEntry
+
+
+class BenchmarkTests(TransactionTestCase):
+    """Заполнение синтетическими данными и прогон сценариев"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        override = override_settings(
+            MEDIA_ROOT=self.directory, SEARCH_INDEX_DIR=self.directory
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_seed_and_run(self):
+        dataset = benchmark.seed(
+            users=12, groups=2, posts=30, comments=20, image_ratio=0.2
+        )
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Follow.objects.count(), dataset.params['follows'])
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=dataset.reader).exists()
+        )
+        self.assertTrue(Post.objects.filter(derivatives__isnull=False))
+
+        results = benchmark.run(
+            dataset, benchmark.READ_SCENARIOS, requests=2, threads=2
+        )
+        for driver, requests in (('client', 2), ('wsgi', 4)):
+            for name in benchmark.READ_SCENARIOS:
+                with self.subTest(driver=driver, name=name):
+                    result = results[driver][name]
+                    self.assertEqual(result['requests'], requests)
+                    self.assertEqual(result['errors'], 0)
+                    self.assertLessEqual(result['p50'], result['p99'])
+
+        writes = benchmark.run_client(
+            dataset, benchmark.WRITE_SCENARIOS, requests=2
+        )
+        self.assertEqual(writes['post_create']['errors'], 0)
+        self.assertEqual(Post.objects.count(), 33)
+
+        report = {'results': results}
+        lines = benchmark.compare(report, report)
+        self.assertEqual(len(lines), 2 * len(benchmark.READ_SCENARIOS))
+        self.assertIn('(+0%)', lines[0])
@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.test import TestCase
+
+from posts import counters, search
+from posts.models import Comment, Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+RECORDS = [
+    # пост идет раньше автора: внешние ключи проверяются в конце
+    {'model': 'posts.post', 'pk': 10, 'fields': {
+        'text': 'Первый пост про котиков',
+        'pub_date': '2021-09-01T10:00:00Z',
+        'author': 1, 'group': 1, 'image': '',
+    }},
+    {'model': 'auth.user', 'pk': 1, 'fields': {
+        'username': 'leo', 'password': '!', 'first_name': 'Лев',
+        'last_name': 'Толстой', 'email': '', 'is_staff': False,
+        'is_active': True, 'is_superuser': False,
+        'date_joined': '2021-08-01T10:00:00Z', 'groups': [],
+        'user_permissions': [],
+    }},
+    {'model': 'auth.user', 'pk': 2, 'fields': {
+        'username': 'fedor', 'password': '!',
+        'date_joined': '2021-08-01T10:00:00Z',
+    }},
+    {'model': 'posts.group', 'pk': 1, 'fields': {
+        'title': 'Классика', 'slug': 'classic', 'description': 'Книги',
+    }},
+    {'model': 'posts.post', 'pk': 11, 'fields': {
+        'text': 'Второй пост про собак',
+        'pub_date': '2021-09-02T10:00:00Z',
+        'author': 1, 'group': None, 'image': '',
+    }},
+    {'model': 'posts.comment', 'pk': 1, 'fields': {
+        'text': 'Отличный пост', 'created': '2021-09-03T10:00:00Z',
+        'author': 2, 'post': 10,
+    }},
+    {'model': 'posts.follow', 'pk': 1, 'fields': {'user': 2, 'author': 1}},
+    {'model': 'sessions.session', 'pk': 'abc', 'fields': {}},
+]
+
+
+class BulkImportTests(TestCase):
+    """Команда bulk_import: форматы, даты из файла и пересборка
+    денормализованных данных"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def run_import(self, path, *args):
+        out = io.StringIO()
+        call_command('bulk_import', path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_json(self):
+        """Потоковый JSON: все модели, даты и производные данные"""
+        path = self.write('dump.json', json.dumps(RECORDS, indent=2))
+        output = self.run_import(path, '--batch-size', '1')
+
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 2)
+        post = Post.objects.get(pk=10)
+        self.assertEqual(
+            post.pub_date.isoformat(), '2021-09-01T10:00:00+00:00'
+        )
+        self.assertEqual(
+            Comment.objects.get().created.isoformat(),
+            '2021-09-03T10:00:00+00:00'
+        )
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(counters.author_posts(1), 2)
+        self.assertEqual(counters.followers(1), 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user_id=2).count(), 2
+        )
+        self.assertEqual(search.post_ids('котиков'), [10])
+        self.assertIn('Пропущено записей других моделей: 1', output)
+        self.assertIn('в секунду', output)
+
+    def test_ndjson(self):
+        path = self.write('dump.ndjson', '\n'.join(
+            json.dumps(record) for record in RECORDS
+        ))
+        self.run_import(path)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_csv(self):
+        """CSV - одна модель на файл, колонки - поля"""
+        User.objects.create_user(username='leo', pk=1)
+        path = self.write('posts.csv', (
+            'pk,text,pub_date,author,group\n'
+            '5,Пост из таблицы,2021-09-01 10:00:00,1,\n'
+            ',Пост без pk,2021-09-02 10:00:00,1,\n'
+        ))
+        self.run_import(path, '--model', 'posts.post')
+        self.assertEqual(Post.objects.filter(group__isnull=True).count(), 2)
+        self.assertTrue(Post.objects.filter(pk=5).exists())
+        self.assertEqual(counters.total_posts(), 2)
+
+    def test_broken_references(self):
+        """Ссылка на несуществующего автора обнаруживается после
+        загрузки"""
+        path = self.write('broken.json', json.dumps(RECORDS[:1]))
+        with self.assertRaises(IntegrityError):
+            self.run_import(path)
+        # загрузка откатывается целиком
+        self.assertFalse(Post.objects.exists())
+
+    def test_truncated_json(self):
+        path = self.write('broken.json', json.dumps(RECORDS)[:-20])
+        with self.assertRaises(CommandError):
+            self.run_import(path)
@@ -1,18 +1,17 @@
-import unittest
-
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.test import Client, TestCase
+from django.test import Client, SimpleTestCase, TestCase
 from django.urls import reverse
 
 from posts.models import Post
 from posts.tests.test_funcs import posts_create
+from yatube.caches import caches, is_shared
 
 User = get_user_model()
 
 
 class CacheTest(TestCase):
-    """Проверка кэширования индексной страницы"""
+    """Проверка кэширования лент"""
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -32,25 +31,142 @@ class CacheTest(TestCase):
 
         cls.new_first_post_text = 'Обновленный пост'
 
-    @unittest.skip
+    def setUp(self):
+        cache.clear()
+
     def test_cache_for_index(self):
+        """Лента берется из кэша, пока посты не менялись"""
         response = self.authorized_client.get(reverse('posts:index'))
-        first_post_text = str(response.context['page_obj'][0].text)
         first_post_id = response.context['page_obj'][0].id
 
-        # проверяем наличие поста на главной странице
-        self.assertIn(first_post_text, response.content.decode('utf-8'))
+        # правка в обход сигналов не сбрасывает кэш
+        Post.objects.filter(pk=first_post_id).update(
+            text=self.new_first_post_text
+        )
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertNotIn(
+            self.new_first_post_text, response.content.decode('utf-8')
+        )
+
+        cache.clear()
+
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertIn(
+            self.new_first_post_text, response.content.decode('utf-8')
+        )
+
+    def test_cache_invalidated_on_delete(self):
+        """Удаленный пост сразу пропадает со всех лент"""
+        pages_names = [
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username})
+        ]
+        first_post = Post.objects.filter(group=self.group).first()
+        first_post_text = f'{first_post.text}</p>'
+        for reverse_name in pages_names:
+            response = self.authorized_client.get(reverse_name)
+            self.assertIn(first_post_text, response.content.decode('utf-8'))
 
-        # удаляем пост
-        first_post = Post.objects.get(pk=first_post_id)
         first_post.delete()
 
-        # пост остался на главной странице
+        for reverse_name in pages_names:
+            with self.subTest(reverse_name=reverse_name):
+                response = self.authorized_client.get(reverse_name)
+                self.assertNotIn(
+                    first_post_text, response.content.decode('utf-8')
+                )
+
+    def test_cache_keyed_by_page(self):
+        """Разные страницы ленты кэшируются отдельно"""
+        first = self.authorized_client.get(reverse('posts:index'))
+        second = self.authorized_client.get(
+            reverse('posts:index') + '?page=2'
+        )
+        self.assertNotEqual(first.content, second.content)
+
+    def test_group_rename_invalidates_feeds(self):
+        """Переименование группы сбрасывает ленты с ее постами"""
+        self.authorized_client.get(reverse('posts:index'))
+        self.group.title = 'Новое название группы'
+        self.group.save()
         response = self.authorized_client.get(reverse('posts:index'))
-        self.assertIn(first_post_text, response.content.decode('utf-8'))
+        self.assertIn(
+            'Новое название группы', response.content.decode('utf-8')
+        )
+
 
+class PostCardCacheTest(TestCase):
+    """Проверка кэширования карточек постов"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(
+            username='VasyaPetrov', first_name='Вася', last_name='Петров'
+        )
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
         cache.clear()
 
-        # поста нет на главной странице после очиски кэша
+    def test_unchanged_card_is_reused(self):
+        """Карточка неизменного поста не перерисовывается, даже когда
+        лента сброшена новым постом"""
+        self.authorized_client.get(reverse('posts:index'))
+        Post.objects.filter(pk=self.post.pk).update(text='Тихая правка')
+        Post.objects.create(author=self.user, text='Еще один пост')
+
+        response = self.authorized_client.get(reverse('posts:index'))
+        content = response.content.decode('utf-8')
+        self.assertIn('Еще один пост', content)
+        self.assertIn('Тестовый пост', content)
+        self.assertNotIn('Тихая правка', content)
+
+    def test_edit_invalidates_card(self):
+        """Редактирование поста обновляет его карточку"""
+        self.authorized_client.get(reverse('posts:index'))
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Отредактированный пост'}
+        )
         response = self.authorized_client.get(reverse('posts:index'))
-        self.assertNotIn(first_post_text, response.content.decode('utf-8'))
+        self.assertIn(
+            'Отредактированный пост', response.content.decode('utf-8')
+        )
+
+    def test_author_rename_invalidates_card(self):
+        """Смена имени автора обновляет карточки его постов"""
+        self.authorized_client.get(reverse('posts:index'))
+        self.user.first_name = 'Василий'
+        self.user.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertIn('Василий Петров', response.content.decode('utf-8'))
+
+
+class CacheConfigTests(SimpleTestCase):
+    """CACHES из переменной окружения CACHE_URL"""
+
+    def test_locmem_by_default(self):
+        config = caches({})
+        self.assertEqual(
+            config['default'], {'BACKEND': 'core.cache.LocMemCache'}
+        )
+        self.assertFalse(is_shared(config))
+
+    def test_shared(self):
+        config = caches({'CACHE_URL': 'memcached://mc1:11211,mc2:11211'})
+        self.assertEqual(config['default'], {
+            'BACKEND': 'core.cache.MemcachedCache',
+            'LOCATION': ['mc1:11211', 'mc2:11211'],
+        })
+        self.assertTrue(is_shared(config))
+        config = caches({'CACHE_URL': 'file:///var/tmp/yatube'})
+        self.assertEqual(config['default']['LOCATION'], '/var/tmp/yatube')
+        self.assertTrue(is_shared(config))
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            caches({'CACHE_URL': 'redis://localhost'})
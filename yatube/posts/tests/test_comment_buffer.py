@@ -0,0 +1,121 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts import comment_buffer
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENT_BUFFER=True, COMMENT_FLUSH_INTERVAL=60000)
+class CommentBufferTests(TestCase):
+    """Комментарии пишутся пачками, автор видит свои сразу"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='VasyaPetrov')
+        cls.reader = User.objects.create_user(username='PetyaVasechkin')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+        self.detail = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+
+    def tearDown(self):
+        comment_buffer.stop()
+
+    def comment(self, text):
+        return self.client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': text}
+        )
+
+    def test_read_your_writes(self):
+        self.assertRedirects(self.comment('Отложенный'), self.detail)
+        self.assertFalse(Comment.objects.exists())
+        self.assertContains(self.client.get(self.detail), 'Отложенный')
+        reader = Client()
+        reader.force_login(self.reader)
+        self.assertNotContains(reader.get(self.detail), 'Отложенный')
+
+        self.assertEqual(comment_buffer.flush(), 1)
+        self.assertEqual(self.post.comments.get().text, 'Отложенный')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        self.assertContains(
+            self.client.get(self.detail), 'Отложенный', count=1
+        )
+
+    def test_stop_flushes(self):
+        self.comment('Первый')
+        self.comment('Второй')
+        comment_buffer.stop()
+        self.assertEqual(self.post.comments.count(), 2)
+        self.assertEqual(
+            comment_buffer.pending(self.post.pk, self.author.pk), []
+        )
+
+    def test_deleted_post(self):
+        """Комментарии к посту, удаленному до записи, отбрасываются"""
+        deleted = Post.objects.create(author=self.author, text='Удаленный')
+        self.client.post(
+            reverse('posts:add_comment', kwargs={'post_id': deleted.pk}),
+            {'text': 'К удаленному'}
+        )
+        self.comment('К живому')
+        deleted.delete()
+        self.assertEqual(comment_buffer.flush(), 1)
+        self.assertEqual(Comment.objects.get().text, 'К живому')
+
+    def test_failed_batch_written_one_by_one(self):
+        """Ошибка записи пачки теряет только сломанный комментарий"""
+        write = comment_buffer._write
+
+        def failing(comments):
+            if any(comment.text == 'Сломанный' for comment in comments):
+                raise ValueError('сломанный комментарий')
+            return write(comments)
+
+        for text in ('Первый', 'Сломанный', 'Второй'):
+            self.comment(text)
+        with mock.patch.object(comment_buffer, '_write', failing):
+            with self.assertLogs('posts.comment_buffer', 'ERROR'):
+                self.assertEqual(comment_buffer.flush(), 2)
+        self.assertEqual(
+            sorted(self.post.comments.values_list('text', flat=True)),
+            ['Второй', 'Первый']
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+
+
+@override_settings(
+    COMMENT_BUFFER=True, COMMENT_FLUSH_INTERVAL=60000, COMMENT_FLUSH_SIZE=3
+)
+class CommentBufferThreadTests(TransactionTestCase):
+    """Фоновый поток пишет пачку, как только она набрана"""
+
+    def tearDown(self):
+        comment_buffer.stop()
+
+    def test_flush_by_size(self):
+        author = User.objects.create_user(username='VasyaPetrov')
+        post = Post.objects.create(author=author, text='Пост')
+        for number in range(3):
+            comment_buffer.add(
+                Comment(post=post, author=author, text=f'Комментарий {number}')
+            )
+        deadline = time.monotonic() + 5
+        while Comment.objects.count() < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(Comment.objects.count(), 3)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 3)
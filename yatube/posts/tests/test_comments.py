@@ -1,7 +1,7 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from posts.models import Post, Group, Comment
@@ -95,3 +95,74 @@ class CommentsCreateFormTests(TestCase):
         self.assertFalse(
             Comment.objects.filter(text=self.new_comment_text).exists()
         )
+
+
+@override_settings(COMMENTS_NUMBER=3)
+class CommentThreadTests(TestCase):
+    """Комментарии на странице поста - страницами по дате, следующие
+    подгружаются фрагментом"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='VasyaPetrov')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        cls.comments = [
+            Comment.objects.create(
+                author=cls.user, text=f'Комментарий {i}', post=cls.post
+            ) for i in range(7)
+        ]
+        # у новейших комментариев одна дата: порядок задает id
+        Comment.objects.filter(pk__in=[
+            comment.pk for comment in cls.comments[-3:]
+        ]).update(created=cls.comments[-1].created)
+        cls.newest_first = [comment.pk for comment in reversed(cls.comments)]
+
+    def test_detail_shows_first_page(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        page = response.context['comments']
+        self.assertEqual(
+            [comment.pk for comment in page], self.newest_first[:3]
+        )
+        self.assertEqual(page.paginator.count, 7)
+        self.assertContains(
+            response, reverse(
+                'posts:post_comments', kwargs={'post_id': self.post.id}
+            ) + f'?cursor={page.next_cursor}'
+        )
+
+    def test_fragment_walk(self):
+        """Фрагменты по курсорам отдают все комментарии по одному разу"""
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.id})
+        seen = []
+        cursor = ''
+        while cursor is not None:
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertTemplateUsed(
+                response, 'posts/includes/comment_list.html'
+            )
+            self.assertNotContains(response, '<html')
+            page = response.context['comments']
+            seen.extend(comment.pk for comment in page)
+            cursor = page.next_cursor
+        self.assertEqual(seen, self.newest_first)
+
+    def test_fragment_json(self):
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.id})
+        data = self.client.get(url, {'format': 'json'}).json()
+        self.assertEqual(
+            [comment['id'] for comment in data['results']],
+            self.newest_first[:3]
+        )
+        data = self.client.get(data['next']).json()
+        self.assertEqual(
+            [comment['id'] for comment in data['results']],
+            self.newest_first[3:6]
+        )
+        response = self.client.get(url, {'format': 'json', 'fields': 'x'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        missing = reverse('posts:post_comments', kwargs={'post_id': 0})
+        self.assertEqual(
+            self.client.get(missing).status_code, HTTPStatus.NOT_FOUND
+        )
@@ -0,0 +1,139 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    """Проверка денормализованных счетчиков постов и комментариев"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='VasyaPetrov')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Тестовое описание',
+        )
+        for i in range(3):
+            Post.objects.create(
+                author=cls.user, text=f'Пост {i}', group=cls.group
+            )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_counters_follow_posts(self):
+        """Счетчики меняются при создании, смене группы и удалении"""
+        self.assertEqual(counters.total_posts(), 3)
+        self.assertEqual(counters.author_posts(self.user.pk), 3)
+        self.assertEqual(counters.group_posts(self.group.pk), 3)
+        self.assertEqual(counters.group_posts(self.other_group.pk), 0)
+
+        post = Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group
+        )
+        self.assertEqual(counters.total_posts(), 4)
+        self.assertEqual(counters.group_posts(self.group.pk), 4)
+
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(counters.group_posts(self.group.pk), 3)
+        self.assertEqual(counters.group_posts(self.other_group.pk), 1)
+
+        post.delete()
+        self.assertEqual(counters.total_posts(), 3)
+        self.assertEqual(counters.author_posts(self.user.pk), 3)
+        self.assertEqual(counters.group_posts(self.other_group.pk), 0)
+
+    def test_comments_count(self):
+        """Число комментариев хранится в посте"""
+        post = Post.objects.first()
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='Комментарий'
+        )
+        Comment.objects.create(post=post, author=self.user, text='Еще')
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
+
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_rebuild(self):
+        """Пересчет восстанавливает счетчики после записи в обход
+        сигналов"""
+        counters.total_posts()
+        Post.objects.bulk_create([
+            Post(author=self.user, text='Массовый пост', group=self.group)
+        ])
+        self.assertEqual(counters.total_posts(), 3)
+        counters.rebuild()
+        self.assertEqual(counters.total_posts(), 4)
+        self.assertEqual(counters.group_posts(self.group.pk), 4)
+
+    def test_lazy_count_race(self):
+        """Пост, появившийся между подсчетом и созданием строки счетчика,
+        не теряется"""
+        def insert_post_first(execute, sql, params, many, context):
+            if sql.startswith('INSERT') and 'posts_counter' in sql:
+                Post.objects.create(author=self.user, text='Параллельный')
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(insert_post_first):
+            value = counters.author_posts(self.user.pk)
+        self.assertEqual(Post.objects.filter(author=self.user).count(), 4)
+        self.assertEqual(value, 4)
+        self.assertEqual(counters.author_posts(self.user.pk), 4)
+
+    def test_deferred_fields_not_loaded(self):
+        """Сигналы post_init не дочитывают отложенные поля по строке"""
+        with self.assertNumQueries(1):
+            list(Post.objects.only('text'))
+        with self.assertNumQueries(1):
+            list(Group.objects.only('slug'))
+        with self.assertNumQueries(1):
+            list(User.objects.only('username'))
+
+    def test_deferred_group_counters(self):
+        """Смена группы и удаление поста с отложенной группой меняют
+        счетчики групп"""
+        counters.group_posts(self.group.pk)
+        counters.group_posts(self.other_group.pk)
+        post = Post.objects.only('text').first()
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(counters.group_posts(self.group.pk), 2)
+        self.assertEqual(counters.group_posts(self.other_group.pk), 1)
+
+        Post.objects.only('text').get(pk=post.pk).delete()
+        self.assertEqual(counters.group_posts(self.other_group.pk), 0)
+        post = Post.objects.defer('group').exclude(pk=post.pk).first()
+        post.text = 'Правка'
+        post.save()
+        self.assertEqual(counters.group_posts(self.group.pk), 2)
+
+    def test_profile_without_count_query(self):
+        """Профиль не считает посты автора запросом к таблице постов"""
+        counters.author_posts(self.user.pk)
+        url = reverse('posts:profile', kwargs={'username': self.user.username})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url)
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'].upper())
+        self.assertEqual(response.context['posts_count'], 3)
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
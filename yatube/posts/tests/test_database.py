@@ -0,0 +1,96 @@
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test import override_settings
+
+from core import db
+from posts.models import Post
+from yatube.database import databases, parse_url
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    """DATABASES из переменных окружения"""
+
+    def test_sqlite_by_default(self):
+        config = databases({}, 'sqlite:////srv/yatube/db.sqlite3')
+        self.assertEqual(list(config), ['default'])
+        self.assertEqual(
+            config['default']['ENGINE'], 'django.db.backends.sqlite3'
+        )
+        self.assertEqual(config['default']['NAME'], '/srv/yatube/db.sqlite3')
+        self.assertEqual(config['default']['CONN_MAX_AGE'], 60)
+
+    def test_postgres_with_replicas(self):
+        config = databases({
+            'DATABASE_URL': 'postgres://yatube:p%40ss@db:6432/yatube',
+            'DATABASE_REPLICA_URLS': 'postgres://ro@replica1/yatube, '
+                                     'postgres://ro@replica2/yatube',
+            'DATABASE_CONN_MAX_AGE': '300',
+        }, 'sqlite:///db.sqlite3')
+        self.assertEqual(
+            list(config), ['default', 'replica_1', 'replica_2']
+        )
+        default = config['default']
+        self.assertEqual(
+            default['ENGINE'], 'django.db.backends.postgresql'
+        )
+        self.assertEqual(
+            (default['USER'], default['PASSWORD'], default['HOST'],
+             default['PORT'], default['NAME']),
+            ('yatube', 'p@ss', 'db', '6432', 'yatube')
+        )
+        self.assertEqual(default['CONN_MAX_AGE'], 300)
+        self.assertEqual(config['replica_2']['HOST'], 'replica2')
+        self.assertEqual(
+            config['replica_1']['TEST'], {'MIRROR': 'default'}
+        )
+
+    def test_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            parse_url('mysql://localhost/yatube')
+
+
+class SqlitePragmaTests(TestCase):
+    def test_pragmas_applied(self):
+        """Настройки SQLite задаются при открытии соединения"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            # 1 - NORMAL
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20000)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_PIN_SECONDS=10)
+class RouterTests(SimpleTestCase):
+    """Ленты читаются с реплики, представления записи и чтение сразу
+    после записи - с основной базы"""
+
+    def setUp(self):
+        self.router = db.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def read_alias(self, request, *args):
+        return HttpResponse(self.router.db_for_read(Post))
+
+    def test_feed_reads_from_replica(self):
+        view = db.read_from_replica(self.read_alias)
+        response = view(self.factory.get('/'))
+        self.assertEqual(response.content, b'replica_1')
+        # вне представлений лент - основная база
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_write_pins_reads_to_primary(self):
+        write = db.write_to_primary(self.read_alias)
+        response = write(self.factory.post('/create/'))
+        self.assertEqual(response.content, b'default')
+
+        request = self.factory.get('/')
+        request.COOKIES[db.PIN_COOKIE] = response.cookies[db.PIN_COOKIE].value
+        response = db.read_from_replica(self.read_alias)(request)
+        self.assertEqual(response.content, b'default')
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'posts'))
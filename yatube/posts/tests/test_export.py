@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    """Потоковая выгрузка командой export_posts и по адресу /export/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.leo = User.objects.create_user(username='leo')
+        cls.fedor = User.objects.create_user(username='fedor')
+        cls.group = Group.objects.create(
+            title='Классика', slug='classic', description='Книги'
+        )
+        cls.old_post = Post.objects.create(
+            author=cls.leo, group=cls.group, text='Старый пост'
+        )
+        cls.new_post = Post.objects.create(author=cls.leo, text='Новый пост')
+        cls.fedor_post = Post.objects.create(
+            author=cls.fedor, group=cls.group, text='Пост Федора'
+        )
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.make_aware(datetime(2021, 9, 1, 23, 59))
+        )
+        Post.objects.filter(pk=cls.new_post.pk).update(
+            pub_date=timezone.make_aware(datetime(2021, 9, 2))
+        )
+        Comment.objects.create(
+            post=cls.old_post, author=cls.fedor, text='Отличный пост'
+        )
+        Follow.objects.create(user=cls.fedor, author=cls.leo)
+
+    def export(self, *args):
+        out = io.StringIO()
+        call_command('export_posts', *args, stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def test_ndjson_with_filters(self):
+        """Записи в формате dumpdata, даты фильтра включительно"""
+        lines = self.export(
+            '--author', 'leo', '--since', '2021-09-01', '--until',
+            '2021-09-01', '--chunk-size', '1'
+        ).splitlines()
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual(record['model'], 'posts.post')
+        self.assertEqual(record['pk'], self.old_post.pk)
+        self.assertEqual(record['fields']['text'], 'Старый пост')
+        self.assertEqual(record['fields']['author'], self.leo.pk)
+        self.assertEqual(record['fields']['group'], self.group.pk)
+
+    def test_csv(self):
+        output = self.export('--kind', 'comments', '--format', 'csv',
+                             '--group', 'classic')
+        rows = list(csv.DictReader(io.StringIO(output)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['text'], 'Отличный пост')
+        self.assertEqual(rows[0]['post'], str(self.old_post.pk))
+
+    def test_filter_not_applicable(self):
+        with self.assertRaises(CommandError):
+            self.export('--kind', 'follows', '--group', 'classic')
+
+    def test_view_requires_login(self):
+        response = self.client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_streams_own_rows(self):
+        """Обычный пользователь получает только свои записи"""
+        self.client.force_login(self.fedor)
+        response = self.client.get(reverse('posts:export'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="posts.ndjson"'
+        )
+        records = [
+            json.loads(line) for line in
+            b''.join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(
+            [record['pk'] for record in records], [self.fedor_post.pk]
+        )
+
+    def test_view_staff_exports_all(self):
+        staff = User.objects.create_user(username='admin', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(
+            reverse('posts:export'),
+            {'kind': 'follows', 'format': 'csv', 'author': 'leo'}
+        )
+        rows = list(csv.reader(io.StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        self.assertEqual(rows, [
+            ['pk', 'user', 'author'],
+            [str(Follow.objects.get().pk), str(self.fedor.pk),
+             str(self.leo.pk)],
+        ])
+
+    def test_view_bad_parameters(self):
+        self.client.force_login(self.leo)
+        for params in (
+            {'kind': 'users'},
+            {'format': 'xml'},
+            {'since': 'вчера'},
+            {'kind': 'follows', 'until': '2021-09-01'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('posts:export'), params)
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,152 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class BulkFollowTests(TestCase):
+    """Массовая подписка и отписка списком имен: подписки, счетчики
+    подписчиков и лента меняются так же, как по одной"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='PetyaVasechkin')
+        cls.leo = User.objects.create_user(username='leo')
+        cls.fedor = User.objects.create_user(username='fedor')
+        cls.post = Post.objects.create(author=cls.leo, text='Пост Льва')
+        Post.objects.create(author=cls.fedor, text='Пост Федора')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.url = reverse('api:follows')
+
+    def send(self, method, authors):
+        return getattr(self.client, method)(
+            self.url, json.dumps({'authors': authors}),
+            content_type='application/json'
+        )
+
+    def test_follow_and_unfollow(self):
+        # счетчик заводится при первом чтении и дальше правится
+        self.assertEqual(counters.followers(self.leo.pk), 0)
+        authors = ['leo', 'fedor', 'nobody', 'PetyaVasechkin']
+        response = self.send('post', authors)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'followed': ['fedor', 'leo'], 'missing': ['nobody'],
+        })
+        self.assertEqual(
+            set(Follow.objects.filter(user=self.reader).values_list(
+                'author__username', flat=True
+            )), {'leo', 'fedor'}
+        )
+        self.assertEqual(counters.followers(self.leo.pk), 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 2
+        )
+        # повтор ничего не меняет
+        response = self.send('post', ['leo'])
+        self.assertEqual(response.json()['followed'], [])
+        self.assertEqual(counters.followers(self.leo.pk), 1)
+
+        response = self.send('delete', ['leo', 'nobody'])
+        self.assertEqual(response.json(), {
+            'unfollowed': ['leo'], 'missing': ['nobody'],
+        })
+        self.assertEqual(counters.followers(self.leo.pk), 0)
+        self.assertFalse(TimelineEntry.objects.filter(
+            user=self.reader, post=self.post
+        ).exists())
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.fedor
+        ).exists())
+
+    def test_counters_recounted(self):
+        """Счетчик подписчиков - по таблице, а не прибавкой к
+        прочитанному: подписку, записанную мимо сигналов (параллельным
+        запросом), он тоже учитывает"""
+        self.assertEqual(counters.followers(self.leo.pk), 0)
+        Follow.objects.bulk_create([Follow(user=self.fedor, author=self.leo)])
+        self.send('post', ['leo'])
+        self.assertEqual(counters.followers(self.leo.pk), 2)
+        self.send('delete', ['leo'])
+        self.assertEqual(counters.followers(self.leo.pk), 1)
+
+    def test_constant_queries(self):
+        """Запросов одинаково для одного и для многих авторов"""
+        with self.assertNumQueries(14):
+            self.send('post', ['leo'])
+        with self.assertNumQueries(14):
+            self.send('post', ['fedor', 'PetyaVasechkin'])
+
+    @override_settings(FOLLOW_BULK_LIMIT=1)
+    def test_invalid(self):
+        for authors in ('leo', [1], ['leo', 'fedor']):
+            with self.subTest(authors=authors):
+                self.assertEqual(
+                    self.send('post', authors).status_code, 400
+                )
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(
+            Client().delete(self.url).status_code, 401
+        )
+
+
+class ImportFollowsTests(TestCase):
+    """Команда import_follows: подписки из CSV user,author"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        for name in ('leo', 'fedor', 'anton'):
+            User.objects.create_user(username=name)
+
+    def run_import(self, content):
+        path = os.path.join(self.directory, 'follows.csv')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        out = io.StringIO()
+        call_command('import_follows', path, stdout=out)
+        return out.getvalue()
+
+    def test_import(self):
+        Follow.objects.create(
+            user=User.objects.get(username='fedor'),
+            author=User.objects.get(username='leo'),
+        )
+        output = self.run_import(
+            'user,author\n'
+            'fedor,leo\n'
+            'fedor,anton\n'
+            'anton,leo\n'
+            'anton,anton\n'
+            'anton,nobody\n'
+            'ghost,leo\n'
+        )
+        self.assertEqual(
+            sorted(Follow.objects.values_list(
+                'user__username', 'author__username'
+            )),
+            [('anton', 'leo'), ('fedor', 'anton'), ('fedor', 'leo')]
+        )
+        self.assertIn('Не найдены пользователи (2): ghost, nobody', output)
+        self.assertIn('Добавлено подписок: 2 из 6', output)
+
+    def test_missing_columns(self):
+        with self.assertRaises(CommandError):
+            self.run_import('follower,author\nfedor,leo\n')
@@ -0,0 +1,133 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, RequestFactory, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.db import read_from_replica
+from posts.follow_graph import graph, intersection
+from posts.models import Follow
+
+User = get_user_model()
+
+
+@override_settings(FOLLOW_GRAPH_TIMEOUT=3600)
+class FollowGraphTests(TransactionTestCase):
+    """Подписки из кэша: после первого чтения - без запросов, правки
+    видны после фиксации транзакции"""
+
+    def setUp(self):
+        cache.clear()
+        self.leo, self.fedor, self.anton = [
+            User.objects.create_user(username=name)
+            for name in ('leo', 'fedor', 'anton')
+        ]
+        Follow.objects.create(user=self.fedor, author=self.leo)
+        Follow.objects.create(user=self.anton, author=self.leo)
+
+    def test_queries_from_cache(self):
+        self.assertEqual(graph.followers_count(self.leo.pk), 2)
+        self.assertEqual(graph.following_count(self.fedor.pk), 1)
+        self.assertEqual(graph.following_count(self.leo.pk), 0)
+        with self.assertNumQueries(0):
+            self.assertTrue(graph.is_following(self.fedor.pk, self.leo.pk))
+            self.assertFalse(graph.is_following(self.leo.pk, self.fedor.pk))
+            self.assertEqual(
+                list(graph.followers(self.leo.pk)),
+                sorted([self.fedor.pk, self.anton.pk])
+            )
+        self.assertFalse(graph.is_following(None, self.leo.pk))
+
+    def test_follow_and_unfollow_update_cache(self):
+        for user in (self.leo, self.fedor):
+            graph.followers_count(user.pk)
+            graph.following_count(user.pk)
+        self.assertTrue(graph.follow(self.leo, self.fedor))
+        self.assertFalse(graph.follow(self.leo, self.fedor))
+        with self.assertNumQueries(0):
+            self.assertTrue(graph.is_mutual(self.leo.pk, self.fedor.pk))
+            self.assertEqual(graph.mutual(self.leo.pk), [self.fedor.pk])
+            self.assertEqual(graph.followers_count(self.fedor.pk), 1)
+        self.assertTrue(graph.unfollow(self.leo, self.fedor))
+        self.assertFalse(graph.unfollow(self.leo, self.fedor))
+        with self.assertNumQueries(0):
+            self.assertFalse(graph.is_following(self.leo.pk, self.fedor.pk))
+            self.assertEqual(graph.followers_count(self.fedor.pk), 0)
+
+    def test_rollback_leaves_cache(self):
+        graph.following_count(self.leo.pk)
+        try:
+            with transaction.atomic():
+                graph.follow(self.leo, self.anton)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(graph.is_following(self.leo.pk, self.anton.pk))
+
+    def test_follow_many_updates_cache(self):
+        for user in (self.leo, self.fedor, self.anton):
+            graph.followers_count(user.pk)
+            graph.following_count(user.pk)
+        added = graph.follow_many(
+            self.leo.pk, [self.fedor.pk, self.anton.pk, self.leo.pk]
+        )
+        self.assertEqual(added, sorted([self.fedor.pk, self.anton.pk]))
+        with self.assertNumQueries(0):
+            self.assertEqual(graph.following_count(self.leo.pk), 2)
+            self.assertTrue(graph.is_mutual(self.leo.pk, self.anton.pk))
+        self.assertEqual(
+            graph.unfollow_many(self.leo.pk, [self.fedor.pk]), [self.fedor.pk]
+        )
+        with self.assertNumQueries(0):
+            self.assertFalse(graph.is_following(self.leo.pk, self.fedor.pk))
+            self.assertEqual(graph.followers_count(self.fedor.pk), 0)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_shared_cache_drops_arrays(self):
+        """С общим кэшем правка удаляет массивы, они перечитываются"""
+        graph.following_count(self.leo.pk)
+        graph.followers_count(self.fedor.pk)
+        self.assertTrue(graph.follow(self.leo, self.fedor))
+        with self.assertNumQueries(2):
+            self.assertTrue(graph.is_following(self.leo.pk, self.fedor.pk))
+            self.assertEqual(graph.followers_count(self.fedor.pk), 1)
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_loaded_from_primary(self):
+        """Массивы не читаются с отстающей реплики даже в лентах с
+        чтением с реплик: иначе устаревший массив жил бы в кэше"""
+        @read_from_replica
+        def view(request):
+            return graph.followers_count(self.leo.pk)
+
+        request = RequestFactory().get('/')
+        with mock.patch('random.choice', side_effect=AssertionError):
+            self.assertEqual(view(request), 2)
+
+    def test_reset_after_bulk_write(self):
+        self.assertEqual(graph.following_count(self.leo.pk), 0)
+        Follow.objects.bulk_create([
+            Follow(user=self.leo, author=self.fedor),
+            Follow(user=self.leo, author=self.anton),
+        ])
+        graph.reset()
+        self.assertEqual(graph.following_count(self.leo.pk), 2)
+
+    def test_profile_views(self):
+        client = Client()
+        client.force_login(self.leo)
+        client.get(reverse('posts:profile_follow', args=['fedor']))
+        response = client.get(reverse('posts:profile', args=['fedor']))
+        self.assertTrue(response.context['following'])
+        self.assertEqual(response.context['followers_count'], 1)
+        self.assertEqual(response.context['following_count'], 1)
+        client.get(reverse('posts:profile_unfollow', args=['fedor']))
+        response = client.get(reverse('posts:profile', args=['fedor']))
+        self.assertFalse(response.context['following'])
+        self.assertEqual(response.context['followers_count'], 0)
+
+    def test_intersection(self):
+        self.assertEqual(intersection([1, 3, 5, 7], [2, 3, 7, 9]), [3, 7])
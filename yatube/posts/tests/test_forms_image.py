@@ -89,7 +89,11 @@ class ImagePostCreateFormTests(TestCase):
         self.assertEqual(
             last_post.group, self.group
         )
-        self.assertIn(self.test_image_name, str(last_post.image))
+        # файл хранится под хэшем содержимого
+        self.assertRegex(
+            str(last_post.image), r'^posts/[0-9a-f]{2}/[0-9a-f]+\.gif$'
+        )
+        self.assertTrue(last_post.image.storage.exists(last_post.image.name))
 
     def test_post_image_in_context(self):
         """Проверка корректности отображения поста на странице поста"""
@@ -119,10 +123,7 @@ class ImagePostCreateFormTests(TestCase):
                 self.assertEqual(post.text, self.test_new_post_text)
                 self.assertEqual(post.author.username, self.user.username)
                 self.assertEqual(post.group.title, self.group.title)
-                self.assertIn(
-                    self.test_image_name[:len(self.test_image_name) - 4],
-                    str(post.image)
-                )
+                self.assertEqual(str(post.image), new_post.image.name)
 
         # проверка контекста для страницы поста
         response = (self.authorized_client.get(reverse(
@@ -138,7 +139,6 @@ class ImagePostCreateFormTests(TestCase):
             response.context.get('post').group,
             self.group
         )
-        self.assertIn(
-            self.test_image_name[:len(self.test_image_name) - 4],
-            str(response.context.get('post').image)
+        self.assertEqual(
+            str(response.context.get('post').image), new_post.image.name
         )
@@ -0,0 +1,125 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import inverted_index, search
+from posts.models import Comment, Post
+from posts.stemmer import stem
+
+User = get_user_model()
+
+
+class StemmerTests(SimpleTestCase):
+    """Формы слова сводятся к одной основе"""
+
+    def test_word_forms(self):
+        cases = {
+            'котик': ['котики', 'котиков', 'котиками'],
+            'собак': ['собака', 'собаки', 'собаками'],
+            'гуля': ['гулять', 'гуляют', 'гулял'],
+            'красив': ['красивый', 'красивейший'],
+        }
+        for expected, words in cases.items():
+            for word in words:
+                with self.subTest(word=word):
+                    self.assertEqual(stem(word), expected)
+
+    def test_latin_and_yo(self):
+        self.assertEqual(stem('python'), 'python')
+        self.assertEqual(stem('ёлки'), stem('елки'))
+
+
+class InvertedIndexTests(SimpleTestCase):
+    """Сегмент на диске, журнал изменений и разбор запроса"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index = inverted_index.InvertedIndex(
+            self.directory, merge_at=3
+        )
+        self.index.rebuild([
+            (1, ['Котики спят на диване']),
+            (2, ['Собаки гуляют во дворе']),
+            (3, ['Котики и собаки дружат', 'Спят на диване вместе']),
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_and_or_phrase(self):
+        self.assertEqual(self.index.search('котик собака', 10), [3])
+        self.assertEqual(self.index.search('гулять OR дружат', 10), [3, 2])
+        # явный AND - оператор, а не слово запроса
+        self.assertEqual(
+            inverted_index.parse('кот AND пес'),
+            inverted_index.parse('кот пес')
+        )
+        self.assertEqual(self.index.search('котик AND собака', 10), [3])
+        self.assertEqual(
+            self.index.search('"спят на диване"', 10), [3, 1]
+        )
+        # фраза не склеивает конец поста и начало комментария
+        self.assertEqual(self.index.search('"дружат спят"', 10), [])
+
+    def test_ranking_and_limit(self):
+        self.index.update({4: ['Котики, котики и еще котики']})
+        self.assertEqual(self.index.search('котики', 2), [4, 3])
+
+    def test_journal_overlays_segment(self):
+        """Правки видны сразу, до слияния журнала с сегментом"""
+        self.index.update({1: ['Попугаи на жердочке']})
+        self.index.remove([2])
+        self.assertEqual(self.index.search('попугай', 10), [1])
+        self.assertEqual(self.index.search('котики', 10), [3])
+        self.assertEqual(self.index.search('собаки', 10), [3])
+
+    def test_merge_at_threshold(self):
+        """Журнал вливается в сегмент, когда набирает merge_at записей"""
+        journal = os.path.join(self.directory, inverted_index.JOURNAL)
+        self.index.update({4: ['Хомяки'], 5: ['Хомяки и котики']})
+        self.assertGreater(os.path.getsize(journal), 0)
+        self.index.update({6: ['Хомяки']})
+        self.assertEqual(os.path.getsize(journal), 0)
+        self.assertEqual(self.index.search('хомяк', 10), [6, 5, 4])
+        self.assertEqual(self.index.search('котики', 10), [5, 3, 1])
+
+
+@override_settings(SEARCH_BACKEND='inverted')
+class InvertedIndexBackendTests(TransactionTestCase):
+    """Обратный индекс как бэкенд поиска: тексты постов и комментариев
+    индексируются после фиксации транзакции"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        override = override_settings(SEARCH_INDEX_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.user = User.objects.create_user(username='VasyaPetrov')
+
+    def test_posts_and_comments_indexed(self):
+        post = Post.objects.create(author=self.user, text='Котики спят')
+        Comment.objects.create(
+            post=post, author=self.user, text='Собаки тоже спят'
+        )
+        self.assertEqual(search.post_ids('котик собака'), [post.pk])
+        response = self.client.get(reverse('posts:search'), {'q': 'собаки'})
+        self.assertEqual(list(response.context['page_obj']), [post])
+
+        post.delete()
+        self.assertEqual(search.post_ids('котики'), [])
+
+    def test_rebuild_command(self):
+        """Команда собирает индекс по базе заново"""
+        post = Post.objects.create(author=self.user, text='Хомяки едят')
+        shutil.rmtree(self.directory)
+        self.assertEqual(search.post_ids('хомяки'), [])
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(search.post_ids('хомяки'), [post.pk])
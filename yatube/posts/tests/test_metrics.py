@@ -0,0 +1,92 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Post
+
+User = get_user_model()
+
+
+class RequestMetricsTests(TestCase):
+    """Замеры запросов в заголовке Server-Timing, логе и перцентилях
+    по именам URL"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='LeoTolstoy')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        metrics.store.clear()
+
+    def test_server_timing_and_log(self):
+        self.client.force_login(
+            User.objects.create_user(username='admin', is_staff=True)
+        )
+        with self.assertLogs('core.metrics', 'INFO') as logs:
+            response = self.client.get(reverse('posts:index'))
+            self.client.get(reverse('posts:index'))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", '
+            r'cache;desc="\d+ hits, \d+ misses", template;dur=[\d.]+$'
+        )
+        first, second = [
+            json.loads(record.getMessage()) for record in logs.records
+        ]
+        self.assertEqual(first['route'], 'posts:index')
+        self.assertEqual(first['status'], 200)
+        self.assertGreater(first['db_queries'], 0)
+        self.assertGreater(first['cache_misses'], 0)
+        self.assertGreater(first['template'], 0)
+        # вторая отрисовка ленты берется из кэша фрагментов
+        self.assertGreater(second['cache_hits'], 0)
+        self.assertLess(second['db_queries'], first['db_queries'])
+
+    def test_server_timing_hidden(self):
+        """Обычным читателям заголовок не отдается"""
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('Server-Timing', response)
+        with self.settings(SERVER_TIMING=True):
+            response = self.client.get(reverse('posts:index'))
+        self.assertIn('Server-Timing', response)
+
+    def test_metrics_endpoint_for_staff_only(self):
+        self.client.get(reverse('posts:index'))
+        self.client.get(
+            reverse('posts:profile', kwargs={'username': 'LeoTolstoy'})
+        )
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 302)
+
+        admin = User.objects.create_user(username='admin', is_staff=True)
+        self.client.force_login(admin)
+        summary = self.client.get(reverse('metrics')).json()
+        self.assertEqual(summary['posts:index']['count'], 1)
+        self.assertEqual(summary['posts:profile']['count'], 1)
+        self.assertEqual(
+            set(summary['posts:index']['total']), {'p50', 'p90', 'p99'}
+        )
+
+    def test_background_timer(self):
+        """Вне запроса время идет в окно задачи"""
+        with metrics.timer('thumbnail'):
+            pass
+        self.assertEqual(metrics.store.summary()['job:thumbnail']['count'], 1)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(metrics.percentile(values, 50), 50)
+        self.assertEqual(metrics.percentile(values, 99), 99)
+        self.assertEqual(metrics.percentile([7], 90), 7)
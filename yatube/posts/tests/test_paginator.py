@@ -0,0 +1,121 @@
+import base64
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.paginator import CursorPaginator
+from posts.tests.test_funcs import posts_create
+
+User = get_user_model()
+
+
+class CursorPaginatorTests(TestCase):
+    """Проверка курсорного паджинатора лент"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username='VasyaPetrov')
+        cls.client = Client()
+        cls.posts_number = 25
+
+        posts_create(
+            cls, cls.posts_number, 11,
+            'Тестовая группа', 'test_slug',
+            'Тестовое описание', 'Тестовый пост')
+
+        # пост с той же датой, что и у последнего - порядок по id
+        cls.twin = Post.objects.create(author=cls.user, text='Близнец')
+        Post.objects.filter(pk=cls.twin.pk).update(pub_date=cls.post.pub_date)
+
+    def test_cursor_walk_covers_all_posts(self):
+        """Проход по курсорам выдает все посты по одному разу
+        в порядке ленты"""
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+        seen = []
+        url = reverse('posts:index')
+        while url:
+            page_obj = self.client.get(url).context['page_obj']
+            seen.extend(post.pk for post in page_obj)
+            url = None
+            if page_obj.has_next():
+                url = reverse('posts:index') + (
+                    f'?cursor={page_obj.next_cursor}'
+                )
+        self.assertEqual(seen, expected)
+
+    def test_previous_cursor(self):
+        """Курсор назад возвращает предыдущую страницу"""
+        first = self.client.get(reverse('posts:index')).context['page_obj']
+        second = self.client.get(
+            reverse('posts:index') + f'?cursor={first.next_cursor}'
+        ).context['page_obj']
+        self.assertTrue(second.has_previous())
+        back = self.client.get(
+            reverse('posts:index') + f'?cursor={second.previous_cursor}'
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_page_number_matches_cursor(self):
+        """Ссылки ?page=N обслуживаются тем же поиском по ключу"""
+        first = self.client.get(reverse('posts:index')).context['page_obj']
+        by_cursor = self.client.get(
+            reverse('posts:index') + f'?cursor={first.next_cursor}'
+        ).context['page_obj']
+        by_number = self.client.get(
+            reverse('posts:index') + '?page=2'
+        ).context['page_obj']
+        self.assertEqual(list(by_number), list(by_cursor))
+        self.assertEqual(by_number.number, 2)
+
+    def test_out_of_range_and_broken_input(self):
+        """Битый курсор отдает первую страницу, номер за концом
+        ленты - последнюю"""
+        response = self.client.get(reverse('posts:index') + '?cursor=abc')
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+        response = self.client.get(reverse('posts:index') + '?page=4000')
+        page_obj = response.context['page_obj']
+        self.assertFalse(page_obj.has_next())
+        self.assertEqual(len(page_obj), settings.POSTS_NUMBER)
+
+    def test_forged_cursor(self):
+        """Курсор с числами, списками и словарями вместо даты и id -
+        первая страница, а не ошибка сервера"""
+        for values in (
+            ['n', 5, 3], ['n', [1], {'a': 1}], ['n', True, 1],
+            ['n', self.post.pub_date.isoformat(), 10 ** 30],
+        ):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(values).encode()
+            ).decode().rstrip('=')
+            for url in (
+                reverse('posts:index'),
+                reverse('posts:profile', args=[self.user.username]),
+            ):
+                with self.subTest(values=values, url=url):
+                    response = self.client.get(url + f'?cursor={cursor}')
+                    self.assertEqual(
+                        response.context['page_obj'].number, 1
+                    )
+            with self.subTest(values=values, url='api'):
+                response = self.client.get(
+                    reverse('api:posts') + f'?cursor={cursor}'
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_no_count_query(self):
+        """Страница выбирается без COUNT(*)"""
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        with self.assertNumQueries(2):
+            page_obj = paginator.numbered_page(2)
+            list(page_obj)
@@ -0,0 +1,280 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from core.testing import constant_queries
+from posts import counters, feed_cache, recommendations, search, timeline
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class QueryBudgetTests(TestCase):
+    """Число запросов вью не зависит от числа постов на странице
+    и комментариев к посту"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.reader = User.objects.create_user(username='PetyaVasechkin')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.reader)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def add_posts(self, number):
+        start = User.objects.count()
+        for i in range(start, start + number):
+            author = User.objects.create_user(username=f'author{i}')
+            Follow.objects.create(user=self.reader, author=author)
+            post = Post.objects.create(
+                author=author, text=f'Пост {i}', group=self.group
+            )
+            Comment.objects.create(
+                post=post, author=author, text=f'Комментарий {i}'
+            )
+        return post
+
+    def count_queries(self, url):
+        # первый запрос заводит ленивые счетчики, а кэш фрагментов
+        # скрыл бы лишние запросы при отрисовке
+        self.authorized_client.get(url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_feeds_query_budget(self):
+        """Ленты: одна страница из 2 постов разных авторов
+        и полная страница стоят одинаково"""
+        post = self.add_posts(2)
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:follow_index'),
+            reverse(
+                'posts:profile', kwargs={'username': post.author.username}
+            ),
+        ]
+        small = {url: self.count_queries(url) for url in urls}
+        self.add_posts(12)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), small[url])
+
+    def test_post_detail_query_budget(self):
+        """Страница поста: число запросов не растет с числом
+        комментариев разных авторов"""
+        post = self.add_posts(1)
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        small = self.count_queries(url)
+        for i in range(10):
+            author = User.objects.create_user(username=f'commenter{i}')
+            Comment.objects.create(post=post, author=author, text='Еще')
+        self.assertEqual(self.count_queries(url), small)
+
+
+SNAPSHOT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'query_snapshots', 'views.sql'
+)
+
+
+class ConstantQueriesTests(TestCase):
+    """Все адреса posts, users и about при 10, 100 и 1000 постах
+    разных авторов выполняют одно и то же число запросов; SQL сверяется
+    со снимком query_snapshots/views.sql"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='PetyaVasechkin')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.own_post = Post.objects.create(
+            author=cls.reader, group=cls.group, text='Свой пост'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.reader)
+
+    def grow(self, size):
+        """Доводит число постов до size: у каждого нового поста свой
+        автор, на которого подписан читатель, и комментарий читателя
+        к своему посту. Данные пишутся пачками в обход сигналов, как
+        в bulk_import, и производные данные пересчитываются"""
+        start = Post.objects.count()
+        if size <= start:
+            return
+        names = [f'author{number}' for number in range(start, size)]
+        User.objects.bulk_create([User(username=name) for name in names])
+        authors = list(User.objects.filter(username__in=names))
+        Post.objects.bulk_create([
+            Post(author=author, group=self.group, text=f'Пост {author}')
+            for author in authors
+        ])
+        Follow.objects.bulk_create([
+            Follow(user=self.reader, author=author) for author in authors
+        ])
+        Comment.objects.bulk_create([
+            Comment(post=self.own_post, author=author, text='Комментарий')
+            for author in authors
+        ])
+        counters.rebuild()
+        timeline.rebuild()
+        search.rebuild()
+        recommendations.build()
+        feed_cache.bump(feed_cache.SHARED)
+
+    def get(self, name, *args, anonymous=False, data=None):
+        url = reverse(name, args=args)
+
+        def request():
+            # у гостя каждый раз новый клиент: сессия, заведенная одним
+            # запросом, не меняет запросы следующего
+            client = Client() if anonymous else self.client
+            response = client.get(url, data)
+            self.assertLess(response.status_code, 400, url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return request
+
+    def post(self, name, *args, data=None):
+        url = reverse(name, args=args)
+
+        def request():
+            response = self.client.post(url, data)
+            self.assertLess(response.status_code, 400, url)
+        return request
+
+    def api(self, method, name, *args, data=None):
+        url = reverse(name, args=args)
+
+        def request():
+            response = getattr(self.client, method)(
+                url, json.dumps(data), content_type='application/json'
+            )
+            self.assertLess(response.status_code, 400, url)
+        return request
+
+    def bulk_refollow(self, names):
+        """Массовая отписка и подписка заново: при каждом вызове обе
+        меняют подписки, а не упираются в уже сделанное"""
+        unfollow = self.api('delete', 'api:follows', data={'authors': names})
+        follow = self.api('post', 'api:follows', data={'authors': names})
+
+        def request():
+            unfollow()
+            follow()
+        return request
+
+    @constant_queries(snapshot=SNAPSHOT)
+    def test_all_urls(self, size):
+        self.grow(size)
+        author = User.objects.exclude(pk=self.reader.pk).latest('pk')
+        post = Post.objects.filter(author=author).get()
+        post_id = self.own_post.pk
+        # число запросов массовой подписки не зависит от числа авторов;
+        # INSERT делится на пачки только по пределу параметров базы
+        names = list(User.objects.exclude(pk=self.reader.pk).values_list(
+            'username', flat=True
+        )[:20])
+        uid = urlsafe_base64_encode(force_bytes(self.reader.pk))
+        token = default_token_generator.make_token(self.reader)
+        return {
+            'posts:index': self.get('posts:index'),
+            'posts:group_posts': self.get('posts:group_posts', 'test_slug'),
+            'posts:profile': self.get('posts:profile', author.username),
+            'posts:author': self.get('posts:author'),
+            'posts:search': self.get('posts:search', data={'q': 'Пост'}),
+            'posts:export': self.get('posts:export'),
+            'posts:post_detail': self.get('posts:post_detail', post.pk),
+            'posts:post_detail comments': self.get(
+                'posts:post_detail', post_id
+            ),
+            'posts:post_comments': self.get(
+                'posts:post_comments', post_id, anonymous=True
+            ),
+            'posts:post_comments json': self.get(
+                'posts:post_comments', post_id, data={'format': 'json'}
+            ),
+            'posts:post_create': self.get('posts:post_create'),
+            'posts:post_create POST': self.post(
+                'posts:post_create', data={'text': 'Новый пост'}
+            ),
+            'posts:post_edit': self.get('posts:post_edit', post_id),
+            'posts:post_edit POST': self.post(
+                'posts:post_edit', post_id,
+                data={'text': 'Свой пост', 'group': self.group.pk}
+            ),
+            'posts:add_comment': self.post(
+                'posts:add_comment', post.pk, data={'text': 'Еще'}
+            ),
+            'posts:follow_index': self.get('posts:follow_index'),
+            'posts:profile_unfollow': self.get(
+                'posts:profile_unfollow', author.username
+            ),
+            'posts:profile_follow': self.get(
+                'posts:profile_follow', author.username
+            ),
+            'api:posts': self.get('api:posts'),
+            'api:posts group': self.get(
+                'api:posts', anonymous=True, data={'group': 'test_slug'}
+            ),
+            'api:posts POST': self.api(
+                'post', 'api:posts',
+                data={'text': 'Пост из API', 'group': 'test_slug'}
+            ),
+            'api:post': self.get('api:post', post.pk),
+            'api:post PATCH': self.api(
+                'patch', 'api:post', post_id, data={'text': 'Свой пост'}
+            ),
+            'api:comments': self.get('api:comments', post_id),
+            'api:comments POST': self.api(
+                'post', 'api:comments', post.pk, data={'text': 'Еще'}
+            ),
+            'api:groups': self.get('api:groups'),
+            'api:follows': self.get('api:follows'),
+            'api:follow DELETE': self.api(
+                'delete', 'api:follow', author.username
+            ),
+            'api:follows POST': self.api(
+                'post', 'api:follows', data={'author': author.username}
+            ),
+            'api:follows bulk': self.bulk_refollow(names),
+            'users:signup': self.get('users:signup', anonymous=True),
+            'users:login': self.get('users:login', anonymous=True),
+            'users:logout': self.get('users:logout', anonymous=True),
+            'users:password_change': self.get('users:password_change'),
+            'users:password_change_done': self.get(
+                'users:password_change_done'
+            ),
+            'users:password_reset': self.get(
+                'users:password_reset', anonymous=True
+            ),
+            'users:password_reset_done': self.get(
+                'users:password_reset_done', anonymous=True
+            ),
+            'users:password_reset_confirm': self.get(
+                'users:password_reset_confirm', uid, token,
+                anonymous=True
+            ),
+            'users:password_reset_complete': self.get(
+                'users:password_reset_complete', anonymous=True
+            ),
+            'about:author': self.get('about:author'),
+            'about:tech': self.get('about:tech'),
+        }
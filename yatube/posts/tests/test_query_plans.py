@@ -0,0 +1,114 @@
+import re
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import recommendations
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# таблицы, которые растут с числом постов; справочники вроде групп
+# и счетчиков можно просматривать целиком
+LARGE_TABLES = {
+    'posts_post', 'posts_comment', 'posts_follow', 'posts_timelineentry',
+    'posts_imagederivative', 'posts_recommendation',
+}
+# SQLite до 3.36 пишет SCAN TABLE имя, новее - SCAN имя
+FULL_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)$')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN')
+class QueryPlanTests(TestCase):
+    """Запросы вью читают большие таблицы по индексам: в EXPLAIN QUERY
+    PLAN нет полного просмотра таблицы, а у запросов страниц (с LIMIT)
+    нет и сортировки во временном B-дереве. Предвыборки по списку id
+    сортируют только строки текущей страницы, им сортировка разрешена"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='PetyaVasechkin')
+        cls.author = User.objects.create_user(username='LeoTolstoy')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test_slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(15):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=f'Комментарий {i}'
+            )
+        recommendations.build()
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexedQueries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        for query in queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            for step in self.plan(sql):
+                match = FULL_SCAN_RE.search(step)
+                with self.subTest(url=url, sql=sql, step=step):
+                    self.assertFalse(
+                        match and match.group(1) in LARGE_TABLES,
+                        'полный просмотр таблицы'
+                    )
+                    if ' LIMIT ' in sql:
+                        self.assertNotIn('TEMP B-TREE FOR ORDER BY', step)
+
+    def test_feeds(self):
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'LeoTolstoy'}),
+            reverse('posts:follow_index'),
+        ):
+            self.assertIndexedQueries(url)
+
+    def test_post_detail(self):
+        self.assertIndexedQueries(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertIndexedQueries(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk})
+        )
+
+    def test_api(self):
+        for url in (
+            reverse('api:posts'),
+            reverse('api:posts') + '?author=LeoTolstoy',
+            reverse('api:posts') + '?group=test_slug',
+            reverse('api:post', kwargs={'post_id': self.post.pk}),
+            reverse('api:comments', kwargs={'post_id': self.post.pk}),
+            reverse('api:follows'),
+        ):
+            self.assertIndexedQueries(url)
+
+    def test_follow_lookups(self):
+        """Подписки пользователя берутся из покрывающего индекса"""
+        queryset = Follow.objects.filter(user=self.reader).values_list(
+            'author_id', flat=True
+        )
+        plan = ' '.join(self.plan(str(queryset.query)))
+        self.assertIn('USING COVERING INDEX follow_user_author', plan)
@@ -0,0 +1,136 @@
+import io
+from array import array
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts import recommendations
+from posts.models import Follow, Recommendation
+
+User = get_user_model()
+
+
+@override_settings(RECOMMENDATIONS_NUMBER=4, RECOMMENDATIONS_SHOWN=3)
+class RecommendationTests(TestCase):
+    """Рекомендации считаются командой по таблице подписок, страница
+    подписок только читает готовую таблицу"""
+
+    @classmethod
+    def setUpTestData(cls):
+        names = ('reader', 'leo', 'fedor', 'anton', 'ivan', 'masha', 'fan')
+        cls.users = {
+            name: User.objects.create_user(username=name) for name in names
+        }
+        for user, author in (
+            ('reader', 'leo'), ('reader', 'fedor'),
+            # anton - друг обоих авторов читателя, ivan - одного
+            ('leo', 'anton'), ('fedor', 'anton'), ('leo', 'ivan'),
+            # masha - только совместные подписки: ее читает подписчик leo
+            ('fan', 'leo'), ('fan', 'masha'),
+        ):
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author]
+            )
+
+    def user(self, name):
+        return self.users[name]
+
+    def names(self, user):
+        return [
+            recommendation.author.username for recommendation in
+            Recommendation.objects.filter(user=user).order_by('-score')
+        ]
+
+    def test_build(self):
+        written = recommendations.build()
+        self.assertEqual(written, Recommendation.objects.count())
+        # других авторов с подписчиками нет: свободное место пустует
+        self.assertEqual(
+            self.names(self.user('reader')), ['anton', 'ivan', 'masha']
+        )
+        via = Recommendation.objects.get(
+            user=self.user('reader'), author=self.user('anton')
+        ).via
+        self.assertEqual(via, 2)
+
+    def test_cold_start(self):
+        """Читателю без подписок - самые читаемые авторы"""
+        recommendations.build()
+        self.assertEqual(
+            self.names(self.user('masha'))[:2], ['leo', 'anton']
+        )
+
+    def test_rebuild_replaces(self):
+        recommendations.build()
+        Follow.objects.filter(user=self.user('reader')).delete()
+        recommendations.build()
+        self.assertEqual(
+            Recommendation.objects.filter(user=self.user('reader')).count(),
+            4
+        )
+        self.assertEqual(
+            self.names(self.user('reader'))[:2], ['anton', 'leo']
+        )
+
+    def test_follow_index(self):
+        recommendations.build()
+        client = Client()
+        client.force_login(self.user('reader'))
+        url = reverse('posts:follow_index')
+        response = client.get(url)
+        shown = response.context['recommendations']
+        self.assertEqual(
+            [item.author.username for item in shown][:2], ['anton', 'ivan']
+        )
+        self.assertEqual(len(shown), 3)
+        self.assertContains(response, 'Кого почитать')
+        # подписка сразу убирает автора, без пересчета
+        Follow.objects.create(
+            user=self.user('reader'), author=self.user('anton')
+        )
+        shown = client.get(url).context['recommendations']
+        self.assertNotIn('anton', [item.author.username for item in shown])
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('build_recommendations', '--batch-size', '2', stdout=out)
+        self.assertIn(
+            f'Записано рекомендаций: {Recommendation.objects.count()}',
+            out.getvalue()
+        )
+        self.assertEqual(
+            self.names(self.user('reader')), ['anton', 'ivan', 'masha']
+        )
+
+    def test_neighbours(self):
+        """Похожесть авторов считается один раз, до читателей"""
+        graph = recommendations.Graph(sample_size=200, neighbours=1)
+        leo = graph.neighbours[self.user('leo').pk]
+        # у leo двое подписчиков, fedor и masha - по одному совместному
+        self.assertEqual(len(leo), 1)
+        self.assertAlmostEqual(leo[0][1], 1 / 2 ** 0.5)
+        self.assertEqual(
+            graph.neighbours[self.user('fedor').pk],
+            [(self.user('leo').pk, 1 / 2 ** 0.5)]
+        )
+
+    @override_settings(RECOMMENDATION_MAX_FOLLOWED=1)
+    def test_max_followed(self):
+        """Учитывается не больше RECOMMENDATION_MAX_FOLLOWED авторов
+        читателя: при одном - только leo, у которого меньший id"""
+        recommendations.build()
+        via = Recommendation.objects.get(
+            user=self.user('reader'), author=self.user('anton')
+        ).via
+        self.assertEqual(via, 1)
+
+    def test_sample(self):
+        ids = array('q', range(1000))
+        sampled = recommendations.sample(ids, 200)
+        self.assertLessEqual(len(sampled), 200)
+        self.assertEqual(sampled[0], 0)
+        short = ids[:10]
+        self.assertIs(recommendations.sample(short, 200), short)
@@ -0,0 +1,80 @@
+from urllib.parse import quote
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import search
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    """Поиск по индексу: /search/ и список постов в админке"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='VasyaPetrov')
+        cls.cats = Post.objects.create(
+            author=cls.user, text='Котики спят на диване'
+        )
+        cls.dogs = Post.objects.create(
+            author=cls.user, text='Собаки гуляют во дворе'
+        )
+        cls.both = Post.objects.create(
+            author=cls.user, text='Котики и собаки дружат'
+        )
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+
+    def test_search_page(self):
+        """Страница поиска выводит только подходящие посты"""
+        response = self.search('собаки')
+        self.assertTemplateUsed(response, 'posts/search.html')
+        self.assertCountEqual(
+            response.context['page_obj'].object_list, [self.dogs, self.both]
+        )
+
+    def test_all_terms_and_prefix(self):
+        """Нужны все слова запроса; слово ищется и как начало формы"""
+        self.assertEqual(search.post_ids('котик собак'), [self.both.pk])
+        self.assertCountEqual(
+            search.post_ids('котик'), [self.cats.pk, self.both.pk]
+        )
+        self.assertEqual(search.post_ids('"*'), [])
+
+    def test_index_follows_edits(self):
+        """Изменение и удаление поста обновляют индекс"""
+        post = Post.objects.create(author=self.user, text='Хомяки едят')
+        post.text = 'Попугаи спят на жердочке'
+        post.save()
+        self.assertEqual(search.post_ids('попугаи'), [post.pk])
+        self.assertEqual(search.post_ids('хомяки'), [])
+        post.delete()
+        self.assertEqual(search.post_ids('попугаи'), [])
+
+    @override_settings(POSTS_NUMBER=1)
+    def test_pagination_keeps_query(self):
+        """Ссылки на страницы результатов сохраняют запрос"""
+        response = self.search('собаки', page=1)
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 2)
+        self.assertContains(response, f'?q={quote("собаки")}&page=2')
+
+    def test_admin_uses_index(self):
+        """Поиск в админке находит посты через индекс"""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'котики'}
+        )
+        self.assertCountEqual(
+            response.context['cl'].result_list, [self.cats, self.both]
+        )
@@ -0,0 +1,118 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import images
+from posts.models import ImageDerivative, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+OTHER_GIF = SMALL_GIF.replace(b"\xFF\xFF\xFF", b"\x00\xFF\x00")
+
+
+# миниатюры - сразу после фиксации, без потоков, которые пережили бы
+# очистку базы и MEDIA_ROOT
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0,
+    POST_IMAGE_COLLECT_GRACE=0
+)
+class ContentAddressedStorageTests(TransactionTestCase):
+    """Картинки хранятся по хэшу содержимого и удаляются, когда на них
+    не ссылается ни один пост"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='VasyaPetrov')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def create_post(self, name='small.gif', content=SMALL_GIF):
+        return Post.objects.create(
+            author=self.user, text='Пост',
+            image=SimpleUploadedFile(name=name, content=content)
+        )
+
+    def exists(self, name):
+        return Post._meta.get_field('image').storage.exists(name)
+
+    def test_identical_uploads_share_file(self):
+        """Одинаковое содержимое под разными именами - один файл"""
+        first = self.create_post('one.gif')
+        second = self.create_post('two.gif')
+        other = self.create_post('one.gif', OTHER_GIF)
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.image.name, other.image.name)
+        self.assertRegex(
+            first.image.name, r'^posts/[0-9a-f]{2}/[0-9a-f]+\.gif$'
+        )
+
+    def test_file_deleted_with_last_reference(self):
+        """Файл и его копии живут, пока на них ссылается хоть один пост"""
+        first = self.create_post()
+        second = self.create_post()
+        name = first.image.name
+        images.build(first)
+        images.build(second)
+
+        first.delete()
+        self.assertTrue(self.exists(name))
+        self.assertTrue(ImageDerivative.objects.filter(source=name).exists())
+
+        second.delete()
+        self.assertFalse(self.exists(name))
+        self.assertFalse(ImageDerivative.objects.exists())
+        self.assertFalse(self.exists(images.derivative_dir(name)))
+
+    def test_replaced_image_released(self):
+        """Замена картинки в post_edit освобождает прежний файл"""
+        post = self.create_post()
+        old_name = post.image.name
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={
+                'text': 'Пост',
+                'image': SimpleUploadedFile(name='new.gif', content=OTHER_GIF),
+            }
+        )
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, old_name)
+        self.assertTrue(self.exists(post.image.name))
+        self.assertFalse(self.exists(old_name))
+
+    @override_settings(POST_IMAGE_COLLECT_GRACE=60)
+    def test_recently_reused_file_kept(self):
+        """Файл, который только что переиспользовала загрузка, не
+        удаляется вместе с последней ссылкой: пост с ним может быть еще
+        не зафиксирован"""
+        post = self.create_post()
+        name = post.image.name
+        post.delete()
+        self.assertTrue(self.exists(name))
+
+    def test_missing_file_recreated(self):
+        """Удаленный файл записывается заново при одинаковой загрузке"""
+        post = self.create_post()
+        name = post.image.name
+        storage = Post._meta.get_field('image').storage
+        storage.delete(name)
+        self.assertEqual(self.create_post('again.gif').image.name, name)
+        self.assertTrue(self.exists(name))
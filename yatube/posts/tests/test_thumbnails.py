@@ -0,0 +1,151 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import images, thumbnails
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=2)
+class ThumbnailPipelineTests(TransactionTestCase):
+    """Копии картинок создаются в фоне, а не при отрисовке страницы"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='VasyaPetrov')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def upload(self, name='small.gif', content=SMALL_GIF):
+        return SimpleUploadedFile(name=name, content=content)
+
+    def png(self, width, height):
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), 'navy').save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def test_render_falls_back_to_original(self):
+        """Пока копий нет, выводится исходная картинка"""
+        with transaction.atomic():
+            post = Post.objects.create(
+                author=self.user, text='Пост', image=self.upload()
+            )
+            self.assertEqual(thumbnails.picture(post), {})
+        thumbnails.wait()
+        post = Post.objects.get(pk=post.pk)
+        ready = thumbnails.picture(post)
+        self.assertIn(images.FALLBACK, ready)
+        for variants in ready.values():
+            self.assertEqual(
+                [d.width for d in variants],
+                [min(settings.POST_IMAGE_WIDTHS)]
+            )
+
+    def test_widths_limited_by_source(self):
+        """Копии не шире исходной картинки, в каждом доступном формате"""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=self.upload(
+                'wide.png', self.png(1000, 400)
+            )
+        )
+        created = images.build(post)
+        expected = [w for w in settings.POST_IMAGE_WIDTHS if w <= 1000]
+        self.assertEqual(
+            sorted({d.width for d in created}), expected
+        )
+        self.assertEqual(
+            {d.format for d in created},
+            {fmt.lower() for fmt in images.formats()}
+        )
+        for derivative in created:
+            with derivative.file.open('rb') as file:
+                self.assertEqual(
+                    Image.open(file).size,
+                    (derivative.width, derivative.height)
+                )
+
+    def test_same_image_shares_derivatives(self):
+        """Копии одинаковой картинки в разных постах не пересоздаются,
+        а повторная сборка не плодит файлы"""
+        first = Post.objects.create(
+            author=self.user, text='Пост', image=self.upload()
+        )
+        second = Post.objects.create(
+            author=self.user, text='Пост', image=self.upload('copy.gif')
+        )
+        self.assertEqual(first.image.name, second.image.name)
+        built = images.build(first)
+        with mock.patch.object(images, '_encode') as encode:
+            shared = images.build(second)
+            images.build(first)
+        encode.assert_not_called()
+        self.assertEqual(
+            [d.file.name for d in shared], [d.file.name for d in built]
+        )
+        storage = built[0].file.storage
+        _, files = storage.listdir(images.derivative_dir(first.image.name))
+        self.assertEqual(len(files), len(built))
+
+    def test_post_create_renders_picture(self):
+        """Создание поста с картинкой ставит копии в очередь, после чего
+        лента выводит <picture> со srcset"""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Пост с картинкой', 'image': self.upload()}
+        )
+        thumbnails.wait()
+        post = Post.objects.get(text='Пост с картинкой')
+        jpeg = post.derivatives.get(format='jpeg')
+
+        response = self.authorized_client.get(reverse('posts:index'))
+        content = response.content.decode('utf-8')
+        self.assertIn('<picture>', content)
+        self.assertIn(f'{jpeg.file.url} {jpeg.width}w', content)
+        if 'WEBP' in images.formats():
+            self.assertIn('type="image/webp"', content)
+
+    def test_failed_build_not_requeued(self):
+        """Картинка, копии которой не создались, не ставится в очередь
+        при каждой отрисовке"""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=self.upload()
+        )
+        with mock.patch.object(images, 'build', side_effect=OSError):
+            with self.assertLogs('posts.thumbnails', 'ERROR'):
+                thumbnails.picture(post)
+                thumbnails.wait()
+        with mock.patch.object(thumbnails, 'enqueue') as enqueue:
+            self.assertEqual(thumbnails.picture(post), {})
+        enqueue.assert_not_called()
+        cache.clear()
+        with mock.patch.object(thumbnails, 'enqueue') as enqueue:
+            thumbnails.picture(post)
+        enqueue.assert_called_once_with(post)
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    """Проверка материализованной ленты подписок"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username='VasyaPetrov')
+        cls.reader = User.objects.create_user(username='PetyaVasechkin')
+        cls.other_reader = User.objects.create_user(username='MashaStartseva')
+        cls.old_post = Post.objects.create(
+            author=cls.author, text='Старый пост'
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def feed_texts(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка добавляет в ленту старые посты автора,
+        отписка убирает их"""
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author.username}
+        ))
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=self.old_post
+        ).exists())
+        self.assertEqual(self.feed_texts(), ['Старый пост'])
+
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author.username}
+        ))
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists()
+        )
+        self.assertEqual(self.feed_texts(), [])
+
+    def test_new_post_fans_out(self):
+        """Новый пост раскладывается по лентам подписчиков
+        и удаляется из них вместе с постом"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other_reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(
+            TimelineEntry.objects.filter(post=post).count(), 2
+        )
+        self.assertEqual(self.feed_texts(), ['Новый пост', 'Старый пост'])
+
+        post.delete()
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_celebrity_read_fallback(self):
+        """Посты автора с множеством подписчиков не раскладываются
+        по лентам, но попадают в ленту при чтении"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.other_reader, author=self.author)
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertFalse(TimelineEntry.objects.filter(
+            post__text='Новый пост'
+        ).exists())
+        self.assertEqual(self.feed_texts(), ['Новый пост', 'Старый пост'])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_celebrity_catch_up(self):
+        """Когда подписчиков снова не больше предела, ленты дополняются
+        постами и подписками, пропущенными за это время"""
+        Follow.objects.create(user=self.other_reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(author=self.author, text='Новый пост')
+        Follow.objects.filter(user=self.other_reader).delete()
+        self.assertEqual(self.feed_texts(), ['Новый пост', 'Старый пост'])
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 2
+        )
@@ -0,0 +1,132 @@
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template.defaultfilters import filesizeformat
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(fmt, size, exif=None):
+    buffer = io.BytesIO()
+    image = Image.new('RGB', size, 'teal')
+    if exif is not None:
+        image.save(buffer, fmt, exif=exif)
+    else:
+        image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageUploadTests(TestCase):
+    """Загрузка картинки: ранние отказы и уменьшение при приеме"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='VasyaPetrov')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def create_post(self, name, content):
+        return self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={
+                'text': 'Пост с картинкой',
+                'image': SimpleUploadedFile(name=name, content=content),
+            }
+        )
+
+    @override_settings(POST_IMAGE_MAX_BYTES=1024)
+    def test_too_many_bytes_rejected(self):
+        """Файл больше лимита не сохраняется, форма выдает ошибку"""
+        content = make_image('PNG', (300, 300)) + b'\0' * 2048
+        response = self.create_post('big.png', content)
+        self.assertFormError(
+            response, 'form', 'image', f'Файл больше {filesizeformat(1024)}.'
+        )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=10 ** 6)
+    def test_too_many_pixels_rejected(self):
+        """Размеры картинки проверяются по заголовку"""
+        response = self.create_post(
+            'huge.png', make_image('PNG', (2000, 1000))
+        )
+        self.assertFormError(
+            response, 'form', 'image', 'Картинка больше 1 мегапикселей.'
+        )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(
+        POST_IMAGE_MAX_PIXELS=3 * 10 ** 6, POST_IMAGE_MAX_FULL_PIXELS=10 ** 6
+    )
+    def test_full_decode_limit(self):
+        """JPEG уменьшается при декодировании, поэтому для него предел
+        выше, чем для форматов, которые декодируются целиком"""
+        response = self.create_post(
+            'huge.png', make_image('PNG', (2000, 1000))
+        )
+        self.assertFormError(
+            response, 'form', 'image', 'Картинка больше 1 мегапикселей.'
+        )
+        self.create_post('huge.jpg', make_image('JPEG', (2000, 1000)))
+        self.assertTrue(Post.objects.exists())
+
+    def test_animated_rejected(self):
+        """Анимация не сводится молча к первому кадру"""
+        buffer = io.BytesIO()
+        frames = [Image.new('P', (20, 20), color) for color in (1, 2)]
+        frames[0].save(
+            buffer, 'GIF', save_all=True, append_images=frames[1:]
+        )
+        response = self.create_post('moving.gif', buffer.getvalue())
+        self.assertFormError(
+            response, 'form', 'image',
+            'Анимированные картинки не поддерживаются.'
+        )
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_SIDE=200)
+    def test_downscaled_and_exif_stripped(self):
+        """Картинка поворачивается по EXIF, уменьшается и
+        сохраняется без EXIF"""
+        exif = Image.Exif()
+        # поворот на 90 градусов: стороны меняются местами
+        exif[0x0112] = 6
+        response = self.create_post(
+            'photo.jpg', make_image('JPEG', (800, 600), exif=exif)
+        )
+        self.assertRedirects(
+            response,
+            reverse('posts:profile', kwargs={'username': self.user.username})
+        )
+        post = Post.objects.get()
+        with post.image.open('rb') as file:
+            image = Image.open(file)
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (150, 200))
+            self.assertFalse(image.getexif())
+
+    @override_settings(POST_IMAGE_MAX_SIDE=200)
+    def test_other_formats_reduced(self):
+        """Не-JPEG картинки уменьшаются через reduce и сохраняют формат"""
+        self.create_post('wide.png', make_image('PNG', (1000, 500)))
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.endswith('.png'))
+        with post.image.open('rb') as file:
+            self.assertEqual(Image.open(file).size, (200, 100))
@@ -0,0 +1,107 @@
+import logging
+import threading
+from concurrent import futures
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+
+from core import metrics
+
+from . import feed_cache, images
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+# (пост, картинка) -> задача; одна картинка поста не ставится в очередь
+# дважды
+_pending = {}
+_lock = threading.Lock()
+
+
+def failed_key(post_id, name):
+    return f'thumbnail-failed:{post_id}:{name}'
+
+
+def _generate(post_id, name):
+    try:
+        post = Post.objects.filter(pk=post_id, image=name).only(
+            'image', 'author_id', 'group_id'
+        ).first()
+        # картинку успели заменить или пост удален
+        if post is None:
+            return
+        with metrics.timer('thumbnail'):
+            images.build(post)
+        # карточки поста закэшированы с оригиналом картинки
+        Post.objects.filter(pk=post_id).update(updated_at=timezone.now())
+        feed_cache.bump(*feed_cache.post_scopes(post, post.group_id))
+    except Exception:
+        logger.exception('Не удалось создать копии картинки %s', name)
+        # отрисовка не ставит картинку в очередь снова до истечения срока
+        cache.set(
+            failed_key(post_id, name), True, settings.THUMBNAIL_RETRY_TIMEOUT
+        )
+    finally:
+        with _lock:
+            _pending.pop((post_id, name), None)
+
+
+def _run(post_id, name):
+    try:
+        _generate(post_id, name)
+    finally:
+        # у потока пула свои соединения с базой
+        connections.close_all()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = futures.ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails'
+        )
+    return _executor
+
+
+def _submit(post_id, name):
+    if not settings.THUMBNAIL_WORKERS:
+        # без фоновых потоков копии создаются сразу после фиксации
+        _generate(post_id, name)
+        return
+    with _lock:
+        if (post_id, name) not in _pending:
+            _pending[post_id, name] = _get_executor().submit(
+                _run, post_id, name
+            )
+
+
+def enqueue(post):
+    """Копии картинки создаются в фоновом потоке после фиксации
+    транзакции"""
+    name = post.image.name
+    if name:
+        transaction.on_commit(lambda: _submit(post.pk, name))
+
+
+def picture(post):
+    """Готовые копии картинки поста по форматам; пока их нет,
+    недостающие ставятся в очередь, а выводится сама картинка. Картинка,
+    копии которой создать не удалось, в очередь не ставится до
+    истечения THUMBNAIL_RETRY_TIMEOUT"""
+    if not post.image:
+        return {}
+    ready = images.sources(post)
+    if not ready and not cache.get(failed_key(post.pk, post.image.name)):
+        enqueue(post)
+    return ready
+
+
+def wait():
+    """Дождаться всех поставленных задач"""
+    with _lock:
+        pending = list(_pending.values())
+    futures.wait(pending)
@@ -0,0 +1,151 @@
+from django.conf import settings
+from django.db.models import Q
+
+from . import counters
+from .models import Counter, Follow, Post, TimelineEntry
+
+TIMELINE_ORDERING = ('-pub_date', '-post_id')
+
+
+def is_celebrity(author_id):
+    """Посты авторов с очень большим числом подписчиков не раскладываются
+    по лентам при записи, а подмешиваются при чтении"""
+    return counters.followers(author_id) > settings.TIMELINE_FANOUT_LIMIT
+
+
+def celebrities():
+    prefix = counters.followers_key('')
+    names = Counter.objects.filter(
+        name__startswith=prefix,
+        value__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).values_list('name', flat=True)
+    return [int(name[len(prefix):]) for name in names]
+
+
+def fan_out(post):
+    if is_celebrity(post.author_id):
+        return
+    followers = Follow.objects.filter(author_id=post.author_id).values_list(
+        'user_id', flat=True
+    )
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    ], batch_size=settings.TIMELINE_BATCH_SIZE)
+
+
+def backfill(follow):
+    if is_celebrity(follow.author_id):
+        return
+    posts = Post.objects.filter(author_id=follow.author_id).values_list(
+        'pk', 'pub_date'
+    )
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(user_id=follow.user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts.iterator()
+    ], batch_size=settings.TIMELINE_BATCH_SIZE)
+
+
+def prune(follow):
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, post__author_id=follow.author_id
+    ).delete()
+
+
+def backfill_authors(user_id, author_ids):
+    """backfill() для подписки на многих авторов: посты всех авторов
+    одним запросом. Кто из них не раскладывается по лентам, решает
+    тот же список, что и при чтении ленты"""
+    author_ids = set(author_ids) - set(celebrities())
+    if not author_ids:
+        return
+    posts = Post.objects.filter(
+        author_id__in=author_ids
+    ).order_by().values_list('pk', 'pub_date')
+    TimelineEntry.objects.bulk_create([
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts.iterator()
+    ], batch_size=settings.TIMELINE_BATCH_SIZE, ignore_conflicts=True)
+
+
+def prune_authors(user_id, author_ids):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id__in=author_ids
+    ).delete()
+
+
+def catch_up(author_id):
+    """Ленты всех подписчиков автора дополняются всеми его постами.
+    Пока у автора больше TIMELINE_FANOUT_LIMIT подписчиков, его новые
+    посты и новые подписки на него в ленты не попадают: посты
+    подмешиваются при чтении. Когда подписчиков становится меньше,
+    лента снова читается только из записей, и недостающие нужно
+    дописать"""
+    posts = list(Post.objects.filter(author_id=author_id).order_by(
+    ).values_list('pk', 'pub_date'))
+    if not posts:
+        return
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    )
+    entries = []
+    for user_id in followers.iterator():
+        entries.extend(
+            TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts
+        )
+        if len(entries) >= settings.TIMELINE_BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(
+                entries, batch_size=settings.TIMELINE_BATCH_SIZE,
+                ignore_conflicts=True
+            )
+            entries = []
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def followers_dropped(author_ids):
+    """После отписки от авторов (счетчики уже уменьшены на один):
+    у кого подписчиков стало ровно TIMELINE_FANOUT_LIMIT, тот только
+    что перестал быть знаменитостью"""
+    names = {counters.followers_key(author_id): author_id
+             for author_id in author_ids}
+    crossed = Counter.objects.filter(
+        name__in=names, value=settings.TIMELINE_FANOUT_LIMIT
+    ).values_list('name', flat=True)
+    for name in crossed:
+        catch_up(names[name])
+
+
+def rebuild():
+    """Полная пересборка лент, например после массовой загрузки
+    подписок и постов в обход сигналов"""
+    TimelineEntry.objects.all().delete()
+    for follow in Follow.objects.all().iterator():
+        backfill(follow)
+
+
+def feed(user):
+    """Лента подписок и параметры ее паджинатора.
+
+    Обычно это один диапазон индекса timeline_user_date; если
+    пользователь подписан на авторов, посты которых не раскладываются
+    по лентам, их посты выбираются из таблицы постов при чтении."""
+    followed = Follow.objects.filter(
+        user=user, author_id__in=celebrities()
+    ).values_list('author_id', flat=True)
+    if followed:
+        entries = TimelineEntry.objects.filter(user=user).values('post')
+        post_list = Post.objects.for_feed().filter(
+            Q(pk__in=entries) | Q(author_id__in=list(followed))
+        )
+        return post_list, {}
+    entries = TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    ).prefetch_related('post__derivatives')
+    return entries, {
+        'ordering': TIMELINE_ORDERING,
+        'transform': lambda rows: [entry.post for entry in rows],
+    }
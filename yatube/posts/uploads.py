@@ -0,0 +1,126 @@
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageOps
+
+# форматы, которые сохраняются как есть; остальные пересохраняются в PNG
+KEPT_FORMATS = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+}
+FALLBACK_FORMAT = 'PNG'
+
+
+class BoundedUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл кусками, а после
+    POST_IMAGE_MAX_BYTES перестает писать и помечает файл слишком
+    большим: остаток запроса дочитывается, но не хранится"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file.too_large = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.file.too_large:
+            return None
+        if start + len(raw_data) > settings.POST_IMAGE_MAX_BYTES:
+            self.file.too_large = True
+            self.file.seek(0)
+            self.file.truncate()
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+
+def max_pixels(source_format):
+    """JPEG декодируется сразу уменьшенным (draft), остальные форматы -
+    целиком, поэтому для них предел ниже"""
+    if source_format == 'JPEG':
+        return settings.POST_IMAGE_MAX_PIXELS
+    return min(
+        settings.POST_IMAGE_MAX_PIXELS, settings.POST_IMAGE_MAX_FULL_PIXELS
+    )
+
+
+def check(upload):
+    """Отклоняет файл до декодирования: по размеру, по ширине
+    и высоте из заголовка картинки и анимацию, которую пересохранение
+    свело бы к первому кадру"""
+    if getattr(upload, 'too_large', False) or (
+        upload.size and upload.size > settings.POST_IMAGE_MAX_BYTES
+    ):
+        raise ValidationError(
+            'Файл больше %(limit)s.',
+            code='file_too_large',
+            params={'limit': filesizeformat(settings.POST_IMAGE_MAX_BYTES)},
+        )
+    upload.seek(0)
+    try:
+        # Image.open читает только заголовок, is_animated - начало
+        # второго кадра
+        with Image.open(upload) as image:
+            width, height = image.size
+            source_format = image.format
+            animated = getattr(image, 'is_animated', False)
+    except (OSError, Image.DecompressionBombError):
+        # сообщение об ошибке даст ImageField
+        return
+    finally:
+        upload.seek(0)
+    limit = max_pixels(source_format)
+    if width * height > limit:
+        raise ValidationError(
+            'Картинка больше %(limit)d мегапикселей.',
+            code='too_many_pixels',
+            params={'limit': limit // 10 ** 6},
+        )
+    if animated:
+        raise ValidationError(
+            'Анимированные картинки не поддерживаются.', code='animated'
+        )
+
+
+def _decode(upload, max_side):
+    """Декодирует картинку сразу в уменьшенном виде: JPEG - через
+    draft, остальные форматы - через reduce до полного ресемплинга"""
+    upload.seek(0)
+    image = Image.open(upload)
+    source_format = image.format
+    if source_format == 'JPEG':
+        image.draft('RGB', (max_side, max_side))
+    # поворот по EXIF до уменьшения, иначе стороны поменяются местами
+    image = ImageOps.exif_transpose(image)
+    factor = max(image.size) // max_side
+    if factor > 1:
+        image = image.reduce(factor)
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    return image, source_format
+
+
+def ingest(upload):
+    """Уменьшает картинку до POST_IMAGE_MAX_SIDE и пересохраняет ее без
+    EXIF и прочих метаданных на место загруженного файла"""
+    image, source_format = _decode(upload, settings.POST_IMAGE_MAX_SIDE)
+    image.load()
+    fmt = source_format if source_format in KEPT_FORMATS else FALLBACK_FORMAT
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    # файл загрузки закрывается вместе с запросом, поэтому результат
+    # пишется в него же, а не в новый временный файл
+    upload.seek(0)
+    upload.file.truncate()
+    # exif и текстовые блоки Pillow сам не переносит
+    image.save(upload.file, fmt, quality=settings.POST_IMAGE_QUALITY)
+    upload.size = upload.tell()
+    upload.seek(0)
+    base = os.path.splitext(os.path.basename(upload.name))[0]
+    ext = {'JPEG': 'jpg'}.get(fmt, fmt.lower())
+    upload.name = f'{base}.{ext}'
+    upload.content_type = KEPT_FORMATS[fmt]
+    upload.image = image
+    return upload
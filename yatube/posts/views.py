@@ -1,79 +1,166 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.db import read_from_replica, write_to_primary
+
+from . import (
+    api, comment_buffer, comments, counters, export, feed_cache,
+    recommendations, search, thumbnails, timeline
+)
+from .follow_graph import graph
 from .forms import PostForm, CommentForm
-from .models import Group, Post, Follow, User
+from .models import Group, Post, User
+from .paginator import lazy_paginate, paginate
 
 
+@read_from_replica
 def index(request):
     template = 'posts/index.html'
-    post_list = Post.objects.select_related('group').all()
-    paginator = Paginator(post_list, settings.POSTS_NUMBER)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.for_feed()
+    page_obj = lazy_paginate(request, post_list)
     context = {
         'page_obj': page_obj,
         'index': True,
         'follow': False,
+        **feed_cache.context(request, feed_cache.POSTS),
     }
     return render(request, template, context)
 
 
+@read_from_replica
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, settings.POSTS_NUMBER)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = group.posts.for_feed()
+    page_obj = lazy_paginate(request, post_list)
     context = {
         'group': group,
         'page_obj': page_obj,
+        **feed_cache.context(request, feed_cache.group_scope(group.pk)),
     }
     template = 'posts/group_list.html'
     return render(request, template, context)
 
 
+@read_from_replica
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    paginator = Paginator(post_list, settings.POSTS_NUMBER)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    following = False
-    if request.user.is_authenticated:
-        follower = request.user
-        following = (
-            Follow.objects.filter(author=author).
-            filter(user=follower).exists()
-        )
+    post_list = author.posts.for_feed()
+    posts_count = counters.author_posts(author.pk)
+    page_obj = lazy_paginate(request, post_list)
     context = {
         'author': author,
         'page_obj': page_obj,
-        'following': following,
+        'following': graph.is_following(request.user.pk, author.pk),
+        'followers_count': graph.followers_count(author.pk),
+        'following_count': graph.following_count(author.pk),
+        'posts_count': posts_count,
+        **feed_cache.context(request, feed_cache.author_scope(author.pk)),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    ids = search.post_ids(query) if query else []
+    page_obj = Paginator(ids, settings.POSTS_NUMBER).get_page(
+        request.GET.get('page')
+    )
+    posts = Post.objects.for_feed().in_bulk(page_obj.object_list)
+    # порядок страницы - порядок релевантности из индекса
+    page_obj.object_list = [
+        posts[pk] for pk in page_obj.object_list if pk in posts
+    ]
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        **feed_cache.card_context(),
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@login_required
+def export_data(request):
+    kind = request.GET.get('kind', 'posts')
+    export_format = request.GET.get('format', 'ndjson')
+    if kind not in export.KINDS or export_format not in export.FORMATS:
+        return HttpResponseBadRequest('Неизвестный вид или формат выгрузки')
+    filters = {
+        'author': request.GET.get('author'),
+        'group': request.GET.get('group'),
+    }
+    try:
+        for name in ('since', 'until'):
+            if request.GET.get(name):
+                filters[name] = export.parse_day(request.GET[name])
+        # остальные пользователи выгружают только свои записи
+        owner = None if request.user.is_staff else request.user
+        rows = export.rows(kind, owner=owner, **filters)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(
+        export.lines(kind, export_format, rows),
+        content_type=export.CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{export_format}"'
+    )
+    return response
+
+
 def author(request):
     author = get_object_or_404(User, username=request.user.username)
     return profile(request, author)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.for_detail(), id=post_id)
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    cursor = request.GET.get('cursor')
+    page = comments.page(post, cursor)
+    if settings.COMMENT_BUFFER and request.user.is_authenticated and (
+        not cursor
+    ):
+        # свои комментарии из очереди записи автор видит сразу
+        page.object_list = comment_buffer.pending(
+            post.pk, request.user.pk
+        ) + list(page.object_list)
     context = {
         'post': post,
         'form': form,
-        'comments': comments
+        'comments': page,
+        'author_posts_count': counters.author_posts(post.author_id),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def post_comments(request, post_id):
+    """Следующая страница комментариев для подгрузки: HTML-фрагмент
+    или, с ?format=json, те же строки, что в API"""
+    post = get_object_or_404(
+        Post.objects.only('pk', 'comments_count'), pk=post_id
+    )
+    if request.GET.get('format') == 'json':
+        try:
+            data = api.object_list(
+                request, api.COMMENTS, post.comments.all(),
+                per_page=settings.COMMENTS_NUMBER
+            )
+        except ValueError as error:
+            return api.error(str(error))
+        return api.respond(request, data)
+    context = {
+        'post_id': post.pk,
+        'comments': comments.page(post, request.GET.get('cursor')),
+        'fragment': True,
+    }
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
 @login_required
+@write_to_primary
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -82,6 +169,7 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         form.save()
+        thumbnails.enqueue(post)
         return redirect('posts:profile', request.user.username)
     return render(
         request,
@@ -91,6 +179,7 @@ def post_create(request):
 
 
 @login_required
+@write_to_primary
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if request.user != post.author:
@@ -102,6 +191,8 @@ def post_edit(request, post_id):
     )
     if request.method == 'POST' and form.is_valid():
         post = form.save()
+        if 'image' in form.changed_data:
+            thumbnails.enqueue(post)
         return redirect('posts:post_detail', post_id)
     return render(
         request,
@@ -111,6 +202,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@write_to_primary
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -118,41 +210,41 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        if settings.COMMENT_BUFFER:
+            comment_buffer.add(comment)
+        else:
+            comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
     template = 'posts/follow.html'
-    post_list = Post.objects.filter(
-        author__following__user=request.user
-    )
-    paginator = Paginator(post_list, settings.POSTS_NUMBER)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list, options = timeline.feed(request.user)
+    page_obj = paginate(request, post_list, **options)
     context = {
         'page_obj': page_obj,
         'index': False,
         'follow': True,
+        'recommendations': recommendations.for_user(request.user),
+        **feed_cache.card_context(),
     }
     return render(request, template, context)
 
 
 @login_required
+@write_to_primary
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
-        follow, created = Follow.objects.get_or_create(
-            author=author,
-            user=request.user
-        )
+        graph.follow(request.user, author)
     return redirect('posts:profile', username=username)
 
 
 @login_required
+@write_to_primary
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    ex_follow = Follow.objects.filter(user=request.user).filter(author=author)
-    ex_follow.delete()
+    graph.unfollow(request.user, author)
     return redirect('posts:profile', username=username)
@@ -0,0 +1,45 @@
+"""Настройки кэша из переменной окружения CACHE_URL.
+
+locmem:// - память процесса (по умолчанию), file:///путь/к/каталогу,
+memcached://хост:порт,хост:порт (пакет python-memcached) или
+pylibmc://хост:порт (пакет pylibmc). Все бэкенды - из core.cache, они
+считают попадания для метрик запросов.
+
+Версии лент и массивы графа подписок живут в кэше: у памяти процесса
+своя копия в каждом рабочем процессе, и запись в одном процессе не
+сбрасывает ее в других. Поэтому долгие сроки хранения этих ключей
+включаются только при общем кэше, см. is_shared."""
+from urllib.parse import unquote, urlsplit
+
+BACKENDS = {
+    'locmem': 'core.cache.LocMemCache',
+    'file': 'core.cache.FileBasedCache',
+    'memcached': 'core.cache.MemcachedCache',
+    'pylibmc': 'core.cache.PyLibMCCache',
+}
+DEFAULT_URL = 'locmem://'
+
+
+def parse_url(url):
+    """Словарь для CACHES по адресу кэша"""
+    parts = urlsplit(url)
+    if parts.scheme not in BACKENDS:
+        raise ValueError(f'Неизвестный кэш: {parts.scheme}')
+    config = {'BACKEND': BACKENDS[parts.scheme]}
+    if parts.scheme == 'file':
+        config['LOCATION'] = unquote(parts.path)
+    elif parts.scheme != 'locmem':
+        config['LOCATION'] = [
+            host.strip() for host in parts.netloc.split(',') if host.strip()
+        ]
+    return config
+
+
+def caches(environ):
+    """CACHES: кэш 'default'"""
+    return {'default': parse_url(environ.get('CACHE_URL', DEFAULT_URL))}
+
+
+def is_shared(config):
+    """Видят ли все рабочие процессы одни и те же ключи"""
+    return config['default']['BACKEND'] != BACKENDS['locmem']
@@ -0,0 +1,69 @@
+"""Настройки баз данных из переменных окружения.
+
+DATABASE_URL - основная база: sqlite:///путь/к/файлу или
+postgres://пользователь:пароль@хост:порт/имя; без переменной
+используется db.sqlite3 в каталоге проекта. DATABASE_REPLICA_URLS -
+реплики PostgreSQL для чтения лент через запятую.
+DATABASE_CONN_MAX_AGE - сколько секунд держать соединение открытым
+между запросами.
+
+Пула соединений в Django 2.2 нет: постоянное соединение каждого
+рабочего потока переиспользуется запросами, которые он обслуживает,
+это и есть локальный пул. Общий пул на несколько процессов - внешний
+pgbouncer, на который указывает DATABASE_URL. Для PostgreSQL нужен
+пакет psycopg2."""
+from urllib.parse import unquote, urlsplit
+
+ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgres': 'django.db.backends.postgresql',
+    'postgresql': 'django.db.backends.postgresql',
+}
+DEFAULT_CONN_MAX_AGE = 60
+
+
+def parse_url(url, conn_max_age=DEFAULT_CONN_MAX_AGE):
+    """Словарь для DATABASES по адресу базы"""
+    parts = urlsplit(url)
+    if parts.scheme not in ENGINES:
+        raise ValueError(f'Неизвестная база данных: {parts.scheme}')
+    config = {
+        'ENGINE': ENGINES[parts.scheme],
+        'CONN_MAX_AGE': conn_max_age,
+    }
+    if parts.scheme == 'sqlite':
+        # sqlite:////абсолютный/путь, sqlite:///:memory:
+        # режим журнала и прочее задает SQLITE_PRAGMAS при подключении
+        config['NAME'] = unquote(parts.path[1:])
+        return config
+    config.update({
+        'NAME': unquote(parts.path[1:]),
+        'USER': unquote(parts.username or ''),
+        'PASSWORD': unquote(parts.password or ''),
+        'HOST': parts.hostname or '',
+        'PORT': str(parts.port or ''),
+        'OPTIONS': {'connect_timeout': 5},
+    })
+    return config
+
+
+def databases(environ, default_url):
+    """DATABASES: основная база 'default' и реплики 'replica_N'"""
+    conn_max_age = int(
+        environ.get('DATABASE_CONN_MAX_AGE', DEFAULT_CONN_MAX_AGE)
+    )
+    result = {
+        'default': parse_url(
+            environ.get('DATABASE_URL', default_url), conn_max_age
+        ),
+    }
+    replicas = environ.get('DATABASE_REPLICA_URLS', '')
+    for number, url in enumerate(
+        (url.strip() for url in replicas.split(',') if url.strip()),
+        start=1
+    ):
+        replica = parse_url(url, conn_max_age)
+        # в тестах реплика - та же тестовая база, что и основная
+        replica['TEST'] = {'MIRROR': 'default'}
+        result[f'replica_{number}'] = replica
+    return result
@@ -12,6 +12,9 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import os
 
+from .caches import caches, is_shared
+from .database import databases
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -65,6 +68,7 @@ LOGIN_REDIRECT_URL = 'posts:index'
 
 
 MIDDLEWARE = [
+    'core.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,7 +89,8 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени отрисовки
+        'BACKEND': 'core.template_backends.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -102,18 +107,40 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# manage.py test не пишет в журнал метрики каждого запроса
+TEST_RUNNER = 'core.runner.Runner'
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+# адреса баз берутся из окружения, см. yatube/database.py
+DATABASES = databases(
+    os.environ, 'sqlite:///' + os.path.join(BASE_DIR, 'db.sqlite3')
+)
+# ленты читаются с реплик, если они есть, остальное - с основной базы
+DATABASE_ROUTERS = ['core.db.PrimaryReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+# сколько секунд после записи пользователь читает с основной базы
+REPLICA_PIN_SECONDS = 10
+# выполняются при каждом новом соединении с SQLite
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 2 ** 20,
+    'busy_timeout': 20000,
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+# адрес кэша берется из окружения, см. yatube/caches.py
+CACHES = caches(os.environ)
+# общий ли кэш у всех рабочих процессов
+SHARED_CACHE = is_shared(CACHES)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -147,6 +174,80 @@ USE_L10N = True
 USE_TZ = True
 
 POSTS_NUMBER = 10
+# комментариев на странице поста и в одном подгружаемом фрагменте
+COMMENTS_NUMBER = 20
+# отложенная запись комментариев пачками, см. posts.comment_buffer:
+# пачка пишется раз в COMMENT_FLUSH_INTERVAL мс или по набору
+# COMMENT_FLUSH_SIZE комментариев
+COMMENT_BUFFER = False
+COMMENT_FLUSH_INTERVAL = 200
+COMMENT_FLUSH_SIZE = 100
+
+# авторы с большим числом подписчиков не раскладывают посты по лентам
+# подписчиков при публикации, их посты подмешиваются в ленту при чтении
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BATCH_SIZE = 500
+
+# фрагменты лент сбрасываются сменой версии при записи; с общим кэшем
+# срок хранения нужен только чтобы не держать давно не читаемые
+# страницы, а в памяти процесса смену версии видит лишь процесс,
+# сделавший запись, и остальные отдают старую страницу до истечения срока
+FEED_CACHE_TIMEOUT = 60 * 60 * 24 if SHARED_CACHE else 20
+
+# миниатюры картинок создаются в фоновых потоках, а не при отрисовке;
+# при 0 - сразу после фиксации транзакции, без потоков
+THUMBNAIL_WORKERS = 2
+# сколько секунд не пытаться снова создать копии картинки после ошибки
+THUMBNAIL_RETRY_TIMEOUT = 60 * 60
+# массивы графа подписок в кэше, см. posts.follow_graph: в памяти
+# процесса правку видит только записавший процесс, поэтому срок
+# короткий
+FOLLOW_GRAPH_TIMEOUT = 60 * 60 * 24 if SHARED_CACHE else 60
+# наибольшее число авторов в одном запросе массовой подписки
+FOLLOW_BULK_LIMIT = 500
+# рекомендации авторов, см. posts.recommendations: сколько хранится
+# и показывается на странице подписок, сколько подписчиков автора
+# берется в выборку при расчете, сколько похожих авторов хранится для
+# каждого автора и сколько авторов читателя учитывается
+RECOMMENDATIONS_NUMBER = 10
+RECOMMENDATIONS_SHOWN = 5
+RECOMMENDATION_SAMPLE = 200
+RECOMMENDATION_NEIGHBOURS = 100
+RECOMMENDATION_MAX_FOLLOWED = 200
+# ширины копий картинки для srcset и форматы в порядке предпочтения;
+# формат, который не умеет сохранять установленный Pillow, пропускается
+POST_IMAGE_WIDTHS = (480, 960, 1440)
+POST_IMAGE_FORMATS = ('AVIF', 'WEBP', 'JPEG')
+POST_IMAGE_QUALITY = 80
+# файл картинки, записанный или переиспользованный загрузкой за
+# последние секунды, не удаляется вместе с последней ссылкой: пост с ним
+# может быть еще не зафиксирован
+POST_IMAGE_COLLECT_GRACE = 60
+# загрузки пишутся во временный файл кусками; слишком большие файлы
+# и картинки отклоняются до декодирования, остальные уменьшаются
+FILE_UPLOAD_HANDLERS = ['posts.uploads.BoundedUploadHandler']
+POST_IMAGE_MAX_BYTES = 20 * 2 ** 20
+POST_IMAGE_MAX_PIXELS = 50 * 10 ** 6
+# форматы кроме JPEG декодируются в полном размере: 4 байта на пиксель
+POST_IMAGE_MAX_FULL_PIXELS = 16 * 10 ** 6
+POST_IMAGE_MAX_SIDE = 2560
+
+
+# поиск по постам: сколько лучших совпадений выдавать и конфигурация
+# полнотекстового поиска PostgreSQL
+SEARCH_MAX_RESULTS = 1000
+SEARCH_CONFIG = 'russian'
+# 'auto' - индекс базы (FTS5, tsvector), если он есть, иначе обратный
+# индекс на диске; 'inverted' - всегда обратный индекс
+SEARCH_BACKEND = 'auto'
+SEARCH_INDEX_DIR = os.path.join(BASE_DIR, 'search_index')
+SEARCH_INDEX_MERGE_AT = 1000
+
+# выгрузка читает строки из базы кусками такого размера
+EXPORT_CHUNK_SIZE = 2000
+
+# наибольший ?limit= страницы JSON API; по умолчанию - POSTS_NUMBER
+API_MAX_PAGE_SIZE = 100
 
 
 # Static files (CSS, JavaScript, Images)
@@ -159,8 +260,24 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+
+# метрики запросов: заголовок Server-Timing, строка JSON в логе
+# core.metrics и перцентили по последним METRICS_WINDOW запросам
+# каждого URL на странице /metrics/ для администраторов; заголовок
+# получают администраторы и все при DEBUG, при SERVER_TIMING - все
+SERVER_TIMING = False
+METRICS_WINDOW = 1000
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
@@ -17,6 +17,9 @@ from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
+
+from core.views import metrics
+
 if settings.DEBUG:
     import debug_toolbar
 
@@ -28,6 +31,8 @@ handler403 = 'core.views.permission_denied'
 urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics, name='metrics'),
+    path('api/v1/', include('posts.api_urls', namespace='api')),
     path('about/', include('about.urls', namespace='about')),
     path('', include('posts.urls', namespace='posts')),
 ]